@@ -27,6 +27,10 @@ from app.models.announcement import Announcement
 from app.models.og_plan import OGPlan
 from app.models.gym_subscription import GymSubscription
 from app.models.password_reset_token import PasswordResetToken
+from app.models.gym_daily_stats import GymDailyStats
+from app.models.attendance_sync_event import AttendanceSyncEvent
+from app.models.gym_hourly_stats import GymHourlyStats
+from app.models.member_status import MemberStatus
 
 # Alembic config
 config = context.config
@@ -0,0 +1,111 @@
+"""partition_attendance_by_month
+
+Revision ID: 3f8a6c1d2b94
+Revises: 7c3d9e2b4f61
+Create Date: 2026-10-17 14:05:37.218840
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a6c1d2b94'
+down_revision: Union[str, Sequence[str], None] = '7c3d9e2b4f61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created ahead of the current one; the attendance_partitions job keeps this topped up
+MONTHS_AHEAD = 3
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _is_partitioned(conn) -> bool:
+    return bool(conn.execute(
+        sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('attendance')")
+    ).scalar())
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_attendance_gym_id_local_date', 'attendance', ['gym_id', 'local_date'], unique=False)
+    op.create_index('ix_attendance_user_id_local_date', 'attendance', ['user_id', 'local_date'], unique=False)
+    op.create_index(
+        'ix_attendance_open_user_id_local_date',
+        'attendance',
+        ['user_id', 'local_date', 'check_in_at'],
+        unique=False,
+        postgresql_where=sa.text('check_out_at IS NULL')
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Range partitioning is Postgres-only
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    inspector = inspect(conn)
+
+    # Check if attendance table exists
+    tables = inspector.get_table_names()
+    if 'attendance' not in tables or _is_partitioned(conn):
+        return
+
+    # Partitioned by local_date, which every date-bounded attendance query filters on.
+    # The primary key of a partitioned table must include the partition key.
+    op.execute("ALTER TABLE attendance RENAME TO attendance_unpartitioned")
+    op.execute(
+        "CREATE TABLE attendance (LIKE attendance_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (local_date)"
+    )
+
+    # One partition per month from the oldest row to MONTHS_AHEAD months from now,
+    # plus a default partition so out-of-range dates never fail an insert
+    today = datetime.now(ZoneInfo("Asia/Kolkata")).date()
+    oldest = conn.execute(sa.text("SELECT MIN(local_date) FROM attendance_unpartitioned")).scalar() or today
+    month = oldest.replace(day=1)
+    last = today.replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        next_month = _next_month(month)
+        op.execute(
+            f"CREATE TABLE attendance_y{month.year}m{month.month:02d} PARTITION OF attendance "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        )
+        month = next_month
+    op.execute("CREATE TABLE attendance_default PARTITION OF attendance DEFAULT")
+
+    op.execute("INSERT INTO attendance SELECT * FROM attendance_unpartitioned")
+    op.execute("DROP TABLE attendance_unpartitioned")
+
+    op.create_primary_key('attendance_pkey', 'attendance', ['id', 'local_date'])
+    op.create_foreign_key('attendance_user_id_fkey', 'attendance', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('attendance_gym_id_fkey', 'attendance', 'gyms', ['gym_id'], ['id'])
+    _create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rows in partitions already archived (detached and dropped) are not restored
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql' or not _is_partitioned(conn):
+        return
+
+    op.execute("ALTER TABLE attendance RENAME TO attendance_partitioned")
+    op.execute("CREATE TABLE attendance (LIKE attendance_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO attendance SELECT * FROM attendance_partitioned")
+    op.execute("DROP TABLE attendance_partitioned CASCADE")
+
+    op.create_primary_key('attendance_pkey', 'attendance', ['id'])
+    op.create_foreign_key('attendance_user_id_fkey', 'attendance', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('attendance_gym_id_fkey', 'attendance', 'gyms', ['gym_id'], ['id'])
+    _create_indexes()
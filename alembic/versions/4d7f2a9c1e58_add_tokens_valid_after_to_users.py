@@ -0,0 +1,37 @@
+"""add_tokens_valid_after_to_users
+
+Revision ID: 4d7f2a9c1e58
+Revises: c5e8a3f1d904
+Create Date: 2026-10-17 18:41:27.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d7f2a9c1e58'
+down_revision: Union[str, Sequence[str], None] = 'c5e8a3f1d904'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if column already exists
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    columns = [col['name'] for col in inspector.get_columns('users')]
+
+    # Tokens issued before this moment are rejected (password reset, deactivation)
+    if 'tokens_valid_after' not in columns:
+        op.add_column('users', sa.Column('tokens_valid_after', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'tokens_valid_after')
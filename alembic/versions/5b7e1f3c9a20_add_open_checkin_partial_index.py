@@ -0,0 +1,49 @@
+"""add_open_checkin_partial_index
+
+Revision ID: 5b7e1f3c9a20
+Revises: cd8dd6d228d8
+Create Date: 2026-10-17 11:48:05.112094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e1f3c9a20'
+down_revision: Union[str, Sequence[str], None] = 'cd8dd6d228d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if index already exists
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    # Check if attendance table exists
+    tables = inspector.get_table_names()
+    if 'attendance' not in tables:
+        return
+    
+    # Get existing indexes
+    indexes = [idx['name'] for idx in inspector.get_indexes('attendance')]
+    
+    # Partial index over open check-ins only (check_out_at IS NULL)
+    if 'ix_attendance_open_user_id_local_date' not in indexes:
+        op.create_index(
+            'ix_attendance_open_user_id_local_date',
+            'attendance',
+            ['user_id', 'local_date', 'check_in_at'],
+            unique=False,
+            postgresql_where=sa.text('check_out_at IS NULL')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_open_user_id_local_date', table_name='attendance')
@@ -0,0 +1,43 @@
+"""add_closing_time_to_gyms
+
+Revision ID: 7c3d9e2b4f61
+Revises: e41a07c2d5f8
+Create Date: 2026-10-17 13:20:09.671345
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3d9e2b4f61'
+down_revision: Union[str, Sequence[str], None] = 'e41a07c2d5f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if column already exists
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    # Check if gyms table exists
+    tables = inspector.get_table_names()
+    if 'gyms' not in tables:
+        return
+    
+    # Get existing columns
+    columns = [col['name'] for col in inspector.get_columns('gyms')]
+    
+    # Add closing_time column if it doesn't exist
+    if 'closing_time' not in columns:
+        op.add_column('gyms', sa.Column('closing_time', sa.Time(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('gyms', 'closing_time')
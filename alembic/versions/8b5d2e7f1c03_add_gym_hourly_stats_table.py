@@ -0,0 +1,45 @@
+"""add_gym_hourly_stats_table
+
+Revision ID: 8b5d2e7f1c03
+Revises: 3f8a6c1d2b94
+Create Date: 2026-10-17 15:02:18.554931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b5d2e7f1c03'
+down_revision: Union[str, Sequence[str], None] = '3f8a6c1d2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if table already exists
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    tables = inspector.get_table_names()
+
+    if 'gym_hourly_stats' not in tables:
+        op.create_table(
+            'gym_hourly_stats',
+            sa.Column('gym_id', sa.String(), nullable=False),
+            sa.Column('month', sa.Date(), nullable=False),
+            sa.Column('weekday', sa.Integer(), nullable=False),
+            sa.Column('hour', sa.Integer(), nullable=False),
+            sa.Column('check_ins', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['gym_id'], ['gyms.id'], ),
+            sa.PrimaryKeyConstraint('gym_id', 'month', 'weekday', 'hour')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('gym_hourly_stats')
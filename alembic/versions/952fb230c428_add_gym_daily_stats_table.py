@@ -0,0 +1,45 @@
+"""add_gym_daily_stats_table
+
+Revision ID: 952fb230c428
+Revises: g2d4e5f6a7b8
+Create Date: 2026-10-17 10:12:41.308216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '952fb230c428'
+down_revision: Union[str, Sequence[str], None] = 'g2d4e5f6a7b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if table already exists
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    tables = inspector.get_table_names()
+
+    if 'gym_daily_stats' not in tables:
+        op.create_table(
+            'gym_daily_stats',
+            sa.Column('gym_id', sa.String(), nullable=False),
+            sa.Column('local_date', sa.Date(), nullable=False),
+            sa.Column('check_ins', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('check_outs', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('unique_members', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['gym_id'], ['gyms.id'], ),
+            sa.PrimaryKeyConstraint('gym_id', 'local_date')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('gym_daily_stats')
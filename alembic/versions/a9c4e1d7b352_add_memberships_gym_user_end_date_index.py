@@ -0,0 +1,47 @@
+"""add_memberships_gym_user_end_date_index
+
+Revision ID: a9c4e1d7b352
+Revises: d6a1f4b8e257
+Create Date: 2026-10-17 16:21:06.418027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e1d7b352'
+down_revision: Union[str, Sequence[str], None] = 'd6a1f4b8e257'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if index already exists
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    # Check if memberships table exists
+    tables = inspector.get_table_names()
+    if 'memberships' not in tables:
+        return
+    
+    # Get existing indexes
+    indexes = [idx['name'] for idx in inspector.get_indexes('memberships')]
+    
+    if 'ix_memberships_gym_id_user_id_end_date' not in indexes:
+        op.create_index(
+            'ix_memberships_gym_id_user_id_end_date',
+            'memberships',
+            ['gym_id', 'user_id', 'end_date'],
+            unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_memberships_gym_id_user_id_end_date', table_name='memberships')
@@ -0,0 +1,89 @@
+"""add_member_status_table
+
+Revision ID: c5e8a3f1d904
+Revises: f3b7d92e6c18
+Create Date: 2026-10-17 17:12:46.308215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a3f1d904'
+down_revision: Union[str, Sequence[str], None] = 'f3b7d92e6c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if table already exists
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    tables = inspector.get_table_names()
+
+    if 'member_status' in tables:
+        return
+
+    op.create_table(
+        'member_status',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('gym_id', sa.String(), nullable=False),
+        sa.Column('current_membership_id', sa.String(), nullable=True),
+        sa.Column('plan_id', sa.String(), nullable=True),
+        sa.Column('membership_status', sa.String(), nullable=True),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.Column('has_pending_payment', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('last_check_in', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['gym_id'], ['gyms.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'gym_id')
+    )
+    op.create_index('ix_member_status_gym_id_end_date', 'member_status', ['gym_id', 'end_date'], unique=False)
+
+    # Populate from existing data, same rules as MemberStatusService.rebuild
+    op.execute("""
+        INSERT INTO member_status (
+            user_id, gym_id, current_membership_id, plan_id, membership_status,
+            end_date, has_pending_payment, last_check_in, updated_at
+        )
+        SELECT
+            u.id,
+            u.gym_id,
+            m.id,
+            m.plan_id,
+            m.status,
+            m.end_date,
+            EXISTS (
+                SELECT 1 FROM payments p
+                WHERE p.user_id = u.id AND p.gym_id = u.gym_id AND p.status = 'pending'
+            ),
+            (
+                SELECT MAX(a.check_in_at) FROM attendance a
+                WHERE a.user_id = u.id AND a.gym_id = u.gym_id
+            ),
+            CURRENT_TIMESTAMP
+        FROM users u
+        JOIN roles r ON r.id = u.role_id
+        LEFT JOIN (
+            SELECT
+                id, user_id, gym_id, plan_id, status, end_date,
+                ROW_NUMBER() OVER (
+                    PARTITION BY user_id, gym_id
+                    ORDER BY CASE WHEN status = 'active' THEN 0 ELSE 1 END, end_date DESC, id DESC
+                ) AS membership_rank
+            FROM memberships
+        ) m ON m.user_id = u.id AND m.gym_id = u.gym_id AND m.membership_rank = 1
+        WHERE u.gym_id IS NOT NULL AND r.name = 'MEMBER'
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_member_status_gym_id_end_date', table_name='member_status')
+    op.drop_table('member_status')
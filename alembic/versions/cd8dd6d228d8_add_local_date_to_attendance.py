@@ -0,0 +1,60 @@
+"""add_local_date_to_attendance
+
+Revision ID: cd8dd6d228d8
+Revises: 952fb230c428
+Create Date: 2026-10-17 11:02:17.540931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cd8dd6d228d8'
+down_revision: Union[str, Sequence[str], None] = '952fb230c428'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if column already exists
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    # Check if attendance table exists
+    tables = inspector.get_table_names()
+    if 'attendance' not in tables:
+        return
+    
+    # Get existing columns
+    columns = [col['name'] for col in inspector.get_columns('attendance')]
+    
+    # Add local_date column if it doesn't exist, backfilled from check_in_at.
+    # check_in_at holds naive UTC, so it is converted to IST before taking the date.
+    if 'local_date' not in columns:
+        op.add_column('attendance', sa.Column('local_date', sa.Date(), nullable=True))
+        op.execute(
+            "UPDATE attendance "
+            "SET local_date = CAST((check_in_at AT TIME ZONE 'UTC') AT TIME ZONE 'Asia/Kolkata' AS DATE) "
+            "WHERE local_date IS NULL"
+        )
+        op.alter_column('attendance', 'local_date', existing_type=sa.Date(), nullable=False)
+    
+    # Get existing indexes
+    indexes = [idx['name'] for idx in inspector.get_indexes('attendance')]
+    
+    if 'ix_attendance_gym_id_local_date' not in indexes:
+        op.create_index('ix_attendance_gym_id_local_date', 'attendance', ['gym_id', 'local_date'], unique=False)
+    if 'ix_attendance_user_id_local_date' not in indexes:
+        op.create_index('ix_attendance_user_id_local_date', 'attendance', ['user_id', 'local_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_user_id_local_date', table_name='attendance')
+    op.drop_index('ix_attendance_gym_id_local_date', table_name='attendance')
+    op.drop_column('attendance', 'local_date')
@@ -0,0 +1,45 @@
+"""add_member_list_keyset_indexes
+
+Revision ID: d6a1f4b8e257
+Revises: 8b5d2e7f1c03
+Create Date: 2026-10-17 15:48:52.730114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a1f4b8e257'
+down_revision: Union[str, Sequence[str], None] = '8b5d2e7f1c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if indexes already exist
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    
+    # Check if users table exists
+    tables = inspector.get_table_names()
+    if 'users' not in tables:
+        return
+    
+    # Get existing indexes
+    indexes = [idx['name'] for idx in inspector.get_indexes('users')]
+    
+    if 'ix_users_gym_id_name_id' not in indexes:
+        op.create_index('ix_users_gym_id_name_id', 'users', ['gym_id', 'name', 'id'], unique=False)
+    if 'ix_users_gym_id_created_at_id' not in indexes:
+        op.create_index('ix_users_gym_id_created_at_id', 'users', ['gym_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_gym_id_created_at_id', table_name='users')
+    op.drop_index('ix_users_gym_id_name_id', table_name='users')
@@ -0,0 +1,44 @@
+"""add_attendance_sync_events_table
+
+Revision ID: e41a07c2d5f8
+Revises: 5b7e1f3c9a20
+Create Date: 2026-10-17 12:31:44.906512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41a07c2d5f8'
+down_revision: Union[str, Sequence[str], None] = '5b7e1f3c9a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Check if table already exists
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    tables = inspector.get_table_names()
+
+    if 'attendance_sync_events' not in tables:
+        op.create_table(
+            'attendance_sync_events',
+            sa.Column('gym_id', sa.String(), nullable=False),
+            sa.Column('client_event_id', sa.String(), nullable=False),
+            sa.Column('event_type', sa.String(), nullable=False),
+            sa.Column('attendance_id', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['gym_id'], ['gyms.id'], ),
+            sa.PrimaryKeyConstraint('gym_id', 'client_event_id')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('attendance_sync_events')
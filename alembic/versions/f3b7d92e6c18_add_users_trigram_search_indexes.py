@@ -0,0 +1,58 @@
+"""add_users_trigram_search_indexes
+
+Revision ID: f3b7d92e6c18
+Revises: a9c4e1d7b352
+Create Date: 2026-10-17 16:54:33.902615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7d92e6c18'
+down_revision: Union[str, Sequence[str], None] = 'a9c4e1d7b352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Expression indexes matching the lower(column) used by app.utils.search.text_search
+TRIGRAM_INDEXES = {
+    'ix_users_name_trgm': 'name',
+    'ix_users_user_name_trgm': 'user_name',
+    'ix_users_email_trgm': 'email',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm is Postgres-only
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    inspector = inspect(conn)
+    
+    # Check if users table exists
+    tables = inspector.get_table_names()
+    if 'users' not in tables:
+        return
+    
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    
+    # Get existing indexes
+    indexes = [idx['name'] for idx in inspector.get_indexes('users')]
+    
+    for index_name, column in TRIGRAM_INDEXES.items():
+        if index_name not in indexes:
+            op.execute(f"CREATE INDEX {index_name} ON users USING gin (lower({column}) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    for index_name in TRIGRAM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
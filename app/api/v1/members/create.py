@@ -8,15 +8,13 @@ from fastapi import (
     Request,
     BackgroundTasks,
 )
-from sqlmodel import select
 from typing import Optional
 import time
 
-from app.core.permissions import require_any_authenticated
+from app.core.permissions import get_role_name, require_any_authenticated
 from app.core.exceptions import NotFoundError, AlreadyExistsError
 from app.db.db import SessionDep
 from app.models.user import User
-from app.models.role import Role as RoleModel
 from app.schemas.membership import MembershipCreate, MembershipResponse
 from app.schemas.payments import MemberPaymentCreate, PaymentResponse as PaymentResponseSchema
 from app.schemas.attendance import (
@@ -49,10 +47,9 @@ def create_membership(
     session: SessionDep,
     current_user: User = require_any_authenticated
 ):
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
+    role_name = get_role_name(current_user, session)
 
-    if not role or role.name != "MEMBER":
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can create memberships for themselves",
             data=None
@@ -87,10 +84,9 @@ async def create_payment(
     proof_file: UploadFile = File(...),
     remarks: Optional[str] = Form(None),
 ):
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
+    role_name = get_role_name(current_user, session)
 
-    if not role or role.name != "MEMBER":
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can create payments",
             data=None,
@@ -142,10 +138,9 @@ def mark_attendance(
     session: SessionDep,
     current_user: User = require_any_authenticated
 ):
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
+    role_name = get_role_name(current_user, session)
 
-    if not role or role.name != "MEMBER":
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can mark attendance",
             data=None,
@@ -183,10 +178,9 @@ def checkout(
             status_code=status.HTTP_400_BAD_REQUEST
         )
 
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
+    role_name = get_role_name(current_user, session)
 
-    if not role or role.name != "MEMBER":
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can checkout",
             data=None,
@@ -1,10 +1,8 @@
 from fastapi import APIRouter, status, Query
 from typing import Optional
-from sqlmodel import select
-from app.core.permissions import require_any_authenticated
+from app.core.permissions import get_role_name, require_any_authenticated
 from app.db.db import SessionDep
 from app.models.user import User, Role, RoleEnum
-from app.models.role import Role as RoleModel
 from app.schemas.user import UserResponse
 from app.schemas.membership import MembershipResponse
 from app.schemas.payments import PaymentResponse
@@ -51,23 +49,21 @@ def get_dashboard_kpis(
     current_user: User = require_any_authenticated
 ):
     """Get member dashboard KPIs"""
-    # Get role name from database
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
-    if not role:
+    role_name = get_role_name(current_user, session)
+    if not role_name:
         return failure_response(
             message="User role not found",
             data=None
         )
     
     # Verify user is a MEMBER
-    if role.name != "MEMBER":
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can access this endpoint",
             data=None
         )
     
-    role_enum = RoleEnum(role.name)
+    role_enum = RoleEnum(role_name)
     
     dashboard_service = DashboardService(session=session)
     kpis_data = dashboard_service.get_user_kpis(
@@ -134,10 +130,8 @@ def get_member_gym_info(
     current_user: User = require_any_authenticated
 ):
     """Get member's gym information"""
-    # Get role name from database (same pattern as dashboard endpoint)
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
-    if not role:
+    role_name = get_role_name(current_user, session)
+    if not role_name:
         return failure_response(
             message="User role not found",
             data=None,
@@ -145,7 +139,7 @@ def get_member_gym_info(
         )
     
     # Verify user is a MEMBER
-    if role.name != "MEMBER":
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can access this endpoint",
             data=None,
@@ -178,10 +172,8 @@ def get_all_plans(
     current_user: User = require_any_authenticated
 ):
     """Get all plans for the member's gym"""
-    # Get role name from database
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
-    if not role:
+    role_name = get_role_name(current_user, session)
+    if not role_name:
         return failure_response(
             message="User role not found",
             data=None,
@@ -189,7 +181,7 @@ def get_all_plans(
         )
     
     # Verify user is a MEMBER
-    if role.name != "MEMBER":
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can access this endpoint",
             data=None,
@@ -215,10 +207,8 @@ def get_all_gym_rules(
     current_user: User = require_any_authenticated
 ):
     """Get all gym rules for the member's gym"""
-    # Get role name from database
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
-    if not role:
+    role_name = get_role_name(current_user, session)
+    if not role_name:
         return failure_response(
             message="User role not found",
             data=None,
@@ -226,7 +216,7 @@ def get_all_gym_rules(
         )
     
     # Verify user is a MEMBER
-    if role.name != "MEMBER":
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can access this endpoint",
             data=None,
@@ -252,11 +242,9 @@ def get_checkin_status(
     current_user: User = require_any_authenticated
 ):
     """Get active check-in status for the current member"""
-    # Get role name from database
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
+    role_name = get_role_name(current_user, session)
     
-    if not role or role.name != "MEMBER":
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can check their check-in status",
             data=None,
@@ -274,9 +262,8 @@ def get_announcements(
     current_user: User = require_any_authenticated
 ):
     """Get announcements relevant to the logged-in user (user-specific; only announcements intended for this member)."""
-    stmt = select(RoleModel).where(RoleModel.id == current_user.role_id)
-    role = session.exec(stmt).first()
-    if not role or role.name != "MEMBER":
+    role_name = get_role_name(current_user, session)
+    if role_name != "MEMBER":
         return failure_response(
             message="Only members can access this endpoint",
             data=None,
@@ -1,9 +1,7 @@
 from fastapi import APIRouter, status
-from sqlmodel import select
-from app.core.permissions import require_any_authenticated
+from app.core.permissions import get_role_name, require_any_authenticated
 from app.db.db import SessionDep
 from app.models.user import User
-from app.models.role import Role as RoleModel
 from app.schemas.user import UserResponse, UserUpdate
 from app.schemas.response import APIResponse
 from app.utils.response import success_response, failure_response
@@ -13,10 +11,7 @@ router = APIRouter(prefix="/update", tags=["members"])
 
 
 def _is_member(current_user: User, session: SessionDep) -> bool:
-    if not current_user.role_id:
-        return False
-    role = session.exec(select(RoleModel).where(RoleModel.id == current_user.role_id)).first()
-    return role is not None and role.name == "MEMBER"
+    return get_role_name(current_user, session) == "MEMBER"
 
 
 @router.put("/profile", response_model=APIResponse[UserResponse], status_code=status.HTTP_200_OK)
@@ -3,9 +3,9 @@ from sqlmodel import select
 from typing import Optional, List
 from datetime import date
 from app.core.permission_guard import require_permission, require_any_permission
+from app.core.permissions import get_owner_gym
 from app.db.db import SessionDep
 from app.models.user import User
-from app.models.gym import Gym
 from app.models.role import Role
 from app.schemas.announcement import AnnouncementCreate, AnnouncementResponse, AnnouncementListResponse
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
@@ -19,11 +19,6 @@ from app.services.dashboard_service import DashboardService
 router = APIRouter(prefix="/admin", tags=["owner"])
 
 
-def get_owner_gym(current_user: User, session: SessionDep):
-    """Helper function to get the gym owned by the current admin user"""
-    stmt = select(Gym).where(Gym.owner_id == current_user.id)
-    return session.exec(stmt).first()
-
 @router.get("/dashboard", response_model=APIResponse[DashboardKPIsResponse])
 def get_dashboard_kpis(
     session: SessionDep = None,
@@ -1,17 +1,16 @@
-from fastapi import APIRouter, status
-from sqlmodel import select
-from sqlalchemy import func, and_
-from app.core.permissions import require_admin
+import io
+from fastapi import APIRouter, File, UploadFile, status
+from app.core.permissions import require_admin, get_owner_gym
 from app.db.db import SessionDep
 from app.models.user import User
-from app.models.gym import Gym
 from app.schemas.user import UserCreate, UserResponse
-from app.schemas.member import AddMemberRequest
+from app.schemas.member import AddMemberRequest, MemberImportResponse
 from app.schemas.gym import GymCreate, GymResponse
 from app.schemas.plan import PlanCreate, PlanResponse
 from app.schemas.membership import MembershipCreate, MembershipResponse
 from app.schemas.announcement import AnnouncementCreate, AnnouncementResponse
 from app.schemas.gym_rule import GymRuleCreate, GymRuleResponse
+from app.schemas.attendance import AttendanceBatchRequest, AttendanceBatchResponse
 from app.schemas.response import APIResponse
 from app.utils.response import success_response, failure_response
 from app.services.user_service import UserService
@@ -19,16 +18,12 @@ from app.services.gym_service import GymService
 from app.services.plan_service import PlanService
 from app.services.membership_service import MembershipService
 from app.services.announcement_service import AnnouncementService
+from app.services.attendance_service import AttendanceService
+from app.services.member_import_service import MemberImportService
 
 router = APIRouter(prefix="/create", tags=["owners"])
 
 
-def get_owner_gym(current_user: User, session: SessionDep):
-    """Helper function to get the gym owned by the current admin user"""
-    stmt = select(Gym).where(Gym.owner_id == current_user.id)
-    return session.exec(stmt).first()
-
-
 @router.post("/members", response_model=APIResponse[UserResponse], status_code=status.HTTP_201_CREATED)
 def add_member(
     request: AddMemberRequest,
@@ -51,50 +46,14 @@ def add_member(
         )
     
     # Check OG plan max_members limit
-    from app.models.gym_subscription import GymSubscription, SubscriptionStatus
-    from app.models.og_plan import OGPlan
-    from app.models.role import Role as RoleModel
-    from datetime import date
-    from sqlalchemy import func, and_
-    
-    # Get active OG plan subscription for the gym
-    today = date.today()
-    subscription_stmt = select(GymSubscription).where(
-        and_(
-            GymSubscription.gym_id == gym.id,
-            GymSubscription.status == SubscriptionStatus.ACTIVE,
-            GymSubscription.end_date >= today
+    gym_service = GymService(session=session)
+    max_members = gym_service.get_member_limit(gym.id)
+    if max_members is not None and gym_service.count_active_members(gym.id) >= max_members:
+        return failure_response(
+            message=f"Cannot add member. Gym has reached the maximum member limit of {max_members} for the current OG plan.",
+            status_code=status.HTTP_400_BAD_REQUEST
         )
-    ).order_by(GymSubscription.end_date.desc())
-    active_subscription = session.exec(subscription_stmt).first()
-    
-    if active_subscription:
-        # Get OG plan details
-        og_plan_stmt = select(OGPlan).where(OGPlan.id == active_subscription.og_plan_id)
-        og_plan = session.exec(og_plan_stmt).first()
-        
-        if og_plan and og_plan.max_members > 0:
-            # Count current active members in the gym
-            member_role_stmt = select(RoleModel).where(RoleModel.name == "MEMBER")
-            member_role = session.exec(member_role_stmt).first()
-            
-            if member_role:
-                member_count_stmt = select(func.count(User.id)).where(
-                    and_(
-                        User.gym_id == gym.id,
-                        User.role_id == member_role.id,
-                        User.is_active == True
-                    )
-                )
-                current_member_count = session.exec(member_count_stmt).first() or 0
-                
-                # Check if adding this member would exceed the limit
-                if current_member_count >= og_plan.max_members:
-                    return failure_response(
-                        message=f"Cannot add member. Gym has reached the maximum member limit of {og_plan.max_members} for the current OG plan.",
-                        status_code=status.HTTP_400_BAD_REQUEST
-                    )
-    
+
     user_service = UserService(session=session)
     member_data = user_service.add_member_to_gym(
         member_user_name=request.member_user_name,
@@ -106,6 +65,39 @@ def add_member(
     return success_response(data=member_data, message="Member added to gym successfully")
 
 
+@router.post("/members/import", response_model=APIResponse[MemberImportResponse], status_code=status.HTTP_200_OK)
+def import_members(
+    file: UploadFile = File(..., description="CSV with a header row: name, email, phone, password, gender, dob, "
+                                             "address_line1, address_line2, city, state, postal_code, country, "
+                                             "and optionally user_name, plan_id, new_duration, new_price"),
+    session: SessionDep = None,
+    current_user: User = require_admin
+):
+    """Create new members in the owner's gym from a CSV file; returns a per-row error report"""
+    gym = get_owner_gym(current_user, session)
+    if not gym:
+        return failure_response(
+            message="No gym found for this owner",
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+
+    # Read as a text stream; utf-8-sig drops the BOM spreadsheet exports add
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        import_data = MemberImportService(session=session).import_members(gym_id=gym.id, lines=lines)
+    except UnicodeDecodeError:
+        return failure_response(
+            message="CSV must be UTF-8 encoded",
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    finally:
+        lines.detach()
+    return success_response(
+        data=import_data,
+        message=f"Imported {import_data.imported_count} of {import_data.total_rows} members"
+    )
+
+
 @router.post("/staff", response_model=APIResponse[UserResponse], status_code=status.HTTP_201_CREATED)
 def create_staff(
     user: UserCreate,
@@ -257,3 +249,21 @@ def create_gym_rule(
     rule_data = gym_service.create_gym_rule(rule)
     return success_response(data=rule_data, message="Gym rule created successfully")
 
+
+@router.post("/attendance/batch", response_model=APIResponse[AttendanceBatchResponse], status_code=status.HTTP_200_OK)
+def sync_attendance_batch(
+    batch: AttendanceBatchRequest,
+    session: SessionDep = None,
+    current_user: User = require_admin
+):
+    """Upload check-in/check-out events recorded offline by a front-desk kiosk (up to 500 per call)"""
+    gym = get_owner_gym(current_user, session)
+    if not gym:
+        return failure_response(
+            message="No gym found for this owner",
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+    
+    attendance_service = AttendanceService(session=session)
+    batch_data = attendance_service.ingest_attendance_batch(gym_id=gym.id, events=batch.events)
+    return success_response(data=batch_data, message="Attendance events processed successfully")
@@ -1,18 +1,19 @@
 from fastapi import APIRouter, status
 from sqlmodel import select, and_
 from datetime import date
-from app.core.permissions import require_admin
+from app.core.permissions import require_admin, get_owner_gym
 from app.db.db import SessionDep
 from app.models.role import Role
 from app.models.user import User
-from app.models.gym import Gym
 from app.models.membership import Membership
 from app.schemas.response import APIResponse
 from app.utils.response import success_response, failure_response
-from app.services.user_service import UserService
+from app.services.user_service import UserService, invalidate_user_profile
 from app.services.gym_service import GymService
 from app.services.plan_service import PlanService
 from app.services.membership_service import MembershipService
+from app.services.member_status_service import MemberStatusService
+from app.services.access_gate_service import invalidate_membership_gate
 import sys
 import logging
 
@@ -21,12 +22,6 @@ logging.basicConfig(level=logging.INFO, stream=sys.stdout, format='%(asctime)s -
 router = APIRouter(prefix="/delete", tags=["owners"])
 
 
-def get_owner_gym(current_user: User, session: SessionDep):
-    """Helper function to get the gym owned by the current admin user"""
-    stmt = select(Gym).where(Gym.owner_id == current_user.id)
-    return session.exec(stmt).first()
-
-
 @router.delete(
     "/members/{member_id}/deactivate",
     response_model=APIResponse[dict],
@@ -90,7 +85,10 @@ def deactivate_member_plan_and_remove_from_gym(
     logging.info(f"Set member {member_id} gym_id to None")
 
     try:
+        MemberStatusService(session).refresh(member_id)
         session.commit()
+        invalidate_user_profile(member_id)
+        invalidate_membership_gate(member_id)
         logging.info(f"Committed deactivation for member {member_id}")
     except Exception as e:
         logging.error(f"Failed to commit deactivation for member {member_id}: {e}")
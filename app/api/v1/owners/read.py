@@ -1,11 +1,10 @@
-from fastapi import APIRouter, status, Query
+from fastapi import APIRouter, Request, status, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import select, and_
 from typing import Optional, List
-from app.core.permissions import require_admin, require_any_authenticated
+from app.core.permissions import get_owner_gym, get_role_name, require_admin, require_any_authenticated
 from app.db.db import SessionDep
 from app.models.user import User, RoleEnum
-from app.models.gym import Gym
-from app.models.role import Role
 from app.schemas.user import UserResponse, MemberListResponse, MemberDetailResponse, AvailableMembersListResponse, OGPlanInfoResponse
 from app.schemas.gym import GymResponse
 from app.schemas.plan import PlanResponse, PlanListResponse
@@ -13,6 +12,8 @@ from app.schemas.gym_rule import GymRuleResponse, GymRuleListResponse
 from app.schemas.membership import MembershipResponse
 from app.schemas.announcement import AnnouncementResponse, AnnouncementListResponse
 from app.schemas.dashboard import DashboardKPIsResponse
+from app.schemas.occupancy import OccupancyResponse
+from app.schemas.export import ExportFormat, EXPORT_MEDIA_TYPES
 from app.schemas.payments import PendingPaymentListResponse, GymRevenueResponse
 from app.schemas.response import APIResponse
 from app.utils.response import success_response, failure_response
@@ -23,30 +24,21 @@ from app.services.plan_service import PlanService
 from app.services.membership_service import MembershipService
 from app.services.announcement_service import AnnouncementService
 from app.services.dashboard_service import DashboardService
+from app.services.occupancy_service import OccupancyService, occupancy_event_stream
+from app.services.export_service import export_attendance, export_members, export_payments
 from app.services.attendance_service import AttendanceService
 from app.services.payment import PaymentService
-from app.schemas.attendance import DailyAttendanceResponse
+from app.schemas.attendance import DailyAttendanceResponse, AttendanceHeatmapResponse
+from app.services.gym_hourly_stats_service import GymHourlyStatsService
+from app.core.config import settings
 from datetime import date
 
 router = APIRouter(prefix="/read", tags=["owners"])
 
 
-def get_owner_gym(current_user: User, session: SessionDep) -> Optional[Gym]:
-    """Helper function to get the gym owned by the current admin user"""
-    stmt = select(Gym).where(Gym.owner_id == current_user.id)
-    gym = session.exec(stmt).first()
-    return gym
-
-
 def _get_user_role_name(current_user: User, session: SessionDep) -> str:
     """Get the role name for a user from their role_id"""
-    if not current_user.role_id:
-        return ""
-    stmt = select(Role).where(Role.id == current_user.role_id)
-    role = session.exec(stmt).first()
-    if not role:
-        return ""
-    return role.name
+    return get_role_name(current_user, session) or ""
 
 
 def get_user_gym_id(user: User, session: SessionDep) -> Optional[str]:
@@ -65,30 +57,28 @@ def get_user_gym_id(user: User, session: SessionDep) -> Optional[str]:
 def get_active_og_plan_for_gym(gym_id: str, session: SessionDep) -> Optional[OGPlanInfoResponse]:
     """Get active OG Plan information for a gym"""
     from app.models.gym_subscription import GymSubscription, SubscriptionStatus
+    from app.models.og_plan import OGPlan
 
     if not gym_id:
         return None
 
     today = date.today()
-    subscription_stmt = select(GymSubscription).where(
-        and_(
-            GymSubscription.gym_id == gym_id,
-            GymSubscription.status == SubscriptionStatus.ACTIVE,
-            GymSubscription.end_date >= today
+    row = session.exec(
+        select(GymSubscription, OGPlan)
+        .join(OGPlan, OGPlan.id == GymSubscription.og_plan_id)
+        .where(
+            and_(
+                GymSubscription.gym_id == gym_id,
+                GymSubscription.status == SubscriptionStatus.ACTIVE,
+                GymSubscription.end_date >= today
+            )
         )
-    ).order_by(GymSubscription.end_date.desc())
-    active_subscription = session.exec(subscription_stmt).first()
-
-    if not active_subscription:
-        return None
+        .order_by(GymSubscription.end_date.desc())
+    ).first()
 
-    # Get OG Plan details
-    from app.models.og_plan import OGPlan
-    og_plan_stmt = select(OGPlan).where(OGPlan.id == active_subscription.og_plan_id)
-    og_plan = session.exec(og_plan_stmt).first()
-
-    if not og_plan:
+    if not row:
         return None
+    active_subscription, og_plan = row
 
     return OGPlanInfoResponse(
         og_plan_id=og_plan.id,
@@ -123,8 +113,10 @@ def get_all_members(
     status: Optional[str] = Query("all", description="Filter by status: all, active, expired, new_joins, payment_pending"),
     sort_by: Optional[str] = Query("name_asc", description="Sort by: name_asc, name_desc, newest_joiners, plan_expiry_soonest"),
     pending_fees: Optional[bool] = Query(None, description="Filter members with pending/overdue fees"),
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
     page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page, for infinite scroll"),
+    include_total: bool = Query(True, description="Count the total; infinite-scroll clients can skip it after the first page"),
     session: SessionDep = None,
     current_user: User = require_admin
 ):
@@ -144,7 +136,9 @@ def get_all_members(
         sort_by=sort_by,
         pending_fees=pending_fees,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total
     )
     return success_response(data=members_data, message="Members fetched successfully")
 
@@ -226,15 +220,13 @@ def get_dashboard_kpis(
             message="No gym found for this owner",
             data=None
         )
-    # Get role name from database
-    stmt = select(Role).where(Role.id == current_user.role_id)
-    role = session.exec(stmt).first()
-    if not role:
+    role_name = get_role_name(current_user, session)
+    if not role_name:
         return failure_response(
             message="User role not found",
             data=None
         )
-    role_enum = RoleEnum(role.name)
+    role_enum = RoleEnum(role_name)
 
     dashboard_service = DashboardService(session=session)
     kpis_data = dashboard_service.get_user_kpis(
@@ -245,6 +237,132 @@ def get_dashboard_kpis(
     return success_response(data=kpis_data, message="Dashboard KPIs fetched successfully")
 
 
+@router.get("/occupancy", response_model=APIResponse[OccupancyResponse], status_code=status.HTTP_200_OK)
+def get_gym_occupancy(
+    session: SessionDep = None,
+    current_user: User = require_admin
+):
+    """Get how many members are in the gym right now"""
+    gym = get_owner_gym(current_user, session)
+    if not gym:
+        return failure_response(
+            message="No gym found for this owner",
+            data=None
+        )
+    occupancy_service = OccupancyService(session=session)
+    occupancy = occupancy_service.get_snapshot(gym_id=gym.id)
+    return success_response(data=occupancy, message="Occupancy fetched successfully")
+
+
+@router.get("/occupancy/stream", status_code=status.HTTP_200_OK)
+def stream_gym_occupancy(
+    request: Request,
+    session: SessionDep = None,
+    current_user: User = require_admin
+):
+    """Live occupancy of the owner's gym as a server-sent events stream"""
+    gym = get_owner_gym(current_user, session)
+    if not gym:
+        return failure_response(
+            message="No gym found for this owner",
+            data=None
+        )
+    gym_id = gym.id
+    # The request session is only closed once the stream ends; give its connection back now.
+    # Each snapshot in the stream opens its own short-lived session.
+    session.close()
+    return StreamingResponse(
+        occupancy_event_stream(gym_id=gym_id, is_disconnected=request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _export_response(session: SessionDep, chunks, name: str, export_format: ExportFormat) -> StreamingResponse:
+    # The body is read through its own session (see export_service), and the request session
+    # is only closed once the body ends; give its connection back now
+    session.close()
+    filename = f"{name}-{date.today().isoformat()}.{export_format.value}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/export/members", status_code=status.HTTP_200_OK)
+def export_gym_members(
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv or ndjson"),
+    session: SessionDep = None,
+    current_user: User = require_admin
+):
+    """Download every member of the owner's gym, streamed"""
+    gym = get_owner_gym(current_user, session)
+    if not gym:
+        return failure_response(
+            message="No gym found for this owner",
+            data=None,
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+    return _export_response(session, export_members(gym.id, format), "members", format)
+
+
+@router.get("/export/payments", status_code=status.HTTP_200_OK)
+def export_gym_payments(
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv or ndjson"),
+    start_date: Optional[date] = Query(None, description="YYYY-MM-DD, inclusive"),
+    end_date: Optional[date] = Query(None, description="YYYY-MM-DD, inclusive"),
+    session: SessionDep = None,
+    current_user: User = require_admin
+):
+    """Download the owner's gym payments in a date range, streamed"""
+    gym = get_owner_gym(current_user, session)
+    if not gym:
+        return failure_response(
+            message="No gym found for this owner",
+            data=None,
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+    if start_date and end_date and start_date > end_date:
+        return failure_response(
+            message="start_date must be on or before end_date",
+            data=None,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    return _export_response(
+        session,
+        export_payments(gym.id, format, start_date=start_date, end_date=end_date), "payments", format
+    )
+
+
+@router.get("/export/attendance", status_code=status.HTTP_200_OK)
+def export_gym_attendance(
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv or ndjson"),
+    start_date: Optional[date] = Query(None, description="YYYY-MM-DD, inclusive"),
+    end_date: Optional[date] = Query(None, description="YYYY-MM-DD, inclusive"),
+    session: SessionDep = None,
+    current_user: User = require_admin
+):
+    """Download the owner's gym attendance in a date range, streamed"""
+    gym = get_owner_gym(current_user, session)
+    if not gym:
+        return failure_response(
+            message="No gym found for this owner",
+            data=None,
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+    if start_date and end_date and start_date > end_date:
+        return failure_response(
+            message="start_date must be on or before end_date",
+            data=None,
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    return _export_response(
+        session,
+        export_attendance(gym.id, format, start_date=start_date, end_date=end_date), "attendance", format
+    )
+
+
 @router.get("/gym", response_model=APIResponse[GymResponse], status_code=status.HTTP_200_OK)
 def get_owner_gym_info(
     session: SessionDep = None,
@@ -410,6 +528,26 @@ def get_all_gym_rules(
     return success_response(data=rules_data, message="Gym rules fetched successfully")
 
 
+@router.get("/attendance/heatmap", response_model=APIResponse[AttendanceHeatmapResponse], status_code=status.HTTP_200_OK)
+def get_attendance_heatmap(
+    months: int = Query(12, ge=1, le=settings.attendance_heatmap_max_months, description="Number of calendar months, including the current one"),
+    session: SessionDep = None,
+    current_user: User = require_admin
+):
+    """Get check-ins per weekday and hour of day for the owner's gym, to show its busiest times"""
+    gym = get_owner_gym(current_user, session)
+    if not gym:
+        return failure_response(
+            message="No gym found for this owner",
+            data=None,
+            status_code=status.HTTP_404_NOT_FOUND
+        )
+
+    hourly_stats_service = GymHourlyStatsService(session=session)
+    heatmap = hourly_stats_service.get_heatmap(gym_id=gym.id, months=months)
+    return success_response(data=heatmap, message="Attendance heatmap fetched successfully")
+
+
 @router.get("/attendance", response_model=APIResponse[DailyAttendanceResponse], status_code=status.HTTP_200_OK)
 def get_daily_attendance(
     target_date: Optional[str] = Query(
@@ -425,16 +563,19 @@ def get_daily_attendance(
         None,
         description="Search by member name or username"
     ),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(20, ge=1, le=100, description="Number of items per page"),
     session: SessionDep = None,
     current_user: User = require_admin
 ):
     """
-    Get daily attendance for the owner's gym with date query, filtering, and search.
+    Get daily attendance for the owner's gym with date query, filtering, search, and pagination.
 
     Query Parameters:
     - target_date: Date in YYYY-MM-DD format (defaults to today)
     - filter_status: 'present' or 'absent' to filter members (optional)
     - search: Search query for member name or username (optional)
+    - page / page_size: Pagination of the member list; the summary always covers the whole gym
     """
     gym = get_owner_gym(current_user, session)
     if not gym:
@@ -463,7 +604,9 @@ def get_daily_attendance(
             gym_id=gym.id,
             target_date=query_date,
             filter_status=filter_status,
-            search_query=search
+            search_query=search,
+            page=page,
+            page_size=page_size
         )
         return success_response(
             data=attendance_data,
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, status
 from sqlmodel import select
-from app.core.permissions import require_admin, require_og_or_admin
+from app.core.permissions import require_admin, require_og_or_admin, get_owner_gym
 from app.db.db import SessionDep
 from app.models.user import User
-from app.models.gym import Gym
 from app.models.role import Role as RoleModel
 from app.schemas.user import UserResponse, UserUpdate
 from app.schemas.gym import GymResponse, GymUpdate
@@ -24,12 +23,6 @@ from app.core.exceptions import NotFoundError
 router = APIRouter(prefix="/update", tags=["owners"])
 
 
-def get_owner_gym(current_user: User, session: SessionDep):
-    """Helper function to get the gym owned by the current admin user"""
-    stmt = select(Gym).where(Gym.owner_id == current_user.id)
-    return session.exec(stmt).first()
-
-
 @router.put("/profile", response_model=APIResponse[UserResponse])
 def update_owner_profile(
     user: UserUpdate,
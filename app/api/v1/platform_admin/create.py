@@ -20,6 +20,7 @@ from app.services.user_service import UserService
 from app.services.gym_service import GymService
 from app.services.og_plan_service import OGPlanService
 from app.services.announcement_service import AnnouncementService
+from app.services.access_gate_service import invalidate_subscription_gate
 
 router = APIRouter(prefix="/create", tags=["platform-admin"])
 
@@ -79,6 +80,7 @@ def _create_gym_subscription(
     )
     session.add(gym_subscription)
     session.commit()
+    invalidate_subscription_gate(gym_id)
 
 
 @router.post("/gyms", response_model=APIResponse[GymResponse], status_code=status.HTTP_201_CREATED)
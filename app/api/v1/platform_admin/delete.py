@@ -10,6 +10,7 @@ from app.utils.response import success_response, failure_response
 from app.services.user_service import UserService
 from app.services.gym_service import GymService
 from app.services.og_plan_service import OGPlanService
+from app.services.access_gate_service import invalidate_subscription_gate
 
 router = APIRouter(prefix="/delete", tags=["platform-admin"])
 
@@ -81,6 +82,7 @@ def deactivate_gym_og_plan(
     # Deactivate the subscription
     active_subscription.status = SubscriptionStatus.CANCELLED
     session.commit()
+    invalidate_subscription_gate(gym_id)
     
     return success_response(data=None, message="Gym OG plan subscription deactivated successfully")
 
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, status
+from typing import Dict, List, Optional, Union
+from fastapi import APIRouter, Query, status
+from app.core import metrics
+from app.core.cache import get_cache_stats as collect_cache_stats
 from app.core.permissions import require_og
 from app.db.db import SessionDep
 from app.models.user import User
 from app.schemas.user import UserResponse
 from app.schemas.gym import GymResponse
 from app.schemas.og_plan import OGPlanResponse, OGPlanListResponse
+from app.schemas.cache import AccessGateCacheResponse, CacheStatsResponse
 from app.schemas.response import APIResponse
 from app.utils.response import success_response, failure_response
 from app.services.user_service import UserService
 from app.services.gym_service import GymService
 from app.services.og_plan_service import OGPlanService
+from app.services.access_gate_service import inspect_access_gates
 
 router = APIRouter(prefix="/read", tags=["platform-admin"])
 
@@ -67,3 +72,29 @@ def get_og_plan(
     og_plan_data = og_plan_service.get_og_plan(og_plan_id)
     return success_response(data=og_plan_data, message="OG plan fetched successfully")
 
+
+
+@router.get("/cache-stats", response_model=APIResponse[List[CacheStatsResponse]])
+def get_cache_stats(
+    current_user: User = require_og
+):
+    """Hit/miss counters for the application caches of the worker serving this request"""
+    return success_response(data=collect_cache_stats(), message="Cache stats fetched successfully")
+
+
+@router.get("/access-gates", response_model=APIResponse[AccessGateCacheResponse])
+def get_access_gate_cache(
+    gym_id: Optional[str] = Query(None, description="Gym whose cached subscription gate entry to show"),
+    user_id: Optional[str] = Query(None, description="Member whose cached membership gate entry to show"),
+    current_user: User = require_og
+):
+    """Cached subscription/membership gate entries of the worker serving this request, without refreshing them"""
+    return success_response(data=inspect_access_gates(gym_id, user_id), message="Access gate cache fetched successfully")
+
+
+@router.get("/metrics", response_model=APIResponse[Dict[str, Union[int, float]]])
+def get_metrics(
+    current_user: User = require_og
+):
+    """Counters and gauges (background jobs, caches) recorded by the worker serving this request"""
+    return success_response(data=metrics.snapshot(), message="Metrics fetched successfully")
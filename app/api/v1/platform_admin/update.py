@@ -16,6 +16,7 @@ from app.utils.response import success_response, failure_response
 from app.services.user_service import UserService
 from app.services.gym_service import GymService
 from app.services.og_plan_service import OGPlanService
+from app.services.access_gate_service import invalidate_subscription_gate
 
 router = APIRouter(prefix="/update", tags=["platform-admin"])
 
@@ -85,6 +86,7 @@ def _create_or_update_gym_subscription(
         existing_subscription.end_date = _calculate_subscription_end_date(today, og_plan.billing_cycle)
         existing_subscription.status = SubscriptionStatus.ACTIVE
         session.commit()
+        invalidate_subscription_gate(gym_id)
     else:
         # Create new subscription
         end_date = _calculate_subscription_end_date(today, og_plan.billing_cycle)
@@ -97,6 +99,7 @@ def _create_or_update_gym_subscription(
         )
         session.add(gym_subscription)
         session.commit()
+        invalidate_subscription_gate(gym_id)
 
 
 @router.put("/gym", response_model=APIResponse[GymResponse])
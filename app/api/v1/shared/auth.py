@@ -20,10 +20,10 @@ from app.core.exceptions import (
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register", response_model=APIResponse[LoginResponse], status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, session: SessionDep):
+async def register(user: UserCreate, session: SessionDep):
     try:
         auth_service = AuthService(session=session)
-        user_data = auth_service.register(user)
+        user_data = await auth_service.register(user)
         return success_response(data=user_data, message="User registered successfully")
     except (UserNameAlreadyExistsError, EmailAlreadyExistsError, PhoneAlreadyExistsError, UserAlreadyExistsError) as e:
         return failure_response(
@@ -37,10 +37,10 @@ def register(user: UserCreate, session: SessionDep):
         )
 
 @router.post("/login", response_model=APIResponse[LoginResponse])
-def login(credentials: LoginRequest, session: SessionDep):
+async def login(credentials: LoginRequest, session: SessionDep):
     try:
         auth_service = AuthService(session=session)
-        login_data = auth_service.login(credentials)
+        login_data = await auth_service.login(credentials)
         return success_response(data=login_data, message="Login successful")
     except InvalidCredentialsError as e:
         return failure_response(
@@ -5,9 +5,11 @@ from app.db.db import SessionDep
 from app.models.user import User, Role
 from app.models.payments import Payment
 from app.schemas.payments import PaymentCreate, PaymentResponse
+from app.schemas.attendance import AttendanceBatchRequest, AttendanceBatchResponse
 from app.schemas.response import APIResponse
 from app.utils.response import success_response, failure_response
 from app.services.payment import PaymentService
+from app.services.attendance_service import AttendanceService
 
 router = APIRouter(prefix="/create", tags=["staff"])
 
@@ -56,3 +58,21 @@ def create_payment(
     payment_data = billing_service.create_payment(payment)
     return success_response(data=payment_data, message="Payment created successfully")
 
+
+@router.post("/attendance/batch", response_model=APIResponse[AttendanceBatchResponse], status_code=status.HTTP_200_OK)
+def sync_attendance_batch(
+    batch: AttendanceBatchRequest,
+    session: SessionDep = None,
+    current_user: User = require_admin_or_staff
+):
+    """Upload check-in/check-out events recorded offline by a front-desk kiosk (up to 500 per call)"""
+    gym_id = get_staff_gym(current_user, session)
+    if not gym_id:
+        return failure_response(
+            message="No gym assigned to this staff member",
+            data=None
+        )
+    
+    attendance_service = AttendanceService(session=session)
+    batch_data = attendance_service.ingest_attendance_batch(gym_id=gym_id, events=batch.events)
+    return success_response(data=batch_data, message="Attendance events processed successfully")
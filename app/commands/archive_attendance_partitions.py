@@ -0,0 +1,51 @@
+"""
+Detach old monthly attendance partitions and export them as gzipped CSV.
+
+Run ONLY from local / bastion / CI:
+    python -m app.commands.archive_attendance_partitions [--before YYYY-MM-DD] [--output-dir DIR] [--keep-table] [--dry-run]
+"""
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.db import get_engine
+from app.services.attendance_partition_service import AttendancePartitionService
+from app.utils.datetime import add_months, today_ist
+
+
+def main(argv=None) -> None:
+    default_before = add_months(today_ist(), -settings.attendance_retention_months)
+    parser = argparse.ArgumentParser(description="Archive attendance partitions older than a date")
+    parser.add_argument("--before", type=date.fromisoformat, default=default_before,
+                        help=f"Archive months ending on or before this date, YYYY-MM-DD (default: {default_before})")
+    parser.add_argument("--output-dir", type=Path, default=Path("attendance_archive"),
+                        help="Directory for the <partition>.csv.gz exports (default: ./attendance_archive)")
+    parser.add_argument("--keep-table", action="store_true",
+                        help="Keep the detached partition table instead of dropping it")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the partitions that would be archived")
+    args = parser.parse_args(argv)
+
+    print(f"🗄️  Archiving attendance partitions before {args.before}...", file=sys.stderr)
+    with Session(get_engine()) as session:
+        service = AttendancePartitionService(session=session)
+        if not service.is_partitioned():
+            print("❌ attendance is not partitioned; run the migrations first", file=sys.stderr)
+            sys.exit(1)
+        archived = service.archive_partitions(
+            before=args.before,
+            output_dir=args.output_dir,
+            keep_table=args.keep_table,
+            dry_run=args.dry_run
+        )
+
+    for partition in archived:
+        target = partition.path or "(dry run)"
+        print(f"  {partition.name}: {partition.rows} rows -> {target}", file=sys.stderr)
+    print(f"✅ Archived {len(archived)} partitions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Rebuild the gym_daily_stats rollup from raw attendance rows.
+
+Run ONLY from local / bastion / CI:
+    python -m app.commands.backfill_gym_daily_stats [--gym-id GYM_ID] [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+"""
+import argparse
+import sys
+from datetime import date
+from sqlmodel import Session
+
+from app.db.db import get_engine
+from app.services.gym_daily_stats_service import GymDailyStatsService
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild gym_daily_stats from attendance")
+    parser.add_argument("--gym-id", default=None, help="Only rebuild this gym (default: all gyms)")
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, default=None,
+                        help="First date to rebuild, YYYY-MM-DD (default: oldest date still in attendance)")
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, default=None,
+                        help="Last date to rebuild, YYYY-MM-DD (default: all history)")
+    args = parser.parse_args(argv)
+
+    print("📊 Rebuilding gym_daily_stats...", file=sys.stderr)
+    with Session(get_engine()) as session:
+        try:
+            rows = GymDailyStatsService(session=session).backfill(
+                gym_id=args.gym_id,
+                start_date=args.start_date,
+                end_date=args.end_date
+            )
+        except ValueError as e:
+            print(f"❌ {str(e)}", file=sys.stderr)
+            sys.exit(1)
+    print(f"✅ Wrote {rows} gym_daily_stats rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
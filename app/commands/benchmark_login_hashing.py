@@ -0,0 +1,88 @@
+"""
+Benchmark the password check of login, before and after moving bcrypt to the password pool.
+
+"before" runs the check the way the old sync login route did: inline on the request
+threadpool, holding a thread for the whole hash. "after" awaits verify_password_async.
+While the logins run, cheap sync requests are sent through the same request threadpool
+to show how long other endpoints wait.
+
+No database is needed:
+    python -m app.commands.benchmark_login_hashing [--logins 200] [--concurrency 100] [--rounds 12]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+import bcrypt
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import verify_password_async
+
+PASSWORD = "benchmark-password"
+
+
+async def _run(
+    login: Callable[[], Awaitable[bool]],
+    logins: int,
+    concurrency: int,
+    pings: int
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_login() -> None:
+        async with semaphore:
+            await login()
+
+    async def one_ping(delay: float) -> float:
+        await asyncio.sleep(delay)
+        started = time.perf_counter()
+        await run_in_threadpool(lambda: None)  # a trivial sync endpoint
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    login_tasks = [asyncio.create_task(one_login()) for _ in range(logins)]
+    # Spread the pings over the first part of the run, while logins are queued
+    ping_latencies: List[float] = await asyncio.gather(*[one_ping(i * 0.005) for i in range(pings)])
+    await asyncio.gather(*login_tasks)
+    elapsed = time.perf_counter() - started
+
+    ping_latencies.sort()
+    return {
+        "logins_per_second": round(logins / elapsed, 2),
+        "elapsed_seconds": round(elapsed, 2),
+        "sync_endpoint_p50_ms": round(statistics.median(ping_latencies) * 1000, 1),
+        "sync_endpoint_p95_ms": round(ping_latencies[int(len(ping_latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark login password checks before/after the password pool")
+    parser.add_argument("--logins", type=int, default=200, help="Logins to run in each mode")
+    parser.add_argument("--concurrency", type=int, default=100, help="Logins in flight at once")
+    parser.add_argument("--pings", type=int, default=100, help="Cheap sync requests sent during the logins")
+    parser.add_argument("--rounds", type=int, default=settings.bcrypt_rounds, help="bcrypt cost of the stored hash")
+    args = parser.parse_args(argv)
+
+    hashed = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=args.rounds)).decode("utf-8")
+
+    def check_inline() -> bool:
+        return bcrypt.checkpw(PASSWORD.encode("utf-8"), hashed.encode("utf-8"))
+
+    async def before() -> bool:
+        return await run_in_threadpool(check_inline)
+
+    async def after() -> bool:
+        return await verify_password_async(PASSWORD, hashed)
+
+    print(f"🔐 {args.logins} logins, {args.concurrency} concurrent, bcrypt cost {args.rounds}", file=sys.stderr)
+    for name, login in (("before", before), ("after", after)):
+        result = asyncio.run(_run(login, args.logins, args.concurrency, args.pings))
+        print(f"{name:>6}: " + ", ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Rebuild the gym_hourly_stats heatmap histogram from raw attendance rows.
+
+Run ONLY from local / bastion / CI (once after the table is created, then as needed):
+    python -m app.commands.rebuild_gym_hourly_stats [--gym-id GYM_ID] [--from YYYY-MM-DD]
+"""
+import argparse
+import sys
+from datetime import date
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.db import get_engine
+from app.services.gym_hourly_stats_service import GymHourlyStatsService
+from app.utils.datetime import add_months, today_ist
+
+
+def main(argv=None) -> None:
+    default_start = add_months(today_ist(), -(settings.attendance_heatmap_max_months - 1))
+    parser = argparse.ArgumentParser(description="Rebuild gym_hourly_stats from attendance")
+    parser.add_argument("--gym-id", default=None, help="Only rebuild this gym (default: all gyms)")
+    parser.add_argument("--from", dest="start_month", type=date.fromisoformat, default=default_start,
+                        help=f"Rebuild from the month of this date, YYYY-MM-DD (default: {default_start})")
+    args = parser.parse_args(argv)
+
+    print("📊 Rebuilding gym_hourly_stats...", file=sys.stderr)
+    with Session(get_engine()) as session:
+        rows = GymHourlyStatsService(session=session).rebuild(
+            gym_id=args.gym_id,
+            start_month=args.start_month
+        )
+    print(f"✅ Wrote {rows} gym_hourly_stats rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
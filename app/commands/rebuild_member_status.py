@@ -0,0 +1,27 @@
+"""
+Rebuild the member_status summary from memberships, payments and attendance.
+
+Run ONLY from local / bastion / CI (the migration populates the table; run this if it drifts):
+    python -m app.commands.rebuild_member_status [--gym-id GYM_ID]
+"""
+import argparse
+import sys
+from sqlmodel import Session
+
+from app.db.db import get_engine
+from app.services.member_status_service import MemberStatusService
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild member_status from memberships, payments and attendance")
+    parser.add_argument("--gym-id", default=None, help="Only rebuild this gym (default: all gyms)")
+    args = parser.parse_args(argv)
+
+    print("🧾 Rebuilding member_status...", file=sys.stderr)
+    with Session(get_engine()) as session:
+        rows = MemberStatusService(session=session).rebuild(gym_id=args.gym_id)
+    print(f"✅ Wrote {rows} member_status rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
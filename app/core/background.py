@@ -0,0 +1,140 @@
+"""
+In-process periodic jobs started from the FastAPI lifespan.
+
+Every uvicorn worker starts the scheduler, but each job only runs in the worker
+holding its leader lock (a Postgres session advisory lock). If that worker dies
+the lock is released with its connection and another worker takes over on its
+next tick. On databases without advisory locks (local SQLite) every worker leads.
+Jobs that maintain per-worker state are registered without a lock key and run
+in every worker.
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core import metrics
+from app.db.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """Session-level advisory lock held on a dedicated connection for as long as this worker leads"""
+
+    def __init__(self, key: int):
+        self.key = key
+        self._connection: Optional[Connection] = None
+
+    @property
+    def held(self) -> bool:
+        return self._connection is not None
+
+    def try_acquire(self) -> bool:
+        if self._connection is not None:
+            if self._is_alive():
+                return True
+            self._connection = None
+
+        engine = get_engine()
+        if engine.dialect.name != "postgresql":
+            return True
+
+        connection = engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._connection.commit()
+        except Exception as e:
+            logger.warning(f"Failed to release leader lock {self.key}: {str(e)}")
+        finally:
+            self._connection.close()
+            self._connection = None
+
+    def _is_alive(self) -> bool:
+        try:
+            self._connection.execute(text("SELECT 1"))
+            self._connection.commit()
+            return True
+        except Exception:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            return False
+
+
+class PeriodicJob:
+    """
+    Runs a blocking function every `interval_seconds` in a thread, only while holding
+    the leader lock. Without a lock key the job runs in every worker.
+    """
+
+    def __init__(self, name: str, interval_seconds: int, run: Callable[[], None], lock_key: Optional[int] = None):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.run = run
+        self.lock = LeaderLock(lock_key) if lock_key is not None else None
+
+    async def loop(self) -> None:
+        try:
+            while True:
+                await asyncio.to_thread(self._tick)
+                await asyncio.sleep(self.interval_seconds)
+        finally:
+            if self.lock is not None:
+                await asyncio.to_thread(self.lock.release)
+
+    def _tick(self) -> None:
+        try:
+            if self.lock is not None and not self.lock.try_acquire():
+                return
+            started = time.monotonic()
+            self.run()
+            metrics.increment(f"{self.name}.runs_total")
+            metrics.set_gauge(f"{self.name}.last_run_duration_ms", round((time.monotonic() - started) * 1000, 1))
+            metrics.set_gauge(f"{self.name}.last_run_at", time.time())
+        except Exception as e:
+            metrics.increment(f"{self.name}.failures_total")
+            logger.exception(f"Background job {self.name} failed: {str(e)}")
+
+
+_jobs: List[PeriodicJob] = []
+_tasks: List[asyncio.Task] = []
+
+
+def register_job(job: PeriodicJob) -> None:
+    """Add a job to be started with start_background_jobs()"""
+    _jobs.append(job)
+
+
+def start_background_jobs() -> None:
+    """Schedule all registered jobs on the running event loop"""
+    for job in _jobs:
+        _tasks.append(asyncio.create_task(job.loop(), name=job.name))
+        logger.info(f"Started background job {job.name} (every {job.interval_seconds}s)")
+
+
+async def stop_background_jobs() -> None:
+    """Cancel running jobs and release their leader locks"""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
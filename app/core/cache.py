@@ -0,0 +1,208 @@
+"""
+Small TTL caches for hot, cheap-to-invalidate read paths.
+
+Entries live in a process-local dict by default. Set CACHE_BACKEND_URL
+(e.g. redis://host:6379/0) to share entries between uvicorn workers; the
+shared backend needs the optional `redis` package. Values are stored as
+JSON so every backend sees the same representation.
+"""
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Minimal string key/value store with per-key expiry"""
+
+    name: str = "unknown"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Process-local backend; every worker keeps its own entries"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000):
+        self._max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self._max_entries:
+                self._evict()
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the oldest ones until there is room. Caller holds the lock."""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        while len(self._entries) >= self._max_entries:
+            del self._entries[next(iter(self._entries))]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared backend so all workers see the same entries and invalidations"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND_URL is set but the 'redis' package is not installed") from e
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self._client.set(key, value, ex=ttl_seconds)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._client.delete(*keys)
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_cache_backend() -> CacheBackend:
+    """Return the process-wide cache backend, creating it from settings on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.cache_backend_url:
+                    _backend = RedisCacheBackend(settings.cache_backend_url)
+                else:
+                    _backend = InMemoryCacheBackend()
+    return _backend
+
+
+_registry: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    Namespaced JSON cache on top of the configured backend, with hit/miss counters.
+
+    Backend failures are logged and treated as misses so a cache outage never fails a request.
+    Counters are per process.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int, backend: Optional[CacheBackend] = None):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self._backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        _registry[namespace] = self
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend or get_cache_backend()
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.backend.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Cache get failed for {self.namespace}: {str(e)}")
+            raw = None
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return json.loads(raw) if raw is not None else None
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Like get, but without counting a hit or miss (for inspection)"""
+        try:
+            raw = self.backend.get(self._key(key))
+        except Exception as e:
+            logger.warning(f"Cache get failed for {self.namespace}: {str(e)}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        """Store a value for the cache's TTL, or for `ttl_seconds` if that is shorter"""
+        if ttl_seconds is not None:
+            ttl_seconds = min(ttl_seconds, self.ttl_seconds)
+        else:
+            ttl_seconds = self.ttl_seconds
+        if ttl_seconds <= 0:
+            return
+        try:
+            self.backend.set(self._key(key), json.dumps(value), ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Cache set failed for {self.namespace}: {str(e)}")
+
+    def invalidate(self, *keys: str) -> None:
+        try:
+            self.backend.delete(*[self._key(key) for key in keys])
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed for {self.namespace}: {str(e)}")
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "namespace": self.namespace,
+                "backend": self.backend.name,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def get_cache_stats() -> List[Dict[str, Any]]:
+    """Counters for every cache created in this process"""
+    return [cache.stats() for cache in _registry.values()]
@@ -42,6 +42,45 @@ class Settings(BaseSettings):
     cloudinary_cloud_api_key: Optional[str] = None
     cloudinary_cloud_api_secret: Optional[str] = None
 
+    # Caching
+    cache_backend_url: Optional[str] = Field(None, env="CACHE_BACKEND_URL")
+    dashboard_kpi_cache_ttl_seconds: int = 30
+    user_profile_cache_ttl_seconds: int = 30
+    access_gate_cache_ttl_seconds: int = 300
+    permission_matrix_ttl_seconds: int = 300
+    verified_token_cache_max_entries: int = 10000
+
+    # Background jobs
+    background_jobs_enabled: bool = True
+    auto_checkout_after_hours: int = 4
+    auto_checkout_interval_seconds: int = 900
+    occupancy_reconcile_interval_seconds: int = 60
+    attendance_partition_interval_seconds: int = 86400
+    gym_hourly_stats_rebuild_interval_seconds: int = 86400
+    gym_hourly_stats_rebuild_months: int = 2
+
+    # Attendance partitions
+    attendance_partition_months_ahead: int = 3
+    attendance_retention_months: int = 24
+
+    # Attendance heatmap
+    attendance_heatmap_max_months: int = 24
+
+    # Bulk member import
+    member_import_max_rows: int = 5000
+    member_import_batch_size: int = 500
+
+    # Password hashing
+    bcrypt_rounds: int = 12  # existing hashes with another cost are upgraded on login
+    password_hash_workers: int = 0  # concurrent bcrypt hashes; 0 = one per CPU
+
+    # Streaming exports: rows fetched per round trip from the server-side cursor
+    export_batch_size: int = 1000
+
+    # Live occupancy stream
+    occupancy_stream_poll_seconds: float = 1.0
+    occupancy_stream_heartbeat_seconds: int = 15
+
     model_config = SettingsConfigDict(
         env_file=".env",
         extra="ignore"
@@ -1,9 +1,15 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session, select
 
-from app.core.security import decode_token
+from app.core.security import decode_token, token_issued_after
 from app.db.db import get_session
+from app.models.gym import Gym
+from app.models.role import Role
 from app.models.user import User
 
 
@@ -11,6 +17,51 @@ from app.models.user import User
 security = HTTPBearer()
 
 
+@dataclass
+class Principal:
+    """
+    The authenticated user with their role and owned gym, loaded in one query per
+    request by get_current_user. Subscription and membership state for the access
+    gate comes from AccessGateService's caches.
+    """
+    user: User
+    role_name: Optional[str]
+    # A gym owned by the user (admins), if any
+    owned_gym: Optional[Gym]
+
+    @property
+    def gym_id(self) -> Optional[str]:
+        """The user's gym, or for owners the gym they own"""
+        return self.user.gym_id or (self.owned_gym.id if self.owned_gym else None)
+
+
+# Set by get_current_user for the rest of the request (dependencies and the route itself)
+_current_principal: ContextVar[Optional[Principal]] = ContextVar("current_principal", default=None)
+
+
+def current_principal(user: User) -> Optional[Principal]:
+    """The principal resolved for this request, if it belongs to `user`"""
+    principal = _current_principal.get()
+    if principal is None or principal.user.id != user.id:
+        return None
+    return principal
+
+
+def load_principal(session: Session, user_id: str) -> Optional[Principal]:
+    row = session.exec(
+        select(User, Role.name, Gym)
+        .join(Role, Role.id == User.role_id, isouter=True)
+        .join(Gym, Gym.owner_id == User.id, isouter=True)
+        .where(User.id == user_id)
+        .limit(1)
+    ).first()
+    if not row:
+        return None
+
+    user, role_name, owned_gym = row
+    return Principal(user=user, role_name=role_name, owned_gym=owned_gym)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: Session = Depends(get_session),
@@ -30,10 +81,14 @@ async def get_current_user(
     if not user_id:
         raise credentials_exception
 
-    stmt = select(User).where(User.id == user_id)
-    user = session.exec(stmt).first()
+    principal = load_principal(session, user_id)
+
+    if not principal:
+        raise credentials_exception
 
-    if not user:
+    # Tokens issued before a password reset or deactivation stay signed until `exp`
+    if not token_issued_after(payload, principal.user.tokens_valid_after):
         raise credentials_exception
 
-    return user
+    _current_principal.set(principal)
+    return principal.user
@@ -0,0 +1,31 @@
+"""
+Process-local counters and gauges for background jobs and hot paths.
+
+Values are per worker and reset on restart; they are exposed through the
+platform-admin metrics endpoint and logged by the jobs that record them.
+"""
+import threading
+from typing import Dict, Union
+
+Number = Union[int, float]
+
+_values: Dict[str, Number] = {}
+_lock = threading.Lock()
+
+
+def increment(name: str, value: Number = 1) -> None:
+    """Add to a counter"""
+    with _lock:
+        _values[name] = _values.get(name, 0) + value
+
+
+def set_gauge(name: str, value: Number) -> None:
+    """Overwrite a gauge with its latest value"""
+    with _lock:
+        _values[name] = value
+
+
+def snapshot() -> Dict[str, Number]:
+    """Copy of all metrics recorded in this process"""
+    with _lock:
+        return dict(sorted(_values.items()))
@@ -1,14 +1,23 @@
+import asyncio
+import logging
+import threading
+import time
+from types import MappingProxyType
 from fastapi import HTTPException, status, Depends
 from fastapi.responses import JSONResponse
 from sqlmodel import Session, select
-from typing import List
+from typing import Dict, FrozenSet, Mapping, Optional, Set
+from app.core import metrics
+from app.core.config import settings
 from app.core.dependencies import get_current_user
-from app.db.db import get_session
+from app.db.db import get_engine, get_session
 from app.models.user import User
 from app.models.permission import Permission
 from app.models.role_permission import RolePermission
 from app.utils.response import failure_response
 
+logger = logging.getLogger(__name__)
+
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Ensure the user is active"""
@@ -27,25 +36,94 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
-def get_user_permissions(user: User, session: Session) -> List[str]:
+# Role id -> permission names. The matrix is tiny and changes only with seed data or
+# migrations, so it is held in memory and every check is a set lookup without a query.
+_permission_matrix: Mapping[str, FrozenSet[str]] = MappingProxyType({})
+_permission_matrix_loaded_at: Optional[float] = None
+_permission_matrix_version = 0
+_permission_matrix_loaded_version = -1
+_permission_matrix_lock = threading.Lock()
+
+
+def load_permission_matrix(session: Session) -> Mapping[str, FrozenSet[str]]:
+    """Read every role's permissions from the database and make them the current matrix"""
+    with _permission_matrix_lock:
+        version = _permission_matrix_version
+
+    stmt = (
+        select(RolePermission.role_id, Permission.name)
+        .join(Permission, Permission.id == RolePermission.permission_id)
+    )
+    names_by_role: Dict[str, Set[str]] = {}
+    for role_id, permission_name in session.exec(stmt):
+        names_by_role.setdefault(role_id, set()).add(permission_name)
+    matrix = MappingProxyType({role_id: frozenset(names) for role_id, names in names_by_role.items()})
+
+    global _permission_matrix, _permission_matrix_loaded_at, _permission_matrix_loaded_version
+    with _permission_matrix_lock:
+        _permission_matrix = matrix
+        _permission_matrix_loaded_at = time.monotonic()
+        _permission_matrix_loaded_version = version
+    metrics.increment("permission_matrix.loads_total")
+    metrics.set_gauge("permission_matrix.roles", len(matrix))
+    return matrix
+
+
+def warm_permission_matrix() -> None:
+    """Load the matrix at startup. On failure the first permission check loads it instead."""
+    try:
+        with Session(get_engine()) as session:
+            load_permission_matrix(session)
+    except Exception as e:
+        logger.warning(f"Could not load the permission matrix at startup: {str(e)}")
+
+
+def bump_permission_matrix_version() -> None:
+    """Mark the matrix stale so the next check reloads it. Call after changing role permissions."""
+    global _permission_matrix_version
+    with _permission_matrix_lock:
+        _permission_matrix_version += 1
+
+
+def _fresh_permission_matrix() -> Optional[Mapping[str, FrozenSet[str]]]:
+    """The current matrix, or None if the version was bumped or it is older than the TTL"""
+    with _permission_matrix_lock:
+        stale = (
+            _permission_matrix_loaded_at is None
+            or _permission_matrix_loaded_version != _permission_matrix_version
+            or time.monotonic() - _permission_matrix_loaded_at >= settings.permission_matrix_ttl_seconds
+        )
+        return None if stale else _permission_matrix
+
+
+def get_permission_matrix(session: Session) -> Mapping[str, FrozenSet[str]]:
+    """The current matrix, reloaded first if the version was bumped or it is older than the TTL"""
+    matrix = _fresh_permission_matrix()
+    if matrix is None:
+        return load_permission_matrix(session)
+    return matrix
+
+
+async def get_permission_matrix_async(session: Session) -> Mapping[str, FrozenSet[str]]:
+    """get_permission_matrix for async dependencies: a reload runs in a worker thread, off the event loop"""
+    matrix = _fresh_permission_matrix()
+    if matrix is None:
+        return await asyncio.to_thread(load_permission_matrix, session)
+    return matrix
+
+
+def get_user_permissions(user: User, session: Session) -> FrozenSet[str]:
     """
     Get all permission names for a user based on their role
     
     Args:
         user: The user object
-        session: Database session
+        session: Database session, only used when the matrix needs (re)loading
     
     Returns:
-        List of permission names (e.g., ['user_create', 'user_get_all'])
+        Set of permission names (e.g., {'user_create', 'user_get_all'})
     """
-    # Get all permissions for the user's role
-    stmt = (
-        select(Permission.name)
-        .join(RolePermission, Permission.id == RolePermission.permission_id)
-        .where(RolePermission.role_id == user.role_id)
-    )
-    result = session.exec(stmt)
-    return [perm for perm in result]
+    return get_permission_matrix(session).get(user.role_id, frozenset())
 
 
 def require_permission(permission_name: str):
@@ -66,7 +144,7 @@ def require_permission(permission_name: str):
         session: Session = Depends(get_session)
     ) -> User:
         # Get user permissions
-        user_permissions = get_user_permissions(current_user, session)
+        user_permissions = (await get_permission_matrix_async(session)).get(current_user.role_id, frozenset())
         
         if permission_name not in user_permissions:
             raise HTTPException(
@@ -95,7 +173,7 @@ def require_any_permission(*permission_names: str):
         current_user: User = Depends(get_current_active_user),
         session: Session = Depends(get_session)
     ) -> User:
-        user_permissions = get_user_permissions(current_user, session)
+        user_permissions = (await get_permission_matrix_async(session)).get(current_user.role_id, frozenset())
         
         if not any(perm in user_permissions for perm in permission_names):
             raise HTTPException(
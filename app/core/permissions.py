@@ -1,9 +1,9 @@
 from fastapi import HTTPException, status, Depends
-from sqlmodel import select, Session, and_
+from sqlmodel import select, Session
 from datetime import date, timedelta
-from app.core.dependencies import get_current_user, get_session
+from typing import Optional
+from app.core.dependencies import current_principal, get_current_user, get_session, load_principal
 from app.models.gym import Gym
-from app.models.gym_subscription import GymSubscription, SubscriptionStatus
 from app.models.role import Role
 from app.models.user import RoleEnum, User
 from app.utils.fcm_notification import logger
@@ -25,8 +25,14 @@ async def get_current_active_user(
             detail="Inactive user",
         )
 
-    role = session.get(Role, current_user.role_id) if current_user.role_id else None
-    role_name = role.name if role else None
+    # Role and owned gym were loaded with the user; subscription and membership state is cached
+    principal = current_principal(current_user) or load_principal(session, current_user.id)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    role_name = principal.role_name
 
     if role_name in {RoleEnum.OG.value, "PLATFORM_ADMIN", "OG"}:
         return current_user
@@ -35,27 +41,13 @@ async def get_current_active_user(
     grace_days = getattr(settings, "subscription_grace_period_days", 5)
     grace_period_start = today - timedelta(days=grace_days)
 
-    gym_id = current_user.gym_id
-    if not gym_id:
-        gym = session.exec(
-            select(Gym).where(Gym.owner_id == current_user.id)
-        ).first()
-        gym_id = gym.id if gym else None
-
-    if gym_id:
-        subscription = session.exec(
-            select(GymSubscription)
-            .where(
-                and_(
-                    GymSubscription.gym_id == gym_id,
-                    GymSubscription.status == SubscriptionStatus.ACTIVE,
-                    GymSubscription.end_date >= grace_period_start,
-                )
-            )
-            .order_by(GymSubscription.end_date.desc())
-        ).first()
+    from app.services.access_gate_service import AccessGateService
+    access_gate = AccessGateService(session)
+
+    if principal.gym_id:
+        subscription_end_date = access_gate.get_subscription_end_date(principal.gym_id)
 
-        if not subscription:
+        if subscription_end_date is None or subscription_end_date < grace_period_start:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail={
@@ -64,8 +56,8 @@ async def get_current_active_user(
                 },
             )
 
-        if subscription.end_date < today:
-            days_expired = (today - subscription.end_date).days
+        if subscription_end_date < today:
+            days_expired = (today - subscription_end_date).days
             if days_expired > grace_days:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -81,22 +73,13 @@ async def get_current_active_user(
 
     # 5️⃣ Member membership check
     if role_name == "MEMBER" and current_user.gym_id:
-        from app.models.membership import Membership
-
-        membership = session.exec(
-            select(Membership)
-            .where(
-                and_(
-                    Membership.user_id == current_user.id,
-                    Membership.gym_id == current_user.gym_id,
-                    Membership.status == "active",
-                    Membership.end_date >= grace_period_start,
-                )
-            )
-            .order_by(Membership.end_date.desc())
-        ).first()
+        membership_status, membership_end_date = access_gate.get_membership(current_user.id, current_user.gym_id)
 
-        if not membership:
+        if (
+            membership_status != "active"
+            or membership_end_date is None
+            or membership_end_date < grace_period_start
+        ):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail={
@@ -105,8 +88,8 @@ async def get_current_active_user(
                 },
             )
 
-        if membership.end_date < today:
-            days_expired = (today - membership.end_date).days
+        if membership_end_date < today:
+            days_expired = (today - membership_end_date).days
             if days_expired > grace_days:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -122,6 +105,23 @@ async def get_current_active_user(
 
     return current_user
 
+def get_role_name(current_user: User, session: Session) -> Optional[str]:
+    """The user's role name, taken from the request principal when there is one"""
+    principal = current_principal(current_user)
+    if principal is not None:
+        return principal.role_name
+    role = session.get(Role, current_user.role_id) if current_user.role_id else None
+    return role.name if role else None
+
+
+def get_owner_gym(current_user: User, session: Session) -> Optional[Gym]:
+    """The gym owned by the user, taken from the request principal when there is one"""
+    principal = current_principal(current_user)
+    if principal is not None and principal.owned_gym is not None:
+        return principal.owned_gym
+    return session.exec(select(Gym).where(Gym.owner_id == current_user.id)).first()
+
+
 def _get_user_role_name(current_user: User, session: Session) -> str:
     """Get the role name for a user from their role_id"""
     if not current_user.role_id:
@@ -129,14 +129,13 @@ def _get_user_role_name(current_user: User, session: Session) -> str:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="User has no role assigned"
         )
-    stmt = select(Role).where(Role.id == current_user.role_id)
-    role = session.exec(stmt).first()
-    if not role:
+    role_name = get_role_name(current_user, session)
+    if not role_name:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="User role not found"
         )
-    return role.name
+    return role_name
 
 
 def require_roles(*allowed_roles: RoleEnum):
@@ -181,7 +180,11 @@ def check_gym_ownership(gym_id: str, current_user: User, session: Session) -> No
     user_role_name = _get_user_role_name(current_user, session)
     if user_role_name == RoleEnum.OG.value:
         return  # OG can access any gym
-    
+
+    principal = current_principal(current_user)
+    if principal is not None and principal.owned_gym is not None and principal.owned_gym.id == gym_id:
+        return
+
     stmt = select(Gym).where(Gym.id == gym_id, Gym.owner_id == current_user.id)
     gym = session.exec(stmt).first()
     if not gym:
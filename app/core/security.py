@@ -1,12 +1,19 @@
+import asyncio
+import calendar
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import List, Optional, Dict, Sequence, Set, Tuple
 
 import bcrypt
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.core import config
+from app.core import config, metrics
 
 
 # -----------------------------
@@ -18,20 +25,71 @@ security = HTTPBearer()
 # -----------------------------
 # Password Utilities
 # -----------------------------
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# bcrypt releases the GIL while hashing, so hashes run in parallel on plain threads.
+# All hashing goes through one bounded pool: at most password_hash_workers hashes use
+# the CPU at once, and async callers wait on it without holding a request thread.
+_password_pool: Optional[ThreadPoolExecutor] = None
+_password_pool_lock = threading.Lock()
+
+
+def _get_password_pool() -> ThreadPoolExecutor:
+    global _password_pool
+    if _password_pool is None:
+        with _password_pool_lock:
+            if _password_pool is None:
+                _password_pool = ThreadPoolExecutor(
+                    max_workers=config.settings.password_hash_workers or os.cpu_count() or 1,
+                    thread_name_prefix="bcrypt"
+                )
+    return _password_pool
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         plain_password.encode("utf-8"),
         hashed_password.encode("utf-8"),
     )
 
 
-def get_password_hash(password: str) -> str:
+def _hashpw(password: str) -> str:
     return bcrypt.hashpw(
         password.encode("utf-8"),
-        bcrypt.gensalt(),
+        bcrypt.gensalt(rounds=config.settings.bcrypt_rounds),
     ).decode("utf-8")
 
 
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _get_password_pool().submit(_checkpw, plain_password, hashed_password).result()
+
+
+def get_password_hash(password: str) -> str:
+    return _get_password_pool().submit(_hashpw, password).result()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password for async routes; the event loop and request threads stay free meanwhile"""
+    return await asyncio.wrap_future(_get_password_pool().submit(_checkpw, plain_password, hashed_password))
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash for async routes"""
+    return await asyncio.wrap_future(_get_password_pool().submit(_hashpw, password))
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash was made with a different cost than settings.bcrypt_rounds"""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != config.settings.bcrypt_rounds
+
+
+def hash_passwords(passwords: Sequence[str]) -> List[str]:
+    """Hash many passwords in parallel on the password pool (bulk imports), in input order"""
+    return list(_get_password_pool().map(_hashpw, passwords))
+
+
 # -----------------------------
 # Token Creation
 # -----------------------------
@@ -48,7 +106,7 @@ def create_access_token(
         + timedelta(minutes=config.settings.access_token_expire_minutes)
     )
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
 
     return jwt.encode(
         to_encode,
@@ -73,6 +131,7 @@ def create_refresh_token(
     to_encode.update(
         {
             "exp": expire,
+            "iat": datetime.utcnow(),
             "type": "refresh",
         }
     )
@@ -84,19 +143,139 @@ def create_refresh_token(
     )
 
 
+# -----------------------------
+# Verified Token Cache
+# -----------------------------
+# Access tokens live for weeks and clients send the same one on every call, so the
+# claims of a verified token are kept in a per-process LRU until the token's `exp`.
+# Only successfully verified tokens are cached; invalid ones are re-checked each time.
+_verified_tokens: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+# User id (`sub`) -> cached tokens of that user, for revocation
+_verified_tokens_by_user: Dict[str, Set[str]] = {}
+_verified_tokens_lock = threading.Lock()
+_verified_token_stats = {"hits": 0, "misses": 0, "verify_seconds": 0.0}
+
+
+def _forget_token(token: str) -> None:
+    """Drop a cached token and its user index entry. Caller holds the lock."""
+    entry = _verified_tokens.pop(token, None)
+    if entry is None:
+        return
+    user_id = entry[1].get("sub")
+    tokens = _verified_tokens_by_user.get(user_id)
+    if tokens is not None:
+        tokens.discard(token)
+        if not tokens:
+            del _verified_tokens_by_user[user_id]
+
+
+def _get_verified_token(token: str) -> Optional[Dict]:
+    with _verified_tokens_lock:
+        entry = _verified_tokens.get(token)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            _forget_token(token)
+            metrics.set_gauge("token_cache.entries", len(_verified_tokens))
+            return None
+        _verified_tokens.move_to_end(token)
+        return payload
+
+
+def _set_verified_token(token: str, payload: Dict) -> None:
+    expires_at = payload.get("exp")
+    if not isinstance(expires_at, (int, float)):
+        return
+    evicted = 0
+    with _verified_tokens_lock:
+        _forget_token(token)
+        while _verified_tokens and len(_verified_tokens) >= config.settings.verified_token_cache_max_entries:
+            _forget_token(next(iter(_verified_tokens)))
+            evicted += 1
+        _verified_tokens[token] = (float(expires_at), payload)
+        user_id = payload.get("sub")
+        if user_id:
+            _verified_tokens_by_user.setdefault(user_id, set()).add(token)
+        size = len(_verified_tokens)
+    if evicted:
+        metrics.increment("token_cache.evictions_total", evicted)
+    metrics.set_gauge("token_cache.entries", size)
+
+
+def _record_token_lookup(hit: bool, seconds: float) -> None:
+    """Count a lookup; a hit is credited with the average verify time of misses, less its own time"""
+    with _verified_tokens_lock:
+        stats = _verified_token_stats
+        if hit:
+            stats["hits"] += 1
+            saved = stats["verify_seconds"] / stats["misses"] - seconds if stats["misses"] else 0.0
+        else:
+            stats["misses"] += 1
+            stats["verify_seconds"] += seconds
+            saved = 0.0
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = round(stats["hits"] / lookups, 4)
+    metrics.increment("token_cache.hits_total" if hit else "token_cache.misses_total")
+    metrics.set_gauge("token_cache.hit_rate", hit_rate)
+    if saved > 0:
+        metrics.increment("token_cache.saved_seconds_total", saved)
+
+
+def revoke_user_tokens(*user_ids: Optional[str]) -> None:
+    """
+    Drop this process's cached claims of every token issued to these users. This only
+    evicts the cache: the tokens themselves are turned away by token_issued_after(),
+    checked against User.tokens_valid_after on every request on every worker. Call after
+    committing a password reset, deactivation or deletion that set tokens_valid_after.
+    """
+    revoked = 0
+    with _verified_tokens_lock:
+        for user_id in user_ids:
+            for token in list(_verified_tokens_by_user.get(user_id, ())):
+                _forget_token(token)
+                revoked += 1
+        size = len(_verified_tokens)
+    if revoked:
+        metrics.increment("token_cache.revocations_total", revoked)
+    metrics.set_gauge("token_cache.entries", size)
+
+
 # -----------------------------
 # Token Decode
 # -----------------------------
+def token_issued_after(payload: Dict, valid_after: Optional[datetime]) -> bool:
+    """
+    Whether a token was issued no earlier than `valid_after` (naive UTC), the user's
+    tokens_valid_after. `iat` has whole-second resolution, so a token issued in the same
+    second still passes; tokens without `iat` are rejected once valid_after is set.
+    """
+    if valid_after is None:
+        return True
+    issued_at = payload.get("iat")
+    if not isinstance(issued_at, (int, float)):
+        return False
+    return issued_at >= calendar.timegm(valid_after.utctimetuple())
+
+
 def decode_token(token: str) -> Optional[Dict]:
+    started = time.perf_counter()
+    payload = _get_verified_token(token)
+    if payload is not None:
+        _record_token_lookup(hit=True, seconds=time.perf_counter() - started)
+        return dict(payload)
+
     try:
         payload = jwt.decode(
             token,
             config.settings.secret_key,
             algorithms=[config.settings.algorithm],
         )
-        return payload
     except JWTError:
         return None
+    _record_token_lookup(hit=False, seconds=time.perf_counter() - started)
+    _set_verified_token(token, payload)
+    return dict(payload)
 
 
 # -----------------------------
@@ -19,6 +19,10 @@ from app.models.permission import Permission
 from app.models.role import Role
 from app.models.role_permission import RolePermission
 from app.models.password_reset_token import PasswordResetToken
+from app.models.gym_daily_stats import GymDailyStats
+from app.models.attendance_sync_event import AttendanceSyncEvent
+from app.models.gym_hourly_stats import GymHourlyStats
+from app.models.member_status import MemberStatus
 
 
 _engine: Engine | None = None
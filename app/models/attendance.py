@@ -1,6 +1,7 @@
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel, Relationship
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from uuid import uuid4
 
 from app.models.gym import Gym
@@ -9,6 +10,20 @@ from app.models.user import User
 
 class Attendance(SQLModel, table=True):
     __tablename__ = "attendance"
+    # On Postgres the table is range-partitioned by local_date, one partition per month,
+    # with primary key (id, local_date); see app.services.attendance_partition_service
+    __table_args__ = (
+        Index("ix_attendance_gym_id_local_date", "gym_id", "local_date"),
+        Index("ix_attendance_user_id_local_date", "user_id", "local_date"),
+        # Open check-ins only: stays small no matter how much history a member has
+        Index(
+            "ix_attendance_open_user_id_local_date",
+            "user_id",
+            "local_date",
+            "check_in_at",
+            postgresql_where=text("check_out_at IS NULL")
+        ),
+    )
     
     id: str = Field(
         description="The attendance record id",
@@ -16,6 +31,7 @@ class Attendance(SQLModel, table=True):
         default_factory=lambda: str(uuid4())
     )
     check_in_at: datetime = Field(description="The check-in timestamp")
+    local_date: date = Field(description="The gym-local (IST) calendar date of the check-in")
     check_out_at: Optional[datetime] = Field(
         description="The check-out timestamp",
         nullable=True
@@ -0,0 +1,27 @@
+from sqlmodel import Field, SQLModel
+from typing import Optional
+from datetime import datetime
+
+
+class AttendanceSyncEvent(SQLModel, table=True):
+    """Client event ids already applied by the kiosk batch endpoint, so replays are idempotent"""
+    __tablename__ = "attendance_sync_events"
+
+    gym_id: str = Field(
+        description="The gym id",
+        foreign_key="gyms.id",
+        primary_key=True
+    )
+    client_event_id: str = Field(
+        description="The event id generated by the kiosk",
+        primary_key=True
+    )
+    event_type: str = Field(description="The event type: check_in or check_out")
+    attendance_id: Optional[str] = Field(
+        description="The attendance record the event was applied to",
+        nullable=True
+    )
+    created_at: datetime = Field(
+        description="When the event was applied",
+        default_factory=datetime.now
+    )
@@ -1,6 +1,6 @@
 from sqlmodel import Field, SQLModel, Relationship
 from typing import Optional, List, TYPE_CHECKING
-from datetime import datetime
+from datetime import datetime, time
 from uuid import uuid4
 
 
@@ -50,6 +50,10 @@ class Gym(SQLModel, table=True):
         description="The gym's opening hours",
         nullable=True
     )
+    closing_time: Optional[time] = Field(
+        description="The gym's daily closing time (IST); sessions still open then are checked out automatically",
+        nullable=True
+    )
     is_active: bool = Field(
         description="Whether the gym is active",
         default=True
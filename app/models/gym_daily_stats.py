@@ -0,0 +1,33 @@
+from sqlmodel import Field, SQLModel
+from datetime import date, datetime
+
+
+class GymDailyStats(SQLModel, table=True):
+    """Per-gym, per-day attendance rollup maintained alongside attendance writes"""
+    __tablename__ = "gym_daily_stats"
+
+    gym_id: str = Field(
+        description="The gym id",
+        foreign_key="gyms.id",
+        primary_key=True
+    )
+    local_date: date = Field(
+        description="The gym-local (IST) calendar date",
+        primary_key=True
+    )
+    check_ins: int = Field(
+        description="Number of check-ins on this date",
+        default=0
+    )
+    check_outs: int = Field(
+        description="Number of check-outs on this date",
+        default=0
+    )
+    unique_members: int = Field(
+        description="Number of distinct members who checked in on this date",
+        default=0
+    )
+    updated_at: datetime = Field(
+        description="When this rollup row was last updated",
+        default_factory=datetime.now
+    )
@@ -0,0 +1,33 @@
+from sqlmodel import Field, SQLModel
+from datetime import date, datetime
+
+
+class GymHourlyStats(SQLModel, table=True):
+    """Per-gym check-in histogram by month, weekday and hour, maintained alongside attendance writes"""
+    __tablename__ = "gym_hourly_stats"
+
+    gym_id: str = Field(
+        description="The gym id",
+        foreign_key="gyms.id",
+        primary_key=True
+    )
+    month: date = Field(
+        description="First day of the gym-local (IST) calendar month",
+        primary_key=True
+    )
+    weekday: int = Field(
+        description="Day of the week of the check-in (0 = Monday ... 6 = Sunday)",
+        primary_key=True
+    )
+    hour: int = Field(
+        description="Hour of the day of the check-in (IST, 0-23)",
+        primary_key=True
+    )
+    check_ins: int = Field(
+        description="Number of check-ins in this slot",
+        default=0
+    )
+    updated_at: datetime = Field(
+        description="When this histogram row was last updated",
+        default_factory=datetime.now
+    )
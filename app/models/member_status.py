@@ -0,0 +1,59 @@
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+from typing import Optional
+from datetime import date, datetime
+
+
+class MemberStatus(SQLModel, table=True):
+    """
+    One row per gym member summarizing their plan and payments, kept in sync by the
+    membership, payment, user and attendance services (see MemberStatusService)
+    """
+    __tablename__ = "member_status"
+    __table_args__ = (
+        Index("ix_member_status_gym_id_end_date", "gym_id", "end_date"),
+    )
+
+    user_id: str = Field(
+        description="The member user id",
+        foreign_key="users.id",
+        primary_key=True
+    )
+    gym_id: str = Field(
+        description="The gym id",
+        foreign_key="gyms.id",
+        primary_key=True
+    )
+    current_membership_id: Optional[str] = Field(
+        description="The member's active membership with the latest end date, else their latest membership",
+        default=None,
+        nullable=True
+    )
+    plan_id: Optional[str] = Field(
+        description="The plan of the current membership",
+        default=None,
+        nullable=True
+    )
+    membership_status: Optional[str] = Field(
+        description="The status of the current membership",
+        default=None,
+        nullable=True
+    )
+    end_date: Optional[date] = Field(
+        description="The end date of the current membership",
+        default=None,
+        nullable=True
+    )
+    has_pending_payment: bool = Field(
+        description="Whether the member has a payment awaiting verification",
+        default=False
+    )
+    last_check_in: Optional[datetime] = Field(
+        description="The member's latest check-in at the gym (naive UTC, like attendance.check_in_at)",
+        default=None,
+        nullable=True
+    )
+    updated_at: datetime = Field(
+        description="When this row was last refreshed",
+        default_factory=datetime.now
+    )
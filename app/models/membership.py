@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 from typing import Optional, List
 from datetime import datetime, date
@@ -11,6 +12,10 @@ from app.models.user import User
 
 class Membership(SQLModel, table=True):
     __tablename__ = "memberships"
+    __table_args__ = (
+        # Latest/current membership per member of a gym (member list)
+        Index("ix_memberships_gym_id_user_id_end_date", "gym_id", "user_id", "end_date"),
+    )
     
     id: str = Field(
         description="The membership id",
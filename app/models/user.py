@@ -1,4 +1,5 @@
 from enum import Enum
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, date
@@ -38,6 +39,11 @@ Role = RoleEnum
 class User(SQLModel, table=True):
 
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination of a gym's member list (see app.services.user_service.MEMBER_SORTS)
+        Index("ix_users_gym_id_name_id", "gym_id", "name", "id"),
+        Index("ix_users_gym_id_created_at_id", "gym_id", "created_at", "id"),
+    )
     
     id: str = Field(
         description="The user's id",
@@ -73,6 +79,11 @@ class User(SQLModel, table=True):
         description="Whether the user is active",
         default=True
     )
+    tokens_valid_after: Optional[datetime] = Field(
+        description="Tokens issued before this moment (naive UTC) are rejected; set on password reset and deactivation",
+        default=None,
+        nullable=True
+    )
     role_id: str = Field(
         description="The user's role id",
         foreign_key="roles.id",
@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import date, datetime
+from enum import Enum
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
@@ -77,4 +78,60 @@ class DailyAttendanceSummary(BaseModel):
 
 class DailyAttendanceResponse(BaseModel):
     summary: DailyAttendanceSummary = Field(description="Daily attendance summary")
-    members: List[MemberAttendanceItem] = Field(description="List of members with attendance status")
\ No newline at end of file
+    members: List[MemberAttendanceItem] = Field(description="List of members with attendance status")
+    total: int = Field(description="Number of members matching the search and status filters")
+    page: int = Field(description="Current page number")
+    page_size: int = Field(description="Number of items per page")
+    has_next: bool = Field(description="Whether there are more pages")
+
+
+class AttendanceEventType(str, Enum):
+    CHECK_IN = "check_in"
+    CHECK_OUT = "check_out"
+
+
+class AttendanceEventStatus(str, Enum):
+    APPLIED = "applied"
+    DUPLICATE = "duplicate"
+    REJECTED = "rejected"
+
+
+class AttendanceBatchEvent(BaseModel):
+    client_event_id: str = Field(description="Unique id generated by the kiosk; replays of the same id are ignored")
+    event_type: AttendanceEventType = Field(description="The event type: check_in or check_out")
+    user_id: str = Field(description="The member user id")
+    occurred_at: str = Field(description="When the event happened, ISO 8601 with a UTC offset (e.g. 2026-03-10T07:15:00+05:30)")
+    focus: Optional[str] = Field(description="Today's workout focus (check-ins only)", default=None)
+
+
+class AttendanceBatchRequest(BaseModel):
+    events: List[AttendanceBatchEvent] = Field(description="Attendance events recorded by the kiosk", min_length=1, max_length=500)
+
+
+class AttendanceBatchEventResult(BaseModel):
+    client_event_id: str = Field(description="The kiosk event id")
+    status: AttendanceEventStatus = Field(description="applied, duplicate (already applied earlier) or rejected")
+    attendance_id: Optional[str] = Field(description="The attendance record the event was applied to", default=None)
+    detail: Optional[str] = Field(description="Reason the event was rejected", default=None)
+
+
+class AttendanceBatchResponse(BaseModel):
+    applied_count: int = Field(description="Number of events applied by this request")
+    duplicate_count: int = Field(description="Number of events that had already been applied")
+    rejected_count: int = Field(description="Number of events rejected")
+    results: List[AttendanceBatchEventResult] = Field(description="Per-event results, in request order")
+
+
+class AttendanceHeatmapCell(BaseModel):
+    weekday: int = Field(description="Day of the week (0 = Monday ... 6 = Sunday)")
+    hour: int = Field(description="Hour of the day (IST, 0-23)")
+    check_ins: int = Field(description="Number of check-ins in this slot over the period")
+
+
+class AttendanceHeatmapResponse(BaseModel):
+    gym_id: str = Field(description="The gym id")
+    start_date: date = Field(description="First day of the period (IST)")
+    end_date: date = Field(description="Last day of the period (IST)")
+    total_check_ins: int = Field(description="Number of check-ins over the period")
+    max_check_ins: int = Field(description="Check-ins in the busiest slot, for scaling the heatmap")
+    cells: List[AttendanceHeatmapCell] = Field(description="All 168 weekday x hour slots, Monday 00:00 first")
@@ -0,0 +1,32 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CacheStatsResponse(BaseModel):
+    namespace: str = Field(description="The cache namespace")
+    backend: str = Field(description="The backend storing entries: 'memory' or 'redis'")
+    ttl_seconds: int = Field(description="Time to live of cached entries in seconds")
+    hits: int = Field(description="Number of lookups served from the cache in this worker")
+    misses: int = Field(description="Number of lookups that fell through to the database in this worker")
+    invalidations: int = Field(description="Number of explicit invalidations in this worker")
+    hit_rate: float = Field(description="hits / (hits + misses)")
+
+
+class SubscriptionGateEntry(BaseModel):
+    gym_id: str = Field(description="The gym id")
+    end_date: Optional[date] = Field(None, description="Latest end date of the gym's ACTIVE OG plan subscriptions")
+
+
+class MembershipGateEntry(BaseModel):
+    user_id: str = Field(description="The member user id")
+    gym_id: str = Field(description="The gym the entry was computed for")
+    membership_status: Optional[str] = Field(None, description="Status of the member's current membership")
+    end_date: Optional[date] = Field(None, description="End date of the member's current membership")
+
+
+class AccessGateCacheResponse(BaseModel):
+    subscription: Optional[SubscriptionGateEntry] = Field(None, description="Cached subscription gate entry, if any")
+    membership: Optional[MembershipGateEntry] = Field(None, description="Cached membership gate entry, if any")
+    caches: List[CacheStatsResponse] = Field(description="Counters of the access gate caches")
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, time
 from sqlmodel import select
 from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
@@ -16,6 +16,7 @@ class GymCreate(BaseModel):
     country: str = Field(description="The gym's country", min_length=4)
     dob: Optional[str] = Field(description="The gym's date of birth", nullable=True)
     opening_hours: Optional[str] = Field(description="The gym's opening hours", nullable=True)
+    closing_time: Optional[time] = Field(default=None, description="The gym's daily closing time (IST), used for automatic checkout")
     is_active: bool = Field(description="Whether the gym is active", default=True)
     whatsapp_number: Optional[str] = Field(description="The gym's WhatsApp number", default=None)
     mobile_no: Optional[str] = Field(description="The gym's mobile number", default=None)
@@ -40,6 +41,7 @@ class GymUpdate(BaseModel):
     country: Optional[str] = Field(default=None, description="The gym's country")
     dob: Optional[str] = Field(default=None, description="The gym's date of birth")
     opening_hours: Optional[str] = Field(default=None, description="The gym's opening hours")
+    closing_time: Optional[time] = Field(default=None, description="The gym's daily closing time (IST), used for automatic checkout")
     is_active: Optional[bool] = Field(default=None, description="Whether the gym is active")
     gym_code: Optional[str] = Field(default=None, description="The gym's code")
     whatsapp_number: Optional[str] = Field(default=None, description="The gym's WhatsApp number")
@@ -66,6 +68,7 @@ class GymResponse(BaseModel):
     country: str
     dob: Optional[str] = None
     opening_hours: Optional[str] = None
+    closing_time: Optional[time] = None
     is_active: bool
     gym_code: Optional[str] = None
     whatsapp_number: Optional[str] = None
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from datetime import date
 from decimal import Decimal
+from app.models.user import Gender
 
 
 class AddMemberRequest(BaseModel):
@@ -9,3 +11,58 @@ class AddMemberRequest(BaseModel):
     plan_id: Optional[str] = Field(default=None, description="The plan id for membership")
     new_duration: Optional[int] = Field(default=None, description="New duration in days (replaces plan duration)")
     new_price: Optional[Decimal] = Field(default=None, description="New price (replaces plan price)")
+
+
+class MemberImportRow(BaseModel):
+    """One row of a bulk member import CSV (header names match the fields)"""
+    name: str = Field(description="The member's name", min_length=4)
+    email: str = Field(description="The member's email", min_length=3)
+    phone: str = Field(description="The member's phone number", min_length=1)
+    password: str = Field(description="The member's initial password", min_length=6)
+    gender: Gender = Field(description="MALE, FEMALE or OTHER")
+    dob: date = Field(description="Date of birth, YYYY-MM-DD")
+    address_line1: str = Field(description="Address line 1", min_length=4)
+    address_line2: Optional[str] = Field(default=None, description="Address line 2")
+    city: str = Field(description="City", min_length=4)
+    state: str = Field(description="State", min_length=4)
+    postal_code: str = Field(description="Postal code", min_length=1)
+    country: str = Field(description="Country", min_length=4)
+    user_name: Optional[str] = Field(default=None, description="Preferred username; generated when empty", min_length=4, max_length=60)
+    plan_id: Optional[str] = Field(default=None, description="Plan to start a membership on today")
+    new_duration: Optional[int] = Field(default=None, description="New duration in days (replaces plan duration)", gt=0)
+    new_price: Optional[Decimal] = Field(default=None, description="New price (replaces plan price)", ge=0)
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def empty_as_none(cls, v):
+        # CSV cells are strings; blank cells mean "not provided"
+        if isinstance(v, str):
+            v = v.strip()
+            return v or None
+        return v
+
+    @field_validator("gender", mode="before")
+    @classmethod
+    def upper_gender(cls, v):
+        return v.upper() if isinstance(v, str) else v
+
+
+class MemberImportError(BaseModel):
+    row: int = Field(description="CSV line number (the header is line 1)")
+    field: Optional[str] = Field(default=None, description="The offending column, when known")
+    message: str = Field(description="Why the row was not imported")
+
+
+class ImportedMember(BaseModel):
+    row: int = Field(description="CSV line number (the header is line 1)")
+    user_id: str = Field(description="The new member's user id")
+    user_name: str = Field(description="The username assigned to the member")
+    membership_id: Optional[str] = Field(default=None, description="The membership created for the plan, if any")
+
+
+class MemberImportResponse(BaseModel):
+    total_rows: int = Field(description="Data rows read from the file")
+    imported_count: int = Field(description="Members created")
+    failed_count: int = Field(description="Rows rejected")
+    imported: List[ImportedMember] = Field(default_factory=list)
+    errors: List[MemberImportError] = Field(default_factory=list)
@@ -0,0 +1,8 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class OccupancyResponse(BaseModel):
+    gym_id: str = Field(description="The gym id")
+    occupancy: int = Field(description="Members checked in today who have not checked out yet")
+    as_of: datetime = Field(description="When the count was read (IST)")
@@ -136,10 +136,11 @@ class MemberDetailResponse(BaseModel):
 
 class MemberListResponse(BaseModel):
     members: List[MemberListItemResponse] = Field(description="The list of members")
-    total: int = Field(description="Total number of members")
+    total: Optional[int] = Field(default=None, description="Total number of members (only when include_total is set)")
     page: int = Field(description="Current page number")
     page_size: int = Field(description="Number of items per page")
     has_next: bool = Field(description="Whether there are more pages")
+    next_cursor: Optional[str] = Field(default=None, description="Pass as cursor to fetch the next page")
 
 
 class AvailableMemberResponse(BaseModel):
@@ -0,0 +1,108 @@
+"""
+Cached inputs of the access gate in app.core.permissions.get_current_active_user.
+
+The gate needs a gym's latest ACTIVE OG plan subscription end date and a member's
+current membership. Both change only when a subscription, membership or payment is
+written, so they are cached and dropped by the code that writes them. An entry also
+expires no later than the next midnight at which its end date flips the gate's answer
+(the day after the end date, and the day after the grace period).
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlmodel import select, and_, func
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.db import SessionDep
+from app.models.gym_subscription import GymSubscription, SubscriptionStatus
+from app.services.member_status_service import MemberStatusService
+
+subscription_gate_cache = TTLCache(namespace="subscription_gate", ttl_seconds=settings.access_gate_cache_ttl_seconds)
+membership_gate_cache = TTLCache(namespace="membership_gate", ttl_seconds=settings.access_gate_cache_ttl_seconds)
+
+
+def invalidate_subscription_gate(*gym_ids: Optional[str]) -> None:
+    """Drop cached subscription gate entries. Call after committing a gym subscription change."""
+    keys = [gym_id for gym_id in gym_ids if gym_id]
+    if keys:
+        subscription_gate_cache.invalidate(*keys)
+
+
+def invalidate_membership_gate(*user_ids: Optional[str]) -> None:
+    """Drop cached membership gate entries. Call after committing membership or payment changes."""
+    keys = [user_id for user_id in user_ids if user_id]
+    if keys:
+        membership_gate_cache.invalidate(*keys)
+
+
+def _seconds_until_boundary(end_date: Optional[date]) -> Optional[int]:
+    """Seconds until the next midnight at which `end_date` passes today or the grace period, if any"""
+    if end_date is None:
+        return None
+    now = datetime.now()
+    for boundary in (end_date + timedelta(days=1), end_date + timedelta(days=settings.subscription_grace_period_days + 1)):
+        starts_at = datetime.combine(boundary, time.min)
+        if starts_at > now:
+            return max(int((starts_at - now).total_seconds()), 1)
+    return None
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+class AccessGateService:
+
+    def __init__(self, session: SessionDep):
+        self.session = session
+
+    def get_subscription_end_date(self, gym_id: str) -> Optional[date]:
+        """Latest end date of the gym's ACTIVE subscriptions, from subscription_gate_cache when possible"""
+        cached = subscription_gate_cache.get(gym_id)
+        if cached is not None:
+            return _parse_date(cached["end_date"])
+
+        end_date = self.session.exec(
+            select(func.max(GymSubscription.end_date)).where(
+                and_(
+                    GymSubscription.gym_id == gym_id,
+                    GymSubscription.status == SubscriptionStatus.ACTIVE,
+                )
+            )
+        ).one()
+        subscription_gate_cache.set(
+            gym_id,
+            {"gym_id": gym_id, "end_date": end_date.isoformat() if end_date else None},
+            ttl_seconds=_seconds_until_boundary(end_date)
+        )
+        return end_date
+
+    def get_membership(self, user_id: str, gym_id: str) -> Tuple[Optional[str], Optional[date]]:
+        """A member's current membership status and end date, from membership_gate_cache when possible"""
+        cached = membership_gate_cache.get(user_id)
+        # Entries are keyed by user; one computed for a previous gym is a miss
+        if cached is not None and cached["gym_id"] == gym_id:
+            return cached["membership_status"], _parse_date(cached["end_date"])
+
+        member_status = MemberStatusService(self.session).get_status(user_id, gym_id)
+        membership_gate_cache.set(
+            user_id,
+            {
+                "user_id": user_id,
+                "gym_id": gym_id,
+                "membership_status": member_status.membership_status,
+                "end_date": member_status.end_date.isoformat() if member_status.end_date else None,
+            },
+            ttl_seconds=_seconds_until_boundary(member_status.end_date)
+        )
+        return member_status.membership_status, member_status.end_date
+
+
+def inspect_access_gates(gym_id: Optional[str] = None, user_id: Optional[str] = None) -> Dict[str, Any]:
+    """Cached gate entries for a gym and/or member (without touching the counters), plus the cache counters"""
+    return {
+        "subscription": subscription_gate_cache.peek(gym_id) if gym_id else None,
+        "membership": membership_gate_cache.peek(user_id) if user_id else None,
+        "caches": [subscription_gate_cache.stats(), membership_gate_cache.stats()],
+    }
@@ -0,0 +1,173 @@
+"""
+Maintenance of the monthly attendance partitions.
+
+On Postgres, attendance is range-partitioned by local_date, one partition per
+IST calendar month (attendance_y2026m10, ...), plus attendance_default for
+dates nobody created a partition for. Queries filtered on local_date are
+pruned to the months they touch without any change at the call site.
+
+Everything here is a no-op when attendance is not partitioned (SQLite, or
+before the migration has run).
+"""
+import gzip
+import logging
+import re
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.db import SessionDep
+from app.utils.datetime import add_months, today_ist
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "attendance"
+DEFAULT_PARTITION = "attendance_default"
+_PARTITION_NAME = re.compile(r"^attendance_y(\d{4})m(\d{2})$")
+
+
+def partition_name(month: date) -> str:
+    return f"attendance_y{month.year}m{month.month:02d}"
+
+
+class ArchivedPartition(BaseModel):
+    name: str
+    month: date
+    rows: int
+    path: Optional[Path]
+
+
+class AttendancePartitionService:
+
+    def __init__(self, session: SessionDep):
+        self.session = session
+
+    def is_partitioned(self) -> bool:
+        if self.session.get_bind().dialect.name != "postgresql":
+            return False
+        return bool(self.session.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": PARENT_TABLE}
+        ).scalar())
+
+    def list_partitions(self) -> List[date]:
+        """Months that currently have an attached partition, oldest first"""
+        names = self.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ), {"table": PARENT_TABLE}).scalars().all()
+        months = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def ensure_partitions(self, months_ahead: Optional[int] = None) -> List[str]:
+        """Create missing partitions from the current month to `months_ahead` months out. Returns names created."""
+        if not self.is_partitioned():
+            return []
+        months_ahead = settings.attendance_partition_months_ahead if months_ahead is None else months_ahead
+
+        existing = set(self.list_partitions())
+        current = today_ist().replace(day=1)
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                self._create_partition(month)
+                created.append(partition_name(month))
+        if created:
+            logger.info(f"Created attendance partitions: {', '.join(created)}")
+        return created
+
+    def archive_partitions(
+        self,
+        before: date,
+        output_dir: Path,
+        keep_table: bool = False,
+        dry_run: bool = False
+    ) -> List[ArchivedPartition]:
+        """
+        Detach every monthly partition that ends on or before `before`, export it to
+        `output_dir` as gzipped CSV and drop it (unless `keep_table`).
+
+        The gym_daily_stats rollup keeps the per-day counts of archived months;
+        GymDailyStatsService.backfill never rebuilds dates before the oldest live partition.
+        """
+        if not self.is_partitioned():
+            return []
+        current = today_ist().replace(day=1)
+        if before > current:
+            raise ValueError("Cannot archive the current or a future month")
+
+        archived = []
+        for month in self.list_partitions():
+            if add_months(month, 1) > before:
+                break
+            name = partition_name(month)
+            rows = self.session.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar()
+            if dry_run:
+                archived.append(ArchivedPartition(name=name, month=month, rows=rows, path=None))
+                continue
+
+            output_dir.mkdir(parents=True, exist_ok=True)
+            path = output_dir / f"{name}.csv.gz"
+            # Detached first, so the export is consistent. Late writes to the month land in the
+            # default partition from then on.
+            self.session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            self.session.commit()
+            try:
+                exported = self._export(name, path)
+                if exported != rows:
+                    raise RuntimeError(f"Exported {exported} of {rows} rows from {name}")
+            except Exception:
+                self.session.rollback()
+                self._attach_partition(month)
+                self.session.commit()
+                raise
+
+            if not keep_table:
+                self.session.execute(text(f"DROP TABLE {name}"))
+                self.session.commit()
+            logger.info(f"Archived {rows} attendance rows from {name} to {path}")
+            archived.append(ArchivedPartition(name=name, month=month, rows=rows, path=path))
+        return archived
+
+    def _create_partition(self, month: date) -> None:
+        # Rows that landed in the default partition for this month move into the new
+        # one (attaching would otherwise fail the default partition's overlap check).
+        # The default partition stays locked until commit so no insert slips in between.
+        name = partition_name(month)
+        bounds = {"start": month, "end": add_months(month, 1)}
+        self.session.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN ACCESS EXCLUSIVE MODE"))
+        self.session.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"))
+        self.session.execute(text(
+            f"WITH moved AS ("
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE local_date >= :start AND local_date < :end RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved"
+        ), bounds)
+        self._attach_partition(month)
+        self.session.commit()
+
+    def _attach_partition(self, month: date) -> None:
+        start, end = month.isoformat(), add_months(month, 1).isoformat()
+        self.session.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {partition_name(month)} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+
+    def _export(self, table: str, path: Path) -> int:
+        """COPY a table to a gzipped CSV file with a header row. Returns rows written."""
+        cursor = self.session.connection().connection.cursor()
+        try:
+            with gzip.open(path, "wb") as output:
+                cursor.copy_expert(f"COPY {table} TO STDOUT WITH (FORMAT csv, HEADER)", output)
+            return cursor.rowcount
+        finally:
+            cursor.close()
@@ -1,13 +1,25 @@
-from datetime import datetime, date
+from collections import Counter
+from datetime import datetime, date, timedelta
+from uuid import uuid4
 from zoneinfo import ZoneInfo
-from sqlmodel import select, and_, func, or_
-from typing import List, Optional
+from sqlalchemy import case, delete, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select, and_, func
+from typing import Dict, List, Optional, Tuple
 from app.core.exceptions import NotFoundError, AlreadyExistsError
 from app.db.db import SessionDep
 from app.models.attendance import Attendance
+from app.models.attendance_sync_event import AttendanceSyncEvent
 from app.models.gym import Gym
 from app.models.user import User
 from app.models.role import Role as RoleModel
+from app.services.dashboard_service import invalidate_gym_kpis
+from app.services.gym_daily_stats_service import GymDailyStatsService
+from app.services.gym_hourly_stats_service import GymHourlyStatsService
+from app.services.member_status_service import MemberStatusService
+from app.services.occupancy_service import adjust_occupancy
+from app.utils.datetime import IST, now_ist, to_ist, to_local_date, today_ist
+from app.utils.search import text_search
 from app.schemas.attendance import (
     AttendanceCheckInRequest,
     AttendanceCheckInResponse,
@@ -18,6 +30,11 @@ from app.schemas.attendance import (
     CheckoutRequest,
     CheckoutResponse,
     ActiveCheckInStatusResponse,
+    AttendanceBatchEvent,
+    AttendanceBatchEventResult,
+    AttendanceBatchResponse,
+    AttendanceEventStatus,
+    AttendanceEventType,
     DailyAttendanceResponse,
     DailyAttendanceSummary,
     MemberAttendanceItem
@@ -42,11 +59,20 @@ class AttendanceService:
             user_id=attendance.user_id,
             gym_id=attendance.gym_id,
             check_in_at=check_in_datetime,
+            local_date=to_local_date(check_in_datetime),
             check_out_at=None
         )
         self.session.add(db_attendance)
+        GymDailyStatsService(session=self.session).record_check_in(db_attendance)
+        GymHourlyStatsService(session=self.session).record_check_in(db_attendance)
+        MemberStatusService(session=self.session).record_check_in(
+            db_attendance.user_id, db_attendance.gym_id, db_attendance.check_in_at
+        )
         self.session.commit()
         self.session.refresh(db_attendance)
+        invalidate_gym_kpis(db_attendance.gym_id)
+        if db_attendance.local_date == today_ist():
+            adjust_occupancy(db_attendance.gym_id, 1)
         
         return AttendanceCheckInResponse(
             id=db_attendance.id,
@@ -71,7 +97,7 @@ class AttendanceService:
             Attendance.user_id == attendance.user_id,
             Attendance.gym_id == attendance.gym_id,
             Attendance.check_out_at.is_(None)
-        ).order_by(Attendance.check_in_at.desc())
+        ).order_by(Attendance.local_date.desc(), Attendance.check_in_at.desc()).limit(1)
         
         db_attendance = self.session.exec(stmt).first()
         
@@ -82,8 +108,12 @@ class AttendanceService:
         
         # Update the check-out time
         db_attendance.check_out_at = check_out_datetime
+        GymDailyStatsService(session=self.session).record_check_out(db_attendance)
         self.session.commit()
         self.session.refresh(db_attendance)
+        invalidate_gym_kpis(db_attendance.gym_id)
+        if db_attendance.local_date == today_ist():
+            adjust_occupancy(db_attendance.gym_id, -1)
         
         return AttendanceCheckOutResponse(
             id=db_attendance.id,
@@ -131,18 +161,15 @@ class AttendanceService:
         
         # Check if user has already checked in today
         check_in_time = datetime.now(ZoneInfo("Asia/Kolkata"))
-        today_start = datetime.combine(check_in_time.date(), datetime.min.time()).replace(tzinfo=ZoneInfo("Asia/Kolkata"))
-        today_end = datetime.combine(check_in_time.date(), datetime.max.time()).replace(tzinfo=ZoneInfo("Asia/Kolkata"))
         
         # Check for existing attendance today
-        existing_attendance_stmt = select(Attendance).where(
+        existing_attendance_stmt = select(Attendance.id).where(
             and_(
                 Attendance.user_id == user_id,
-                Attendance.gym_id == request.gym_id,
-                Attendance.check_in_at >= today_start,
-                Attendance.check_in_at <= today_end
+                Attendance.local_date == check_in_time.date(),
+                Attendance.gym_id == request.gym_id
             )
-        )
+        ).limit(1)
         existing_attendance = self.session.exec(existing_attendance_stmt).first()
         
         if existing_attendance:
@@ -153,12 +180,22 @@ class AttendanceService:
             user_id=user_id,
             gym_id=request.gym_id,
             check_in_at=check_in_time,
+            local_date=check_in_time.date(),
             check_out_at=None,
             focus=request.today_focus
         )
         self.session.add(db_attendance)
+        # The same-day check above guarantees this is the member's first visit today
+        GymDailyStatsService(session=self.session).record_check_in(db_attendance, first_of_day=True)
+        GymHourlyStatsService(session=self.session).record_check_in(db_attendance)
+        MemberStatusService(session=self.session).record_check_in(
+            db_attendance.user_id, db_attendance.gym_id, db_attendance.check_in_at
+        )
         self.session.commit()
         self.session.refresh(db_attendance)
+        invalidate_gym_kpis(db_attendance.gym_id)
+        if db_attendance.local_date == today_ist():
+            adjust_occupancy(db_attendance.gym_id, 1)
         
         # Format time in Indian format (24hr clock): DD-MM-YYYY HH:MM:SS
         formatted_time = check_in_time.strftime("%d-%m-%Y %H:%M:%S")
@@ -174,10 +211,11 @@ class AttendanceService:
     ) -> CheckoutResponse:
         """Checkout a member - finds their active check-in and marks checkout"""
         # Find the most recent check-in for this user without a check-out
+        # (a single probe of the open check-in index, however many sessions were never closed)
         stmt = select(Attendance).where(
             Attendance.user_id == user_id,
             Attendance.check_out_at.is_(None)
-        ).order_by(Attendance.check_in_at.desc())
+        ).order_by(Attendance.local_date.desc(), Attendance.check_in_at.desc()).limit(1)
         
         db_attendance = self.session.exec(stmt).first()
         
@@ -187,8 +225,12 @@ class AttendanceService:
         # Set check-out time to current datetime (IST)
         check_out_time = datetime.now(ZoneInfo("Asia/Kolkata"))
         db_attendance.check_out_at = check_out_time
+        GymDailyStatsService(session=self.session).record_check_out(db_attendance)
         self.session.commit()
         self.session.refresh(db_attendance)
+        invalidate_gym_kpis(db_attendance.gym_id)
+        if db_attendance.local_date == today_ist():
+            adjust_occupancy(db_attendance.gym_id, -1)
         
         # Convert check_in_at to IST timezone-aware for consistent formatting
         # Database might store it as UTC or naive, so we need to handle both cases
@@ -225,39 +267,15 @@ class AttendanceService:
 
     def has_active_checkin(self, user_id: str) -> ActiveCheckInStatusResponse:
         """Check if member has an active check-in (checked in today but not checked out)"""
-        # Get current time in IST
-        now_ist = datetime.now(ZoneInfo("Asia/Kolkata"))
-        today_date = now_ist.date()
-        
-        # Query for active check-in (checked in and not checked out)
-        # We'll filter by date after fetching to handle timezone issues
-        stmt = select(Attendance).where(
+        # Open check-in on today's IST date (partial index on open check-ins)
+        stmt = select(Attendance.id).where(
             and_(
                 Attendance.user_id == user_id,
+                Attendance.local_date == today_ist(),
                 Attendance.check_out_at.is_(None)
             )
-        ).order_by(Attendance.check_in_at.desc())
-        
-        all_active_checkins = self.session.exec(stmt).all()
-        
-        # Filter to find today's check-in (handle timezone-aware and naive datetimes)
-        has_active = False
-        for attendance in all_active_checkins:
-            check_in_at = attendance.check_in_at
-            
-            # Convert to IST if timezone-aware, or assume it's already in IST if naive
-            if check_in_at.tzinfo is None:
-                # If naive, assume it's stored as UTC and convert to IST
-                from datetime import timezone as tz
-                check_in_at_ist = check_in_at.replace(tzinfo=tz.utc).astimezone(ZoneInfo("Asia/Kolkata"))
-            else:
-                # If timezone-aware, convert to IST
-                check_in_at_ist = check_in_at.astimezone(ZoneInfo("Asia/Kolkata"))
-            
-            # Check if check-in date matches today
-            if check_in_at_ist.date() == today_date:
-                has_active = True
-                break
+        ).limit(1)
+        has_active = self.session.exec(stmt).first() is not None
         
         return ActiveCheckInStatusResponse(has_active_checkin=has_active)
 
@@ -266,156 +284,408 @@ class AttendanceService:
         gym_id: str,
         target_date: date,
         filter_status: Optional[str] = None,
-        search_query: Optional[str] = None
+        search_query: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20
     ) -> DailyAttendanceResponse:
         """
-        Get daily attendance for a gym with filtering and search.
+        Get daily attendance for a gym with filtering, search and pagination.
         
         Args:
             gym_id: The gym ID
             target_date: The date to query attendance for
             filter_status: Optional filter - 'present', 'absent', or None (all)
             search_query: Optional search query to filter by member name or username
+            page: Page number (1-based)
+            page_size: Number of members per page
         
         Returns:
-            DailyAttendanceResponse with summary and member list
+            DailyAttendanceResponse with summary and one page of the member list
         """
-        # Get all members of the gym
-        member_role_stmt = select(RoleModel).where(RoleModel.name == "MEMBER")
-        member_role = self.session.exec(member_role_stmt).first()
-        
-        if not member_role:
-            raise NotFoundError(detail="MEMBER role not found")
-        
-        # Get ALL members (without search filter) for total counts
-        all_members_stmt = select(User).where(
-            and_(
-                User.gym_id == gym_id,
-                User.role_id == member_role.id,
-                User.is_active == True
-            )
-        )
-        all_members = self.session.exec(all_members_stmt).all()
-        total_members = len(all_members)
-        
-        # Calculate date range for the target date (IST timezone)
         ist = ZoneInfo("Asia/Kolkata")
-        start_of_day_ist = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=ist)
-        end_of_day_ist = datetime.combine(target_date, datetime.max.time()).replace(tzinfo=ist)
-        
-        # Convert to UTC for database query (if database stores in UTC)
-        # Or use naive datetime if database stores as-is
-        start_of_day = start_of_day_ist
-        end_of_day = end_of_day_ist
-        
-        # Get all attendance records for this date and gym
-        attendance_stmt = select(Attendance).where(
+        offset = (page - 1) * page_size
+        
+        # Latest check-in of each member on the target date
+        ranked_visits = select(
+            Attendance.user_id,
+            Attendance.check_in_at,
+            Attendance.focus,
+            func.row_number().over(
+                partition_by=Attendance.user_id,
+                order_by=Attendance.check_in_at.desc()
+            ).label("visit_rank")
+        ).where(
             and_(
                 Attendance.gym_id == gym_id,
-                Attendance.check_in_at >= start_of_day,
-                Attendance.check_in_at <= end_of_day
+                Attendance.local_date == target_date
             )
+        ).subquery()
+        day_attendance = select(
+            ranked_visits.c.user_id,
+            ranked_visits.c.check_in_at,
+            ranked_visits.c.focus
+        ).where(ranked_visits.c.visit_rank == 1).subquery()
+        is_present = day_attendance.c.user_id.isnot(None)
+        
+        is_gym_member = and_(
+            User.gym_id == gym_id,
+            RoleModel.name == "MEMBER",
+            User.is_active == True
         )
         
-        attendance_records = self.session.exec(attendance_stmt).all()
-        
-        # Create a map of user_id -> attendance record for quick lookup
-        attendance_map = {record.user_id: record for record in attendance_records}
-        
-        # Calculate total present and absent counts for ALL members (regardless of filters)
-        present_count = 0
-        absent_count = 0
-        
-        for member in all_members:
-            attendance_record = attendance_map.get(member.id)
-            if attendance_record is not None:
-                present_count += 1
-            else:
-                absent_count += 1
-        
-        # Now get filtered members for the response list
-        member_stmt = select(User).where(
-            and_(
-                User.gym_id == gym_id,
-                User.role_id == member_role.id,
-                User.is_active == True
+        # Search and status filters only narrow the list; the summary always covers all members
+        list_filters = []
+        if search_query:
+            search_condition, _ = text_search(self.session, [User.name, User.user_name], search_query)
+            list_filters.append(search_condition)
+        if filter_status == "present":
+            list_filters.append(is_present)
+        elif filter_status == "absent":
+            list_filters.append(day_attendance.c.user_id.is_(None))
+        
+        # Summary and filtered total from a single aggregate
+        filtered_count = func.count(case((and_(*list_filters), User.id))) if list_filters else func.count(User.id)
+        summary_stmt = (
+            select(
+                func.count(User.id),
+                func.count(day_attendance.c.user_id),
+                filtered_count
             )
+            .select_from(User)
+            .join(RoleModel, RoleModel.id == User.role_id)
+            .outerjoin(day_attendance, day_attendance.c.user_id == User.id)
+            .where(is_gym_member)
         )
-        
-        # Apply search filter if provided
-        if search_query:
-            search_pattern = f"%{search_query.lower()}%"
-            member_stmt = member_stmt.where(
-                or_(
-                    func.lower(User.name).like(search_pattern),
-                    func.lower(User.user_name).like(search_pattern)
-                )
+        total_members, present_count, total = self.session.exec(summary_stmt).one()
+        
+        # Absent members first (by name), then present members by latest check-in
+        members_stmt = (
+            select(
+                User.id,
+                User.name,
+                User.user_name,
+                User.photo_url,
+                day_attendance.c.check_in_at,
+                day_attendance.c.focus
             )
+            .join(RoleModel, RoleModel.id == User.role_id)
+            .outerjoin(day_attendance, day_attendance.c.user_id == User.id)
+            .where(is_gym_member, *list_filters)
+            .order_by(
+                case((is_present, 1), else_=0),
+                day_attendance.c.check_in_at.desc(),
+                User.name,
+                User.id
+            )
+            .limit(page_size)
+            .offset(offset)
+        )
         
-        filtered_members = self.session.exec(member_stmt).all()
-        
-        # Build member attendance list (with filters applied)
         member_attendance_list: List[MemberAttendanceItem] = []
-        
-        for member in filtered_members:
-            attendance_record = attendance_map.get(member.id)
-            is_present = attendance_record is not None
-            
-            # Apply status filter
-            if filter_status == "present" and not is_present:
-                continue
-            if filter_status == "absent" and is_present:
-                continue
-            
-            # Format check-in time if present
+        for member_id, name, user_name, photo_url, check_in_at, focus in self.session.exec(members_stmt).all():
             check_in_time_str = None
-            focus = None
-            
-            if attendance_record:
+            if check_in_at is not None:
                 # Convert check_in_at to IST for formatting
-                check_in_at = attendance_record.check_in_at
                 if check_in_at.tzinfo is None:
                     # Assume UTC if naive
                     from datetime import timezone as tz
                     check_in_at = check_in_at.replace(tzinfo=tz.utc).astimezone(ist)
                 else:
                     check_in_at = check_in_at.astimezone(ist)
-                
                 check_in_time_str = check_in_at.strftime("%d-%m-%Y %H:%M:%S")
-                focus = attendance_record.focus
             
             member_attendance_list.append(
                 MemberAttendanceItem(
-                    user_id=member.id,
-                    name=member.name,
-                    user_name=member.user_name,
-                    photo_url=member.photo_url,
+                    user_id=member_id,
+                    name=name,
+                    user_name=user_name,
+                    photo_url=photo_url,
                     check_in_time=check_in_time_str,
                     focus=focus,
-                    status="present" if is_present else "absent"
+                    status="present" if check_in_at is not None else "absent"
                 )
             )
         
-        # Sort by status (present first) then by check-in time
-        member_attendance_list.sort(
-            key=lambda x: (
-                0 if x.status == "present" else 1,
-                x.check_in_time if x.check_in_time else ""
-            ),
-            reverse=True
-        )
-        
-        # Format date
-        date_str = target_date.strftime("%d-%m-%Y")
-        
         summary = DailyAttendanceSummary(
-            date=date_str,
+            date=target_date.strftime("%d-%m-%Y"),
             present_count=present_count,
-            absent_count=absent_count,
+            absent_count=total_members - present_count,
             total_members=total_members
         )
         
         return DailyAttendanceResponse(
             summary=summary,
-            members=member_attendance_list
+            members=member_attendance_list,
+            total=total,
+            page=page,
+            page_size=page_size,
+            has_next=(page * page_size) < total
         )
+
+    def ingest_attendance_batch(
+        self,
+        gym_id: str,
+        events: List[AttendanceBatchEvent]
+    ) -> AttendanceBatchResponse:
+        """
+        Apply check-in/check-out events recorded offline by a gym kiosk.
+
+        Lookups are set-based (a fixed number of queries per batch, not per event) and all writes
+        go out as multi-row statements in a single transaction. Events are applied in occurred_at
+        order. The mark_attendance rule of one check-in per member per day still applies, and
+        client_event_ids that were already applied are reported as duplicates so replays are safe,
+        including concurrent uploads of the same batch.
+        """
+        results: Dict[int, AttendanceBatchEventResult] = {}
+
+        def set_result(index: int, event: AttendanceBatchEvent, status: AttendanceEventStatus,
+                       attendance_id: Optional[str] = None, detail: Optional[str] = None) -> None:
+            results[index] = AttendanceBatchEventResult(
+                client_event_id=event.client_event_id,
+                status=status,
+                attendance_id=attendance_id,
+                detail=detail
+            )
+
+        # 1. Parse timestamps and drop ids repeated inside the batch
+        latest_allowed = now_ist() + timedelta(minutes=5)
+        pending: List[Tuple[int, AttendanceBatchEvent, datetime]] = []
+        seen_event_ids = set()
+        for index, event in enumerate(events):
+            if event.client_event_id in seen_event_ids:
+                set_result(index, event, AttendanceEventStatus.DUPLICATE)
+                continue
+            seen_event_ids.add(event.client_event_id)
+
+            try:
+                occurred_at = self._parse_event_time(event.occurred_at)
+            except ValueError as e:
+                set_result(index, event, AttendanceEventStatus.REJECTED, detail=str(e))
+                continue
+            if occurred_at > latest_allowed:
+                set_result(index, event, AttendanceEventStatus.REJECTED, detail="occurred_at is in the future")
+                continue
+            pending.append((index, event, occurred_at))
+
+        if pending:
+            user_ids = {event.user_id for _, event, _ in pending}
+            check_in_dates = {
+                occurred_at.date() for _, event, occurred_at in pending
+                if event.event_type == AttendanceEventType.CHECK_IN
+            }
+            check_out_user_ids = {
+                event.user_id for _, event, _ in pending
+                if event.event_type == AttendanceEventType.CHECK_OUT
+            }
+
+            # 2. Claim the events in attendance_sync_events. Ids recorded by an earlier upload,
+            # or by a concurrent one (the insert waits for it to commit), conflict and are
+            # duplicates; only claimed events are applied. Rows go in client_event_id order
+            # so overlapping uploads lock them in the same order.
+            claim_stmt = pg_insert(AttendanceSyncEvent).values([
+                {
+                    "gym_id": gym_id,
+                    "client_event_id": event.client_event_id,
+                    "event_type": event.event_type.value,
+                    "attendance_id": None,
+                    "created_at": datetime.now()
+                }
+                for _, event, _ in sorted(pending, key=lambda item: item[1].client_event_id)
+            ]).on_conflict_do_nothing(
+                index_elements=[AttendanceSyncEvent.gym_id, AttendanceSyncEvent.client_event_id]
+            ).returning(AttendanceSyncEvent.client_event_id)
+            claimed = set(self.session.execute(claim_stmt).scalars().all())
+
+            already_applied: Dict[str, Optional[str]] = {}
+            unclaimed = {event.client_event_id for _, event, _ in pending} - claimed
+            if unclaimed:
+                applied_stmt = select(AttendanceSyncEvent.client_event_id, AttendanceSyncEvent.attendance_id).where(
+                    and_(
+                        AttendanceSyncEvent.gym_id == gym_id,
+                        AttendanceSyncEvent.client_event_id.in_(unclaimed)
+                    )
+                )
+                already_applied = dict(self.session.exec(applied_stmt).all())
+
+            # 3. Active members of this gym
+            members_stmt = select(User.id).join(RoleModel, RoleModel.id == User.role_id).where(
+                and_(
+                    User.id.in_(user_ids),
+                    User.gym_id == gym_id,
+                    RoleModel.name == "MEMBER",
+                    User.is_active == True
+                )
+            )
+            member_ids = set(self.session.exec(members_stmt).all())
+
+            # 4. Days members have already checked in on
+            visited = set()
+            if check_in_dates:
+                visited_stmt = select(Attendance.user_id, Attendance.local_date).where(
+                    and_(
+                        Attendance.gym_id == gym_id,
+                        Attendance.user_id.in_(user_ids),
+                        Attendance.local_date.in_(check_in_dates)
+                    )
+                )
+                visited = set(self.session.exec(visited_stmt).all())
+
+            # 5. Latest open session of members with check-outs
+            open_sessions: Dict[str, Tuple[str, datetime]] = {}
+            if check_out_user_ids:
+                ranked_open = select(
+                    Attendance.id,
+                    Attendance.user_id,
+                    Attendance.check_in_at,
+                    func.row_number().over(
+                        partition_by=Attendance.user_id,
+                        order_by=(Attendance.local_date.desc(), Attendance.check_in_at.desc())
+                    ).label("session_rank")
+                ).where(
+                    and_(
+                        Attendance.gym_id == gym_id,
+                        Attendance.user_id.in_(check_out_user_ids),
+                        Attendance.check_out_at.is_(None)
+                    )
+                ).subquery()
+                open_stmt = select(ranked_open.c.id, ranked_open.c.user_id, ranked_open.c.check_in_at).where(
+                    ranked_open.c.session_rank == 1
+                )
+                for attendance_id, user_id, check_in_at in self.session.exec(open_stmt).all():
+                    open_sessions[user_id] = (attendance_id, to_ist(check_in_at))
+
+            # 6. Replay events in the order they happened
+            new_rows: Dict[str, dict] = {}
+            closed_sessions: Dict[str, datetime] = {}
+            closed_today = 0
+            sync_rows: List[dict] = []
+            for index, event, occurred_at in sorted(pending, key=lambda item: item[2]):
+                if event.client_event_id not in claimed:
+                    set_result(index, event, AttendanceEventStatus.DUPLICATE,
+                               attendance_id=already_applied.get(event.client_event_id))
+                    continue
+                if event.user_id not in member_ids:
+                    set_result(index, event, AttendanceEventStatus.REJECTED,
+                               detail="Member does not belong to this gym")
+                    continue
+
+                if event.event_type == AttendanceEventType.CHECK_IN:
+                    local_date = occurred_at.date()
+                    if (event.user_id, local_date) in visited:
+                        set_result(index, event, AttendanceEventStatus.REJECTED,
+                                   detail="Member has already checked in on this date")
+                        continue
+                    attendance_id = str(uuid4())
+                    new_rows[attendance_id] = {
+                        "id": attendance_id,
+                        "user_id": event.user_id,
+                        "gym_id": gym_id,
+                        "check_in_at": occurred_at,
+                        "local_date": local_date,
+                        "check_out_at": None,
+                        "focus": event.focus
+                    }
+                    visited.add((event.user_id, local_date))
+                    open_sessions[event.user_id] = (attendance_id, occurred_at)
+                else:
+                    open_session = open_sessions.get(event.user_id)
+                    if not open_session or occurred_at < open_session[1]:
+                        set_result(index, event, AttendanceEventStatus.REJECTED,
+                                   detail="No active check-in found")
+                        continue
+                    attendance_id = open_sessions.pop(event.user_id)[0]
+                    if attendance_id in new_rows:
+                        new_rows[attendance_id]["check_out_at"] = occurred_at
+                    else:
+                        closed_sessions[attendance_id] = occurred_at
+                        if to_local_date(open_session[1]) == today_ist():
+                            closed_today += 1
+
+                set_result(index, event, AttendanceEventStatus.APPLIED, attendance_id=attendance_id)
+                sync_rows.append({
+                    "gym_id": gym_id,
+                    "client_event_id": event.client_event_id,
+                    "attendance_id": attendance_id
+                })
+
+            # 7. Multi-row writes, rollup and event log in one transaction. Claims of rejected
+            # events are released, so a corrected replay is evaluated again.
+            released_event_ids = claimed - {row["client_event_id"] for row in sync_rows}
+            if released_event_ids:
+                self.session.execute(delete(AttendanceSyncEvent).where(
+                    and_(
+                        AttendanceSyncEvent.gym_id == gym_id,
+                        AttendanceSyncEvent.client_event_id.in_(released_event_ids)
+                    )
+                ))
+            if not sync_rows:
+                self.session.commit()
+            else:
+                if new_rows:
+                    self.session.execute(insert(Attendance), list(new_rows.values()))
+                if closed_sessions:
+                    self.session.execute(
+                        update(Attendance),
+                        [{"id": attendance_id, "check_out_at": check_out_at}
+                         for attendance_id, check_out_at in closed_sessions.items()]
+                    )
+                self.session.execute(update(AttendanceSyncEvent), sync_rows)
+
+                check_ins_by_date = Counter(row["local_date"] for row in new_rows.values())
+                check_outs_by_date = Counter(to_local_date(check_out_at) for check_out_at in closed_sessions.values())
+                check_outs_by_date.update(
+                    to_local_date(row["check_out_at"]) for row in new_rows.values() if row["check_out_at"]
+                )
+                stats_service = GymDailyStatsService(session=self.session)
+                for local_date in set(check_ins_by_date) | set(check_outs_by_date):
+                    # Every accepted check-in is the member's first visit that day
+                    stats_service.increment(
+                        gym_id=gym_id,
+                        local_date=local_date,
+                        check_ins=check_ins_by_date[local_date],
+                        check_outs=check_outs_by_date[local_date],
+                        unique_members=check_ins_by_date[local_date]
+                    )
+                GymHourlyStatsService(session=self.session).record_check_ins(
+                    gym_id=gym_id,
+                    check_ins=[(row["local_date"], row["check_in_at"]) for row in new_rows.values()]
+                )
+                last_check_ins = {}
+                for row in new_rows.values():
+                    if row["user_id"] not in last_check_ins or row["check_in_at"] > last_check_ins[row["user_id"]]:
+                        last_check_ins[row["user_id"]] = row["check_in_at"]
+                member_status_service = MemberStatusService(session=self.session)
+                for user_id, check_in_at in last_check_ins.items():
+                    member_status_service.record_check_in(user_id, gym_id, check_in_at)
+
+                self.session.commit()
+                invalidate_gym_kpis(gym_id)
+                opened_today = sum(
+                    1 for row in new_rows.values()
+                    if row["local_date"] == today_ist() and row["check_out_at"] is None
+                )
+                adjust_occupancy(gym_id, opened_today - closed_today)
+
+        ordered_results = [results[index] for index in range(len(events))]
+        return AttendanceBatchResponse(
+            applied_count=sum(1 for r in ordered_results if r.status == AttendanceEventStatus.APPLIED),
+            duplicate_count=sum(1 for r in ordered_results if r.status == AttendanceEventStatus.DUPLICATE),
+            rejected_count=sum(1 for r in ordered_results if r.status == AttendanceEventStatus.REJECTED),
+            results=ordered_results
+        )
+
+    @staticmethod
+    def _parse_event_time(value: str) -> datetime:
+        """
+        Parse a kiosk timestamp into an IST-aware datetime.
+
+        The offset is required: elsewhere naive attendance times mean UTC (see to_local_date),
+        while kiosks keep local time, so a naive value could be read either way.
+        """
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError("Invalid occurred_at timestamp")
+        if parsed.tzinfo is None:
+            raise ValueError("occurred_at must include a UTC offset, e.g. +05:30")
+        return parsed.astimezone(IST)
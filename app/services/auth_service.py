@@ -1,11 +1,16 @@
+import asyncio
+from typing import Optional
 from sqlmodel import select
 from app.core.exceptions import EmailAlreadyExistsError, InvalidCredentialsError, PhoneAlreadyExistsError, UserAlreadyExistsError, UserNameAlreadyExistsError, NotFoundError
-from app.core.security import create_access_token, create_refresh_token, get_password_hash, verify_password
+from app.core.security import (
+    create_access_token, create_refresh_token, get_password_hash_async, password_needs_rehash, verify_password_async
+)
 from app.db.db import SessionDep
 from app.models.user import User
 from app.models.role import Role
 from app.schemas.auth import LoginRequest, LoginResponse
 from app.schemas.user import UserCreate
+from app.utils.usernames import add_user_with_unique_username, username_base
 
 class AuthService:
 
@@ -13,7 +18,16 @@ class AuthService:
         self.session = session
 
     
-    def register(self, user: UserCreate) -> LoginResponse:
+    async def register(self, user: UserCreate) -> LoginResponse:
+        """Database work runs on worker threads and bcrypt on the password pool, so no request thread waits on the hash"""
+        role = await asyncio.to_thread(self._get_registration_role, user)
+
+        # 4. Hash password
+        hashed_password = await get_password_hash_async(user.password)
+
+        return await asyncio.to_thread(self._create_registered_user, user, role, hashed_password)
+
+    def _get_registration_role(self, user: UserCreate) -> Role:
             # 1. Check if user already exists by email
             stmt = select(User).where(User.email == user.email)
             existing_user = self.session.exec(stmt).first()
@@ -31,27 +45,9 @@ class AuthService:
             role = self.session.exec(stmt).first()
             if not role:
                 raise NotFoundError(detail=f"Role '{user.role}' not found")
-            
-            # 4. Generate username if not provided
-            if not user.user_name:
-                user.user_name = self._generate_username(user.email, user.name)
-            
-            # 5. Check if username exists and generate a unique one
-            stmt = select(User).where(User.user_name == user.user_name)
-            existing = self.session.exec(stmt).first()
-            if existing:
-                # Generate a unique username by appending a number
-                base_username = user.user_name
-                counter = 1
-                while existing:
-                    user.user_name = f"{base_username}{counter}"
-                    stmt = select(User).where(User.user_name == user.user_name)
-                    existing = self.session.exec(stmt).first()
-                    counter += 1
-            
-            # 4. Hash password
-            hashed_password = get_password_hash(user.password)
-            
+            return role
+
+    def _create_registered_user(self, user: UserCreate, role: Role, hashed_password: str) -> LoginResponse:
             # 5. Create user object
             db_user = User(
                 user_name=user.user_name,
@@ -75,8 +71,10 @@ class AuthService:
                 is_active=True
             )
             
-            # 7. Save to database
-            self.session.add(db_user)
+            # 7. Save to database under the requested (or generated) username, suffixed if it is taken
+            add_user_with_unique_username(
+                self.session, db_user, user.user_name or username_base(user.email, user.name)
+            )
             self.session.commit()
             self.session.refresh(db_user)
             
@@ -97,54 +95,30 @@ class AuthService:
                 user_name=db_user.user_name
             )
     
-    def _generate_username(self, email: str, name: str) -> str:
-        """
-        Generate a username from email or name
-        Ensures minimum length of 4 characters as required by the model
-        """
-        import re
-        import random
-        import string
-        
-        # Try to generate from email first (before @)
-        if email:
-            username = email.split('@')[0]
-            # Remove special characters and keep only alphanumeric
-            username = re.sub(r'[^a-zA-Z0-9]', '', username)
-            if username and len(username) >= 4:
-                return username.lower()
-            elif username:
-                # If too short, pad with random characters
-                padding = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4-len(username)))
-                return (username + padding).lower()
-        
-        # Fallback to name
-        if name:
-            username = re.sub(r'[^a-zA-Z0-9]', '', name)
-            if username and len(username) >= 4:
-                return username.lower()
-            elif username:
-                # If too short, pad with random characters
-                padding = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4-len(username)))
-                return (username + padding).lower()
-        
-        # Final fallback - generate a random username
-        random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
-        return f"user{random_part}"
-        
-        
-    def login(self, req: LoginRequest) -> LoginResponse:
+    async def login(self, req: LoginRequest) -> LoginResponse:
+        """Database work runs on worker threads and bcrypt on the password pool, so no request thread waits on the hash"""
         # 1. Find user by email
-        stmt = select(User).where(User.email == req.email)
-        user = self.session.exec(stmt).first()
+        user = await asyncio.to_thread(self._get_user_by_email, req.email)
         
         if not user:
             raise InvalidCredentialsError()
         
         # 2. Verify password
-        if not verify_password(req.password, user.password_hash):
+        if not await verify_password_async(req.password, user.password_hash):
             raise InvalidCredentialsError()
         
+        # Upgrade the stored hash if it was made with a different cost than settings.bcrypt_rounds
+        new_password_hash = None
+        if user.is_active and password_needs_rehash(user.password_hash):
+            new_password_hash = await get_password_hash_async(req.password)
+
+        return await asyncio.to_thread(self._complete_login, user, req, new_password_hash)
+
+    def _get_user_by_email(self, email: str) -> Optional[User]:
+        stmt = select(User).where(User.email == email)
+        return self.session.exec(stmt).first()
+
+    def _complete_login(self, user: User, req: LoginRequest, new_password_hash: Optional[str]) -> LoginResponse:
         # 3. Check if user is active
         if not user.is_active:
             raise InvalidCredentialsError(detail="User account is inactive")
@@ -156,6 +130,8 @@ class AuthService:
             user.app_version = req.app_version
         if req.platform is not None:
             user.platform = req.platform  # Already normalized by validator
+        if new_password_hash is not None:
+            user.password_hash = new_password_hash
         
         # Save user updates
         self.session.add(user)
@@ -0,0 +1,117 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import update
+from sqlmodel import select, and_, or_
+from app.core import metrics
+from app.core.config import settings
+from app.db.db import SessionDep
+from app.models.attendance import Attendance
+from app.models.gym import Gym
+from app.services.dashboard_service import invalidate_gym_kpis
+from app.services.gym_daily_stats_service import GymDailyStatsService
+from app.services.occupancy_service import adjust_occupancy
+from app.utils.datetime import IST, now_ist, to_local_date, to_utc_naive, today_ist
+
+logger = logging.getLogger(__name__)
+
+
+class AutoCheckoutService:
+    """
+    Closes attendance sessions members forgot to check out of.
+
+    A session's cutoff is its gym's closing_time on the check-in date, or
+    auto_checkout_after_hours after check-in when the gym has no closing time
+    (or the member checked in after closing). Sessions past their cutoff get
+    check_out_at set to the cutoff, so durations stay realistic.
+    """
+
+    def __init__(self, session: SessionDep):
+        self.session = session
+
+    def close_stale_sessions(self, now: Optional[datetime] = None, batch_size: int = 500) -> int:
+        """
+        Close every open session past its cutoff, one committed batch at a time. Returns rows closed.
+
+        `now` may be aware or naive UTC. Attendance timestamps are stored as naive UTC, so
+        the comparisons and the check_out_at written here are naive UTC too.
+        """
+        now = to_utc_naive(now or now_ist())
+        max_session = timedelta(hours=settings.auto_checkout_after_hours)
+
+        closing_times = dict(
+            self.session.exec(select(Gym.id, Gym.closing_time).where(Gym.closing_time.isnot(None))).all()
+        )
+
+        # Sessions that could be past their cutoff: past the fallback window, or at a gym with a
+        # closing time (decided per row below). Open sessions are few, and the keyset cursor
+        # guarantees progress even when most candidates are still within their cutoff.
+        candidate_filters = [Attendance.check_in_at <= now - max_session]
+        if closing_times:
+            candidate_filters.append(Attendance.gym_id.in_(closing_times.keys()))
+
+        total_closed = 0
+        cursor: Optional[Tuple[datetime, str]] = None
+        while True:
+            stmt = select(Attendance.id, Attendance.gym_id, Attendance.check_in_at, Attendance.local_date).where(
+                and_(
+                    Attendance.check_out_at.is_(None),
+                    Attendance.check_in_at <= now,
+                    or_(*candidate_filters)
+                )
+            )
+            if cursor:
+                stmt = stmt.where(
+                    or_(
+                        Attendance.check_in_at > cursor[0],
+                        and_(Attendance.check_in_at == cursor[0], Attendance.id > cursor[1])
+                    )
+                )
+            rows = self.session.exec(stmt.order_by(Attendance.check_in_at, Attendance.id).limit(batch_size)).all()
+            if not rows:
+                break
+            cursor = (rows[-1].check_in_at, rows[-1].id)
+
+            closed: Dict[str, datetime] = {}
+            gym_ids = set()
+            closed_today: Counter = Counter()
+            for attendance_id, gym_id, check_in_at, local_date in rows:
+                check_in_at = to_utc_naive(check_in_at)
+                cutoff = check_in_at + max_session
+                closing_time = closing_times.get(gym_id)
+                if closing_time is not None:
+                    # Closing time is IST wall-clock time on the check-in's IST date
+                    closing_at = to_utc_naive(datetime.combine(local_date, closing_time, tzinfo=IST))
+                    if closing_at > check_in_at:
+                        cutoff = closing_at
+                if cutoff <= now:
+                    closed[attendance_id] = cutoff
+                    gym_ids.add(gym_id)
+                    if local_date == today_ist():
+                        closed_today[gym_id] += 1
+
+            if closed:
+                self.session.execute(
+                    update(Attendance),
+                    [{"id": attendance_id, "check_out_at": cutoff} for attendance_id, cutoff in closed.items()]
+                )
+                stats_service = GymDailyStatsService(session=self.session)
+                gym_of = {row.id: row.gym_id for row in rows}
+                per_day = Counter((gym_of[attendance_id], to_local_date(cutoff)) for attendance_id, cutoff in closed.items())
+                for (gym_id, local_date), check_outs in per_day.items():
+                    stats_service.increment(gym_id=gym_id, local_date=local_date, check_outs=check_outs)
+                self.session.commit()
+                for gym_id in gym_ids:
+                    invalidate_gym_kpis(gym_id)
+                for gym_id, count in closed_today.items():
+                    adjust_occupancy(gym_id, -count)
+                total_closed += len(closed)
+
+            if len(rows) < batch_size:
+                break
+
+        metrics.increment("auto_checkout.rows_closed_total", total_closed)
+        metrics.set_gauge("auto_checkout.last_run_rows_closed", total_closed)
+        logger.info(f"Auto-checkout closed {total_closed} stale attendance sessions")
+        return total_closed
@@ -0,0 +1,70 @@
+"""Periodic jobs run from the FastAPI lifespan (see app.core.background)"""
+from sqlmodel import Session
+
+from app.core.background import PeriodicJob, register_job
+from app.core.config import settings
+from app.db.db import get_engine
+from app.utils.datetime import add_months, today_ist
+from app.services.attendance_partition_service import AttendancePartitionService
+from app.services.auto_checkout_service import AutoCheckoutService
+from app.services.gym_hourly_stats_service import GymHourlyStatsService
+from app.services.occupancy_service import InMemoryOccupancyBackend, OccupancyService, get_occupancy_backend
+
+# Advisory lock keys; one per job so different workers can lead different jobs
+AUTO_CHECKOUT_LOCK_KEY = 72_001
+OCCUPANCY_RECONCILE_LOCK_KEY = 72_002
+ATTENDANCE_PARTITIONS_LOCK_KEY = 72_003
+GYM_HOURLY_STATS_LOCK_KEY = 72_004
+
+
+def run_auto_checkout() -> None:
+    with Session(get_engine()) as session:
+        AutoCheckoutService(session=session).close_stale_sessions()
+
+
+def run_occupancy_reconcile() -> None:
+    with Session(get_engine()) as session:
+        OccupancyService(session=session).reconcile()
+
+
+def run_attendance_partition_maintenance() -> None:
+    with Session(get_engine()) as session:
+        AttendancePartitionService(session=session).ensure_partitions()
+
+
+def run_gym_hourly_stats_rebuild() -> None:
+    # Recent months absorb any drift from the incremental updates; older ones are settled
+    current = today_ist()
+    with Session(get_engine()) as session:
+        service = GymHourlyStatsService(session=session)
+        service.rebuild(start_month=add_months(current, -(settings.gym_hourly_stats_rebuild_months - 1)))
+        service.prune(before_month=add_months(current, -(settings.attendance_heatmap_max_months - 1)))
+
+
+def register_background_jobs() -> None:
+    register_job(PeriodicJob(
+        name="auto_checkout",
+        interval_seconds=settings.auto_checkout_interval_seconds,
+        run=run_auto_checkout,
+        lock_key=AUTO_CHECKOUT_LOCK_KEY
+    ))
+    # In-memory counters are per worker, so every worker reconciles its own copy
+    shared_occupancy = not isinstance(get_occupancy_backend(), InMemoryOccupancyBackend)
+    register_job(PeriodicJob(
+        name="occupancy_reconcile",
+        interval_seconds=settings.occupancy_reconcile_interval_seconds,
+        run=run_occupancy_reconcile,
+        lock_key=OCCUPANCY_RECONCILE_LOCK_KEY if shared_occupancy else None
+    ))
+    register_job(PeriodicJob(
+        name="attendance_partitions",
+        interval_seconds=settings.attendance_partition_interval_seconds,
+        run=run_attendance_partition_maintenance,
+        lock_key=ATTENDANCE_PARTITIONS_LOCK_KEY
+    ))
+    register_job(PeriodicJob(
+        name="gym_hourly_stats_rebuild",
+        interval_seconds=settings.gym_hourly_stats_rebuild_interval_seconds,
+        run=run_gym_hourly_stats_rebuild,
+        lock_key=GYM_HOURLY_STATS_LOCK_KEY
+    ))
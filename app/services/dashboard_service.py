@@ -1,16 +1,32 @@
-from typing import Optional, List
-from datetime import date, datetime, timedelta
+from typing import Callable, Optional, List
+from datetime import date, timedelta
 from decimal import Decimal
 from zoneinfo import ZoneInfo
-from sqlmodel import select, func, and_, or_
+from sqlalchemy import Subquery, case, true
+from sqlmodel import select, func, and_
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.db.db import SessionDep
 from app.models.user import Role, User
 from app.models.role import Role as RoleModel
 from app.models.membership import Membership
 from app.models.attendance import Attendance
 from app.models.payments import Payment
+from app.models.gym_daily_stats import GymDailyStats
 from app.schemas.dashboard import DashboardKPIsResponse, DailyAttendanceResponse
 from app.schemas.user import CurrentPlanResponse
+from app.utils.datetime import date_window, today_ist
+
+
+# Gym-wide owner/staff KPIs are identical for everyone in the gym, so they are shared
+# between requests for a short TTL and dropped as soon as a relevant write commits.
+kpi_cache = TTLCache(namespace="dashboard_kpis", ttl_seconds=settings.dashboard_kpi_cache_ttl_seconds)
+
+
+def invalidate_gym_kpis(gym_id: Optional[str]) -> None:
+    """Drop cached owner and staff KPIs for a gym. Call after committing attendance, payment or member changes."""
+    if gym_id:
+        kpi_cache.invalidate(f"admin:{gym_id}", f"staff:{gym_id}")
 
 
 class DashboardService:
@@ -64,6 +80,28 @@ class DashboardService:
 
     def _get_admin_kpis(self, gym_id: Optional[str]) -> DashboardKPIsResponse:
         """Get KPIs for ADMIN (Gym Owner) role - full gym statistics"""
+        return self._get_cached_gym_kpis("admin", gym_id, self._compute_admin_kpis)
+
+    def _get_cached_gym_kpis(
+        self,
+        scope: str,
+        gym_id: Optional[str],
+        compute: Callable[[Optional[str]], DashboardKPIsResponse]
+    ) -> DashboardKPIsResponse:
+        """Serve gym-wide KPIs from kpi_cache, computing and storing them on a miss"""
+        if not gym_id:
+            return compute(gym_id)
+
+        cache_key = f"{scope}:{gym_id}"
+        cached = kpi_cache.get(cache_key)
+        if cached is not None:
+            return DashboardKPIsResponse.model_validate(cached)
+
+        kpis = compute(gym_id)
+        kpi_cache.set(cache_key, kpis.model_dump(mode="json"))
+        return kpis
+
+    def _compute_admin_kpis(self, gym_id: Optional[str]) -> DashboardKPIsResponse:
         if not gym_id:
             return DashboardKPIsResponse(
                 active_members=0,
@@ -80,71 +118,51 @@ class DashboardService:
                 unpaid_percentage=0.0
             )
         
-        today = date.today()
+        today = today_ist()
         yesterday = today - timedelta(days=1)
-        start_of_day = datetime.combine(today, datetime.min.time())
-        end_of_day = datetime.combine(today, datetime.max.time())
-        start_of_yesterday = datetime.combine(yesterday, datetime.min.time())
-        end_of_yesterday = datetime.combine(yesterday, datetime.max.time())
-        
-        # 1. Active members: Count total members (users with role MEMBER) in the gym
-        # First, get the MEMBER role id
-        member_role_stmt = select(RoleModel).where(RoleModel.name == "MEMBER")
-        member_role = self.session.exec(member_role_stmt).first()
-        
-        if member_role:
-            active_members_stmt = select(func.count(User.id)).where(
-                and_(
-                    User.gym_id == gym_id,
-                    User.role_id == member_role.id,
-                    User.is_active == True
-                )
-            )
-            active_members = self.session.exec(active_members_stmt).first() or 0
-        else:
-            active_members = 0
-        
-        # 2. Total check-ins today
-        check_ins_stmt = select(func.count(Attendance.id)).where(
-            and_(
-                Attendance.gym_id == gym_id,
-                Attendance.check_in_at >= start_of_day,
-                Attendance.check_in_at <= end_of_day
-            )
-        )
-        total_check_ins_today = self.session.exec(check_ins_stmt).first() or 0
-        
-        # 3. Total check-ins yesterday (for trend calculation)
-        check_ins_yesterday_stmt = select(func.count(Attendance.id)).where(
-            and_(
-                Attendance.gym_id == gym_id,
-                Attendance.check_in_at >= start_of_yesterday,
-                Attendance.check_in_at <= end_of_yesterday
-            )
-        )
-        total_check_ins_yesterday = self.session.exec(check_ins_yesterday_stmt).first() or 0
-        
-        # 4. Total check-outs today
-        check_outs_stmt = select(func.count(Attendance.id)).where(
-            and_(
-                Attendance.gym_id == gym_id,
-                Attendance.check_out_at.isnot(None),
-                Attendance.check_out_at >= start_of_day,
-                Attendance.check_out_at <= end_of_day
-            )
-        )
-        total_check_outs_today = self.session.exec(check_outs_stmt).first() or 0
-        
-        # 5. Total fee due members: Count distinct users with pending payments
-        fee_due_stmt = select(func.count(func.distinct(Payment.user_id))).where(
-            and_(
-                Payment.gym_id == gym_id,
-                Payment.status == "pending"
+
+        # All raw counts and sums come back from a single statement: one
+        # single-row aggregate per table (conditional aggregates), cross-joined.
+        members = self._admin_member_aggregates(gym_id)
+        attendance = self._admin_attendance_aggregates(gym_id, today, yesterday)
+        payments = self._admin_payment_aggregates(gym_id)
+
+        kpi_stmt = (
+            select(
+                members.c.active_members,
+                attendance.c.check_ins_today,
+                attendance.c.check_ins_yesterday,
+                attendance.c.check_outs_today,
+                payments.c.fee_due_members,
+                payments.c.received_amount,
+                payments.c.received_members,
+                payments.c.pending_amount
             )
+            .select_from(members)
+            .join(attendance, true())
+            .join(payments, true())
         )
-        total_fee_due_members = self.session.exec(fee_due_stmt).first() or 0
-        
-        # 6. Attendance Overview - Additional metrics
+        (
+            active_members,
+            total_check_ins_today,
+            total_check_ins_yesterday,
+            total_check_outs_today,
+            total_fee_due_members,
+            total_fees_received_amount,
+            total_fees_received_members_count,
+            total_fees_pending_amount
+        ) = self.session.exec(kpi_stmt).one()
+
+        active_members = active_members or 0
+        total_check_ins_today = total_check_ins_today or 0
+        total_check_ins_yesterday = total_check_ins_yesterday or 0
+        total_check_outs_today = total_check_outs_today or 0
+        total_fee_due_members = total_fee_due_members or 0
+        total_fees_received_amount = total_fees_received_amount or Decimal("0.0")
+        total_fees_received_members_count = total_fees_received_members_count or 0
+        total_fees_pending_amount = total_fees_pending_amount or Decimal("0.0")
+        
+        # Attendance Overview - Additional metrics
         absent_today_count = max(0, active_members - total_check_ins_today)
         present_percentage = (total_check_ins_today / active_members * 100) if active_members > 0 else 0.0
         
@@ -156,46 +174,6 @@ class DashboardService:
         else:
             present_today_trend_percentage = 0.0
         
-        # 7. Fees & Revenue - Additional metrics
-        # Total fees received: Sum of payments with status "paid" or "completed" or "verified"
-        received_payments_stmt = select(func.sum(Payment.amount)).where(
-            and_(
-                Payment.gym_id == gym_id,
-                or_(
-                    Payment.status == "paid",
-                    Payment.status == "completed",
-                    Payment.status == "verified"
-                )
-            )
-        )
-        total_fees_received_amount = self.session.exec(received_payments_stmt).first() or Decimal("0.0")
-        if total_fees_received_amount is None:
-            total_fees_received_amount = Decimal("0.0")
-        
-        # Count distinct members who paid
-        received_members_stmt = select(func.count(func.distinct(Payment.user_id))).where(
-            and_(
-                Payment.gym_id == gym_id,
-                or_(
-                    Payment.status == "paid",
-                    Payment.status == "completed",
-                    Payment.status == "verified"
-                )
-            )
-        )
-        total_fees_received_members_count = self.session.exec(received_members_stmt).first() or 0
-        
-        # Total fees pending: Sum of payments with status "pending"
-        pending_payments_stmt = select(func.sum(Payment.amount)).where(
-            and_(
-                Payment.gym_id == gym_id,
-                Payment.status == "pending"
-            )
-        )
-        total_fees_pending_amount = self.session.exec(pending_payments_stmt).first() or Decimal("0.0")
-        if total_fees_pending_amount is None:
-            total_fees_pending_amount = Decimal("0.0")
-        
         # Calculate paid/unpaid percentages
         total_expected_amount = total_fees_received_amount + total_fees_pending_amount
         if total_expected_amount > 0:
@@ -220,6 +198,56 @@ class DashboardService:
             unpaid_percentage=round(unpaid_percentage, 2)
         )
 
+    def _admin_member_aggregates(self, gym_id: str) -> Subquery:
+        """Active member count, resolving the MEMBER role through a join instead of a lookup"""
+        active_members = (
+            select(func.count(User.id).label("active_members"))
+            .join(RoleModel, RoleModel.id == User.role_id)
+            .where(
+                and_(
+                    User.gym_id == gym_id,
+                    RoleModel.name == "MEMBER",
+                    User.is_active == True
+                )
+            )
+        )
+        return active_members.subquery()
+
+    def _admin_attendance_aggregates(self, gym_id: str, today: date, yesterday: date) -> Subquery:
+        """Check-ins today/yesterday and check-outs today from the gym_daily_stats rollup (at most two rows)"""
+        attendance = (
+            select(
+                func.sum(case((GymDailyStats.local_date == today, GymDailyStats.check_ins))).label("check_ins_today"),
+                func.sum(case((GymDailyStats.local_date == yesterday, GymDailyStats.check_ins))).label("check_ins_yesterday"),
+                func.sum(case((GymDailyStats.local_date == today, GymDailyStats.check_outs))).label("check_outs_today")
+            )
+            .where(
+                and_(
+                    GymDailyStats.gym_id == gym_id,
+                    GymDailyStats.local_date.in_([today, yesterday])
+                )
+            )
+            .subquery()
+        )
+        return attendance
+
+    def _admin_payment_aggregates(self, gym_id: str) -> Subquery:
+        """Fee due members, received amount/members and pending amount from one pass over payments"""
+        is_pending = Payment.status == "pending"
+        is_received = Payment.status.in_(["paid", "completed", "verified"])
+
+        payments = (
+            select(
+                func.count(func.distinct(case((is_pending, Payment.user_id)))).label("fee_due_members"),
+                func.sum(case((is_received, Payment.amount))).label("received_amount"),
+                func.count(func.distinct(case((is_received, Payment.user_id)))).label("received_members"),
+                func.sum(case((is_pending, Payment.amount))).label("pending_amount")
+            )
+            .where(Payment.gym_id == gym_id)
+            .subquery()
+        )
+        return payments
+
     def _get_member_kpis(self, user_id: str, gym_id: Optional[str]) -> DashboardKPIsResponse:
         """Get KPIs for MEMBER role - personal statistics only"""
         today = date.today()
@@ -296,14 +324,11 @@ class DashboardService:
         focus = None
         
         ist = ZoneInfo("Asia/Kolkata")
-        today_start = datetime.combine(today, datetime.min.time()).replace(tzinfo=ist)
-        today_end = datetime.combine(today, datetime.max.time()).replace(tzinfo=ist)
         
         today_attendance_stmt = select(Attendance).where(
             and_(
                 Attendance.user_id == user_id,
-                Attendance.check_in_at >= today_start,
-                Attendance.check_in_at <= today_end
+                Attendance.local_date == today_ist()
             )
         ).order_by(Attendance.check_in_at.desc())
         
@@ -361,32 +386,33 @@ class DashboardService:
     
     def _get_last_7_days_attendance(self, user_id: str) -> List[DailyAttendanceResponse]:
         """Get last 7 days attendance streak with dates in Indian format"""
-        today = date.today()
+        return self.get_attendance_streak(user_id, days=7)
+
+    def get_attendance_streak(self, user_id: str, days: int = 7) -> List[DailyAttendanceResponse]:
+        """
+        Get a present/absent series for the last `days` days (including today), oldest first.
+
+        A single ranged query returns the distinct IST-local dates the user checked in on;
+        the series itself is built in memory, so 7, 30 or 90 day windows all cost one query.
+        """
+        window_start, today = date_window(days)
+
+        present_dates_stmt = select(Attendance.local_date).where(
+            and_(
+                Attendance.user_id == user_id,
+                Attendance.local_date.between(window_start, today)
+            )
+        ).distinct()
+        present_dates = set(self.session.exec(present_dates_stmt).all())
+
         attendance_list = []
-        
-        # Generate last 7 days (including today)
-        for i in range(6, -1, -1):  # 6 days ago to today
+        for i in range(days - 1, -1, -1):  # oldest day first, today last
             check_date = today - timedelta(days=i)
-            date_str = check_date.strftime("%d-%m-%Y")
-            
-            # Check if user has attendance on this date
-            start_of_day = datetime.combine(check_date, datetime.min.time())
-            end_of_day = datetime.combine(check_date, datetime.max.time())
-            
-            attendance_stmt = select(Attendance).where(
-                and_(
-                    Attendance.user_id == user_id,
-                    Attendance.check_in_at >= start_of_day,
-                    Attendance.check_in_at <= end_of_day
-                )
-            )
-            attendance_record = self.session.exec(attendance_stmt).first()
-            
-            status = "present" if attendance_record else "absent"
+            status = "present" if check_date in present_dates else "absent"
             attendance_list.append(
-                DailyAttendanceResponse(date=date_str, status=status)
+                DailyAttendanceResponse(date=check_date.strftime("%d-%m-%Y"), status=status)
             )
-        
+
         return attendance_list
     
     def _get_daily_quote(self) -> str:
@@ -431,6 +457,9 @@ class DashboardService:
 
     def _get_staff_kpis(self, gym_id: Optional[str]) -> DashboardKPIsResponse:
         """Get KPIs for STAFF/TRAINER role - limited gym statistics"""
+        return self._get_cached_gym_kpis("staff", gym_id, self._compute_staff_kpis)
+
+    def _compute_staff_kpis(self, gym_id: Optional[str]) -> DashboardKPIsResponse:
         if not gym_id:
             return DashboardKPIsResponse(
                 active_members=0,
@@ -439,33 +468,19 @@ class DashboardService:
                 total_fee_due_members=0
             )
         
-        today = date.today()
-        start_of_day = datetime.combine(today, datetime.min.time())
-        end_of_day = datetime.combine(today, datetime.max.time())
-        
         # 1. Active members: Return 0 (staff don't see member count)
         active_members = 0
         
-        # 2. Total check-ins today: Same as admin
-        check_ins_stmt = select(func.count(Attendance.id)).where(
-            and_(
-                Attendance.gym_id == gym_id,
-                Attendance.check_in_at >= start_of_day,
-                Attendance.check_in_at <= end_of_day
-            )
-        )
-        total_check_ins_today = self.session.exec(check_ins_stmt).first() or 0
-        
-        # 3. Total check-outs today: Same as admin
-        check_outs_stmt = select(func.count(Attendance.id)).where(
+        # 2 & 3. Total check-ins and check-outs today: Same as admin, read from the daily rollup
+        stats_stmt = select(GymDailyStats).where(
             and_(
-                Attendance.gym_id == gym_id,
-                Attendance.check_out_at.isnot(None),
-                Attendance.check_out_at >= start_of_day,
-                Attendance.check_out_at <= end_of_day
+                GymDailyStats.gym_id == gym_id,
+                GymDailyStats.local_date == today_ist()
             )
         )
-        total_check_outs_today = self.session.exec(check_outs_stmt).first() or 0
+        daily_stats = self.session.exec(stats_stmt).first()
+        total_check_ins_today = daily_stats.check_ins if daily_stats else 0
+        total_check_outs_today = daily_stats.check_outs if daily_stats else 0
         
         # 4. Total fee due members: Return 0 (staff don't see financial info)
         total_fee_due_members = 0
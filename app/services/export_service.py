@@ -0,0 +1,190 @@
+"""
+Streaming exports of a gym's members, payments and attendance as CSV or NDJSON.
+
+Rows are read through a server-side cursor (stream_results + yield_per) and
+written out one batch at a time, so memory stays flat however many rows a gym
+has. Each export reads through its own session, held only while the body
+streams. FastAPI closes the request's session after the body has been sent,
+so the routes close it themselves before returning the response.
+
+Attendance times are stored as naive UTC; they are written out in IST with
+their offset, e.g. 2026-03-10T07:00:00+05:30.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Select
+from sqlmodel import Session, select, and_
+
+from app.core.config import settings
+from app.db.db import get_engine
+from app.models.attendance import Attendance
+from app.models.member_status import MemberStatus
+from app.models.payments import Payment
+from app.models.plan import Plan
+from app.models.role import Role
+from app.models.user import User
+from app.schemas.export import ExportFormat
+from app.utils.datetime import to_ist
+
+MEMBER_COLUMNS = [
+    "id", "user_name", "name", "email", "phone", "gender", "dob", "is_active", "joined_at",
+    "plan_name", "membership_status", "plan_expiry_date", "has_pending_payment", "last_check_in",
+]
+PAYMENT_COLUMNS = [
+    "id", "created_at", "user_id", "user_name", "name", "membership_id",
+    "amount", "status", "verified_by", "proof_url",
+]
+ATTENDANCE_COLUMNS = [
+    "id", "local_date", "user_id", "user_name", "name", "check_in_at", "check_out_at", "focus",
+]
+# Naive UTC columns (attendance times and copies of them), converted to IST on the way out
+UTC_COLUMNS = {"last_check_in", "check_in_at", "check_out_at"}
+
+
+def export_members(gym_id: str, export_format: ExportFormat) -> Iterator[str]:
+    """Every member of the gym with their current plan and payment state, by name"""
+    stmt = (
+        select(
+            User.id,
+            User.user_name,
+            User.name,
+            User.email,
+            User.phone,
+            User.gender,
+            User.dob,
+            User.is_active,
+            User.created_at,
+            Plan.name,
+            MemberStatus.membership_status,
+            MemberStatus.end_date,
+            MemberStatus.has_pending_payment,
+            MemberStatus.last_check_in
+        )
+        .join(Role, Role.id == User.role_id)
+        .join(MemberStatus, and_(MemberStatus.user_id == User.id, MemberStatus.gym_id == gym_id), isouter=True)
+        .join(Plan, Plan.id == MemberStatus.plan_id, isouter=True) # type: ignore
+        .where(and_(User.gym_id == gym_id, Role.name == "MEMBER"))
+        .order_by(User.name, User.id)
+    )
+    return _stream(stmt, MEMBER_COLUMNS, export_format)
+
+
+def export_payments(
+    gym_id: str,
+    export_format: ExportFormat,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Iterator[str]:
+    """The gym's payments created within the (inclusive) date range, oldest first"""
+    conditions = [Payment.gym_id == gym_id]
+    if start_date:
+        conditions.append(Payment.created_at >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        conditions.append(Payment.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+
+    stmt = (
+        select(
+            Payment.id,
+            Payment.created_at,
+            Payment.user_id,
+            User.user_name,
+            User.name,
+            Payment.membership_id,
+            Payment.amount,
+            Payment.status,
+            Payment.verified_by,
+            Payment.proof_url
+        )
+        .join(User, User.id == Payment.user_id, isouter=True)
+        .where(and_(*conditions))
+        .order_by(Payment.created_at, Payment.id)
+    )
+    return _stream(stmt, PAYMENT_COLUMNS, export_format)
+
+
+def export_attendance(
+    gym_id: str,
+    export_format: ExportFormat,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Iterator[str]:
+    """The gym's attendance within the (inclusive) local date range, oldest first"""
+    # Bounded on local_date so only the partitions in range are scanned
+    conditions = [Attendance.gym_id == gym_id]
+    if start_date:
+        conditions.append(Attendance.local_date >= start_date)
+    if end_date:
+        conditions.append(Attendance.local_date <= end_date)
+
+    stmt = (
+        select(
+            Attendance.id,
+            Attendance.local_date,
+            Attendance.user_id,
+            User.user_name,
+            User.name,
+            Attendance.check_in_at,
+            Attendance.check_out_at,
+            Attendance.focus
+        )
+        .join(User, User.id == Attendance.user_id, isouter=True)
+        .where(and_(*conditions))
+        .order_by(Attendance.local_date, Attendance.check_in_at, Attendance.id)
+    )
+    return _stream(stmt, ATTENDANCE_COLUMNS, export_format)
+
+
+def _stream(stmt: Select, columns: List[str], export_format: ExportFormat) -> Iterator[str]:
+    utc_indexes = [index for index, column in enumerate(columns) if column in UTC_COLUMNS]
+    with Session(get_engine()) as session:
+        result = session.execute(
+            stmt.execution_options(stream_results=True, yield_per=settings.export_batch_size)
+        )
+        if export_format == ExportFormat.CSV:
+            yield _csv_lines([columns])
+        for rows in result.partitions():
+            rows = [_in_ist(row, utc_indexes) for row in rows]
+            if export_format == ExportFormat.CSV:
+                yield _csv_lines([[_csv_value(value) for value in row] for row in rows])
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(columns, [_json_value(value) for value in row]))) + "\n"
+                    for row in rows
+                )
+
+
+def _in_ist(row: Sequence[Any], utc_indexes: List[int]) -> List[Any]:
+    values = list(row)
+    for index in utc_indexes:
+        if values[index] is not None:
+            values[index] = to_ist(values[index])
+    return values
+
+
+def _csv_lines(rows: List[List[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def _csv_value(value: Any) -> Any:
+    value = _json_value(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
@@ -0,0 +1,192 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Date, delete, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select, func, and_
+from app.db.db import SessionDep
+from app.models.attendance import Attendance
+from app.models.gym_daily_stats import GymDailyStats
+from app.services.attendance_partition_service import AttendancePartitionService
+from app.utils.datetime import day_bounds, ist_timestamp, to_local_date
+
+
+class GymDailyStatsService:
+    """
+    Maintains the gym_daily_stats rollup.
+
+    The record_* methods only stage an upsert on the caller's session, so the
+    rollup is committed (or rolled back) together with the attendance write.
+    """
+
+    def __init__(self, session: SessionDep):
+        self.session = session
+
+    def record_check_in(self, attendance: Attendance, first_of_day: Optional[bool] = None) -> None:
+        """
+        Count a check-in in the rollup.
+
+        first_of_day tells whether this is the member's first check-in at the gym on that date;
+        pass it when the caller already knows, otherwise it is looked up.
+        """
+        if first_of_day is None:
+            earlier_visit_stmt = select(Attendance.id).where(
+                and_(
+                    Attendance.user_id == attendance.user_id,
+                    Attendance.local_date == attendance.local_date,
+                    Attendance.gym_id == attendance.gym_id,
+                    Attendance.id != attendance.id
+                )
+            ).limit(1)
+            first_of_day = self.session.exec(earlier_visit_stmt).first() is None
+
+        self.increment(
+            gym_id=attendance.gym_id,
+            local_date=attendance.local_date,
+            check_ins=1,
+            unique_members=1 if first_of_day else 0
+        )
+
+    def record_check_out(self, attendance: Attendance) -> None:
+        """Count a check-out in the rollup, on the date the check-out happened"""
+        self.increment(
+            gym_id=attendance.gym_id,
+            local_date=to_local_date(attendance.check_out_at),
+            check_outs=1
+        )
+
+    def get_daily_stats(self, gym_id: str, start_date: date, end_date: date) -> List[GymDailyStats]:
+        """Rollup rows for a gym between two dates (inclusive), oldest first. Days without activity have no row."""
+        stmt = select(GymDailyStats).where(
+            and_(
+                GymDailyStats.gym_id == gym_id,
+                GymDailyStats.local_date >= start_date,
+                GymDailyStats.local_date <= end_date
+            )
+        ).order_by(GymDailyStats.local_date)
+        return list(self.session.exec(stmt).all())
+
+    def backfill(
+        self,
+        gym_id: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> int:
+        """
+        Rebuild rollup rows from raw attendance, optionally limited to one gym and/or a date range.
+        Existing rows in scope are replaced. Returns the number of rows written.
+
+        Months whose attendance partitions were archived only survive in the rollup, so they
+        are never rebuilt: without `start_date` the rebuild starts at the oldest live partition,
+        and a `start_date` before it raises ValueError.
+        """
+        live_start = self.get_live_attendance_start()
+        if live_start:
+            if start_date is None:
+                start_date = live_start
+            elif start_date < live_start:
+                raise ValueError(
+                    f"Attendance before {live_start} is archived; rebuilding from {start_date} "
+                    f"would wipe its gym_daily_stats rows"
+                )
+
+        # check_out_at is stored as naive UTC; count check-outs on their IST date like record_check_out
+        check_out_date = func.date(ist_timestamp(Attendance.check_out_at), type_=Date)
+
+        check_in_filters = []
+        check_out_filters = [Attendance.check_out_at.isnot(None)]
+        stats_filters = []
+        if gym_id:
+            check_in_filters.append(Attendance.gym_id == gym_id)
+            check_out_filters.append(Attendance.gym_id == gym_id)
+            stats_filters.append(GymDailyStats.gym_id == gym_id)
+        if start_date:
+            start_of_range, _ = day_bounds(start_date)
+            check_in_filters.append(Attendance.local_date >= start_date)
+            check_out_filters.append(Attendance.check_out_at >= start_of_range)
+            stats_filters.append(GymDailyStats.local_date >= start_date)
+        if end_date:
+            _, end_of_range = day_bounds(end_date)
+            check_in_filters.append(Attendance.local_date <= end_date)
+            check_out_filters.append(Attendance.check_out_at <= end_of_range)
+            stats_filters.append(GymDailyStats.local_date <= end_date)
+
+        check_ins_stmt = (
+            select(
+                Attendance.gym_id,
+                Attendance.local_date,
+                func.count(Attendance.id),
+                func.count(func.distinct(Attendance.user_id))
+            )
+            .where(*check_in_filters)
+            .group_by(Attendance.gym_id, Attendance.local_date)
+        )
+        check_outs_stmt = (
+            select(Attendance.gym_id, check_out_date, func.count(Attendance.id))
+            .where(*check_out_filters)
+            .group_by(Attendance.gym_id, check_out_date)
+        )
+
+        now = datetime.now()
+        rows: Dict[Tuple[str, date], dict] = {}
+        for row_gym_id, local_date, check_ins, unique_members in self.session.exec(check_ins_stmt).all():
+            rows[(row_gym_id, local_date)] = {
+                "gym_id": row_gym_id,
+                "local_date": local_date,
+                "check_ins": check_ins,
+                "check_outs": 0,
+                "unique_members": unique_members,
+                "updated_at": now
+            }
+        for row_gym_id, local_date, check_outs in self.session.exec(check_outs_stmt).all():
+            row = rows.setdefault((row_gym_id, local_date), {
+                "gym_id": row_gym_id,
+                "local_date": local_date,
+                "check_ins": 0,
+                "check_outs": 0,
+                "unique_members": 0,
+                "updated_at": now
+            })
+            row["check_outs"] = check_outs
+
+        self.session.execute(delete(GymDailyStats).where(*stats_filters))
+        if rows:
+            self.session.execute(insert(GymDailyStats), list(rows.values()))
+        self.session.commit()
+
+        return len(rows)
+
+    def get_live_attendance_start(self) -> Optional[date]:
+        """First day of the oldest attached attendance partition, or None when attendance is not partitioned"""
+        partition_service = AttendancePartitionService(session=self.session)
+        if not partition_service.is_partitioned():
+            return None
+        months = partition_service.list_partitions()
+        return months[0] if months else None
+
+    def increment(
+        self,
+        gym_id: str,
+        local_date: date,
+        check_ins: int = 0,
+        check_outs: int = 0,
+        unique_members: int = 0
+    ) -> None:
+        """Atomically add to a day's counters, creating the row on first use. Not committed here."""
+        stmt = pg_insert(GymDailyStats).values(
+            gym_id=gym_id,
+            local_date=local_date,
+            check_ins=check_ins,
+            check_outs=check_outs,
+            unique_members=unique_members,
+            updated_at=datetime.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GymDailyStats.gym_id, GymDailyStats.local_date],
+            set_={
+                "check_ins": GymDailyStats.check_ins + stmt.excluded.check_ins,
+                "check_outs": GymDailyStats.check_outs + stmt.excluded.check_outs,
+                "unique_members": GymDailyStats.unique_members + stmt.excluded.unique_members,
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+        self.session.execute(stmt)
@@ -0,0 +1,145 @@
+from collections import Counter
+from datetime import date, datetime
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import delete, extract, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select, func, and_
+from app.db.db import SessionDep
+from app.models.attendance import Attendance
+from app.models.gym_hourly_stats import GymHourlyStats
+from app.schemas.attendance import AttendanceHeatmapCell, AttendanceHeatmapResponse
+from app.utils.datetime import add_months, ist_timestamp, to_ist, today_ist
+
+
+def _slot(local_date: date, check_in_at: datetime) -> Tuple[date, int, int]:
+    """(month, weekday, hour) histogram slot of a check-in; the hour is the IST hour"""
+    return local_date.replace(day=1), local_date.weekday(), to_ist(check_in_at).hour
+
+
+class GymHourlyStatsService:
+    """
+    Maintains the gym_hourly_stats histogram behind the attendance heatmap.
+
+    Rows are bucketed by month so a heatmap over any number of months is a sum
+    of at most months x 168 rows. Like GymDailyStatsService, the record_*
+    methods only stage upserts on the caller's session.
+    """
+
+    def __init__(self, session: SessionDep):
+        self.session = session
+
+    def record_check_in(self, attendance: Attendance) -> None:
+        """Count a check-in in its weekday x hour slot"""
+        month, weekday, hour = _slot(attendance.local_date, attendance.check_in_at)
+        self.increment(gym_id=attendance.gym_id, month=month, weekday=weekday, hour=hour)
+
+    def record_check_ins(self, gym_id: str, check_ins: Iterable[Tuple[date, datetime]]) -> None:
+        """Count many check-ins of one gym, given as (local_date, check_in_at) pairs"""
+        slots = Counter(_slot(local_date, check_in_at) for local_date, check_in_at in check_ins)
+        for (month, weekday, hour), count in slots.items():
+            self.increment(gym_id=gym_id, month=month, weekday=weekday, hour=hour, check_ins=count)
+
+    def get_heatmap(self, gym_id: str, months: int = 12) -> AttendanceHeatmapResponse:
+        """Check-ins per weekday x hour over the last `months` calendar months, including the current one"""
+        end_date = today_ist()
+        start_date = add_months(end_date, -(months - 1))
+
+        stmt = select(
+            GymHourlyStats.weekday,
+            GymHourlyStats.hour,
+            func.sum(GymHourlyStats.check_ins)
+        ).where(
+            and_(
+                GymHourlyStats.gym_id == gym_id,
+                GymHourlyStats.month >= start_date
+            )
+        ).group_by(GymHourlyStats.weekday, GymHourlyStats.hour)
+        counts = {(weekday, hour): int(check_ins) for weekday, hour, check_ins in self.session.exec(stmt).all()}
+
+        cells = [
+            AttendanceHeatmapCell(weekday=weekday, hour=hour, check_ins=counts.get((weekday, hour), 0))
+            for weekday in range(7)
+            for hour in range(24)
+        ]
+        return AttendanceHeatmapResponse(
+            gym_id=gym_id,
+            start_date=start_date,
+            end_date=end_date,
+            total_check_ins=sum(counts.values()),
+            max_check_ins=max(counts.values(), default=0),
+            cells=cells
+        )
+
+    def rebuild(self, gym_id: Optional[str] = None, start_month: Optional[date] = None) -> int:
+        """
+        Rebuild histogram rows from raw attendance, optionally limited to one gym and/or
+        the months from `start_month` on. Existing rows in scope are replaced.
+        Returns the number of rows written.
+        """
+        # check_in_at is stored as naive UTC; slots use the IST hour, like record_check_in.
+        # The day comes from local_date, which is already the IST date.
+        check_in_hour = extract("hour", ist_timestamp(Attendance.check_in_at))
+
+        attendance_filters = []
+        stats_filters = []
+        if gym_id:
+            attendance_filters.append(Attendance.gym_id == gym_id)
+            stats_filters.append(GymHourlyStats.gym_id == gym_id)
+        if start_month:
+            start_month = start_month.replace(day=1)
+            attendance_filters.append(Attendance.local_date >= start_month)
+            stats_filters.append(GymHourlyStats.month >= start_month)
+
+        # Grouped by day and hour in SQL; folding days into weekdays is done here
+        stmt = (
+            select(Attendance.gym_id, Attendance.local_date, check_in_hour, func.count(Attendance.id))
+            .where(*attendance_filters)
+            .group_by(Attendance.gym_id, Attendance.local_date, check_in_hour)
+        )
+        slots: Counter = Counter()
+        for row_gym_id, local_date, hour, check_ins in self.session.exec(stmt).all():
+            slots[(row_gym_id, local_date.replace(day=1), local_date.weekday(), int(hour))] += check_ins
+
+        now = datetime.now()
+        rows = [
+            {
+                "gym_id": row_gym_id,
+                "month": month,
+                "weekday": weekday,
+                "hour": hour,
+                "check_ins": check_ins,
+                "updated_at": now
+            }
+            for (row_gym_id, month, weekday, hour), check_ins in slots.items()
+        ]
+
+        self.session.execute(delete(GymHourlyStats).where(*stats_filters))
+        if rows:
+            self.session.execute(insert(GymHourlyStats), rows)
+        self.session.commit()
+
+        return len(rows)
+
+    def prune(self, before_month: date) -> None:
+        """Drop histogram months older than `before_month`"""
+        self.session.execute(delete(GymHourlyStats).where(GymHourlyStats.month < before_month.replace(day=1)))
+        self.session.commit()
+
+    def increment(self, gym_id: str, month: date, weekday: int, hour: int, check_ins: int = 1) -> None:
+        """Atomically add to a slot's counter, creating the row on first use. Not committed here."""
+        stmt = pg_insert(GymHourlyStats).values(
+            gym_id=gym_id,
+            month=month,
+            weekday=weekday,
+            hour=hour,
+            check_ins=check_ins,
+            updated_at=datetime.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GymHourlyStats.gym_id, GymHourlyStats.month, GymHourlyStats.weekday, GymHourlyStats.hour],
+            set_={
+                "check_ins": GymHourlyStats.check_ins + stmt.excluded.check_ins,
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+        self.session.execute(stmt)
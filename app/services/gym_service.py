@@ -1,13 +1,17 @@
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 import random
 import string
 
-from sqlmodel import select
+from sqlmodel import select, and_, func
 from app.core.exceptions import AlreadyExistsError, NotFoundError
 from app.db.db import SessionDep
 from app.models.gym import Gym
 from app.models.gym_rule import GymRule
+from app.models.gym_subscription import GymSubscription, SubscriptionStatus
+from app.models.og_plan import OGPlan
+from app.models.role import Role
+from app.models.user import User
 from app.schemas.gym import GymCreate, GymResponse, GymUpdate
 from app.schemas.gym_rule import GymRuleCreate, GymRuleUpdate, GymRuleResponse, GymRuleListResponse
 
@@ -34,6 +38,7 @@ class GymService:
             country=gym.country,
             dob=gym.dob,
             opening_hours=gym.opening_hours,
+            closing_time=gym.closing_time,
             is_active=gym.is_active,
             gym_code=gym_code,
             whatsapp_number=gym.whatsapp_number,
@@ -66,6 +71,37 @@ class GymService:
         
         
 
+    def get_member_limit(self, gym_id: str) -> Optional[int]:
+        """max_members of the gym's current OG plan, or None when it has no limit"""
+        og_plan = self.session.exec(
+            select(OGPlan)
+            .join(GymSubscription, GymSubscription.og_plan_id == OGPlan.id)
+            .where(
+                and_(
+                    GymSubscription.gym_id == gym_id,
+                    GymSubscription.status == SubscriptionStatus.ACTIVE,
+                    GymSubscription.end_date >= date.today()
+                )
+            )
+            .order_by(GymSubscription.end_date.desc())
+        ).first()
+        if not og_plan or og_plan.max_members <= 0:
+            return None
+        return og_plan.max_members
+
+    def count_active_members(self, gym_id: str) -> int:
+        return self.session.exec(
+            select(func.count(User.id))
+            .join(Role, Role.id == User.role_id)
+            .where(
+                and_(
+                    User.gym_id == gym_id,
+                    Role.name == "MEMBER",
+                    User.is_active == True
+                )
+            )
+        ).first() or 0
+
     def get_gym(self, gym_id: str) -> GymResponse:
         stmt = select(Gym).where(Gym.id == gym_id)
         gym = self.session.exec(stmt).first()
@@ -0,0 +1,266 @@
+"""
+Bulk import of new gym members from CSV.
+
+The file is read as a stream and handled in batches of
+settings.member_import_batch_size rows. Each batch is validated, checked
+against existing users and plans in a few set-based queries, has its
+passwords hashed on the password pool, and is written with multi-row
+inserts in one transaction. A bad row is reported and skipped, never
+failing the rest of the file.
+"""
+import csv
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, and_, or_
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundError, ValidationError
+from app.core.security import hash_passwords
+from app.db.db import SessionDep
+from app.models.member_status import MemberStatus
+from app.models.membership import Membership
+from app.models.plan import Plan
+from app.models.role import Role
+from app.models.user import User
+from app.schemas.member import ImportedMember, MemberImportError, MemberImportResponse, MemberImportRow
+from app.services.dashboard_service import invalidate_gym_kpis
+from app.services.gym_service import GymService
+from app.utils.usernames import MAX_ATTEMPTS as USERNAME_MAX_ATTEMPTS, is_username_conflict, unique_usernames, username_base
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = {
+    "name", "email", "phone", "password", "gender", "dob",
+    "address_line1", "city", "state", "postal_code", "country",
+}
+
+
+class MemberImportService:
+
+    def __init__(self, session: SessionDep):
+        self.session = session
+
+    def import_members(self, gym_id: str, lines: Iterable[str]) -> MemberImportResponse:
+        """Create a MEMBER (and, for rows with a plan, a membership) for every valid CSV row"""
+        member_role_id = self.session.exec(select(Role.id).where(Role.name == "MEMBER")).first()
+        if not member_role_id:
+            raise NotFoundError(detail="Role 'MEMBER' not found")
+
+        reader = csv.DictReader(lines)
+        missing = REQUIRED_COLUMNS - set(reader.fieldnames or [])
+        if missing:
+            raise ValidationError(detail=f"CSV is missing required columns: {', '.join(sorted(missing))}")
+
+        gym_service = GymService(session=self.session)
+        max_members = gym_service.get_member_limit(gym_id)
+        remaining_slots = None
+        if max_members is not None:
+            remaining_slots = max(max_members - gym_service.count_active_members(gym_id), 0)
+
+        response = MemberImportResponse(total_rows=0, imported_count=0, failed_count=0)
+        for batch in self._read_batches(reader):
+            allowed = max(settings.member_import_max_rows - response.total_rows, 0)
+            response.total_rows += len(batch)
+            if len(batch) > allowed:
+                if allowed or response.total_rows - len(batch) == settings.member_import_max_rows:
+                    # Reported once, on the first row over the limit; later rows are only counted
+                    response.errors.append(MemberImportError(
+                        row=batch[allowed][0],
+                        message=f"Only {settings.member_import_max_rows} rows are imported per file; "
+                                "this row and the rows after it were skipped"
+                    ))
+                batch = batch[:allowed]
+
+            rows, errors = self._validate(batch)
+            if remaining_slots is not None:
+                for row_number, _ in rows[remaining_slots:]:
+                    errors.append(MemberImportError(
+                        row=row_number,
+                        message=f"Gym has reached the maximum member limit of {max_members} for the current OG plan"
+                    ))
+                rows = rows[:remaining_slots]
+
+            imported = self._import_batch(gym_id, member_role_id, rows, errors) if rows else []
+            if remaining_slots is not None:
+                remaining_slots -= len(imported)
+            response.imported += imported
+            response.errors += errors
+
+        if response.imported:
+            invalidate_gym_kpis(gym_id)
+        response.errors.sort(key=lambda error: error.row)
+        response.imported_count = len(response.imported)
+        response.failed_count = response.total_rows - response.imported_count
+        return response
+
+    @staticmethod
+    def _read_batches(reader: csv.DictReader) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+        batch = []
+        for record in reader:
+            if not any((value or "").strip() for value in record.values() if isinstance(value, str)):
+                continue  # blank line
+            batch.append((reader.line_num, record))
+            if len(batch) >= settings.member_import_batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _validate(
+        batch: List[Tuple[int, Dict[str, str]]]
+    ) -> Tuple[List[Tuple[int, MemberImportRow]], List[MemberImportError]]:
+        rows, errors = [], []
+        for row_number, record in batch:
+            try:
+                rows.append((row_number, MemberImportRow.model_validate(record)))
+            except PydanticValidationError as e:
+                for error in e.errors():
+                    field = ".".join(str(part) for part in error["loc"]) or None
+                    errors.append(MemberImportError(row=row_number, field=field, message=error["msg"]))
+        return rows, errors
+
+    def _import_batch(
+        self,
+        gym_id: str,
+        member_role_id: str,
+        rows: List[Tuple[int, MemberImportRow]],
+        errors: List[MemberImportError]
+    ) -> List[ImportedMember]:
+        plans = self._get_plans(gym_id, {row.plan_id for _, row in rows if row.plan_id})
+        rows = self._reject_conflicts(rows, plans, errors)
+        if not rows:
+            return []
+
+        username_bases = [(row.user_name or username_base(row.email, row.name)).lower() for _, row in rows]
+        usernames = unique_usernames(self.session, username_bases)
+        password_hashes = hash_passwords([row.password for _, row in rows])
+
+        today = date.today()
+        now = datetime.now()
+        user_rows, membership_rows, status_rows, imported = [], [], [], []
+        for (row_number, row), user_name, password_hash in zip(rows, usernames, password_hashes):
+            user = User(
+                user_name=user_name,
+                name=row.name,
+                email=row.email,
+                password_hash=password_hash,
+                phone=row.phone,
+                gender=row.gender,
+                address_line1=row.address_line1,
+                address_line2=row.address_line2,
+                city=row.city,
+                state=row.state,
+                postal_code=row.postal_code,
+                country=row.country,
+                dob=row.dob,
+                role_id=member_role_id,
+                gym_id=gym_id,
+                is_active=True,
+                created_at=now
+            )
+            user_rows.append(user.model_dump())
+
+            membership = None
+            if row.plan_id:
+                plan = plans[row.plan_id]
+                duration = row.new_duration if row.new_duration is not None else plan.duration_days
+                membership = Membership(
+                    user_id=user.id,
+                    gym_id=gym_id,
+                    start_date=today,
+                    end_date=today + timedelta(days=duration),
+                    status="active",
+                    plan_id=plan.id,
+                    new_duration=row.new_duration,
+                    new_price=row.new_price
+                )
+                membership_rows.append(membership.model_dump())
+
+            # New members have no payments or check-ins yet, so their summary row is known up front
+            status_rows.append(MemberStatus(
+                user_id=user.id,
+                gym_id=gym_id,
+                current_membership_id=membership.id if membership else None,
+                plan_id=membership.plan_id if membership else None,
+                membership_status=membership.status if membership else None,
+                end_date=membership.end_date if membership else None,
+                updated_at=now
+            ).model_dump())
+            imported.append(ImportedMember(
+                row=row_number,
+                user_id=user.id,
+                user_name=user_name,
+                membership_id=membership.id if membership else None
+            ))
+
+        for attempt in range(1, USERNAME_MAX_ATTEMPTS + 1):
+            try:
+                # render_nulls keeps None values in the statement, so rows with and without
+                # a membership still go out as one multi-row INSERT per table
+                self.session.execute(insert(User), user_rows, execution_options={"render_nulls": True})
+                if membership_rows:
+                    self.session.execute(insert(Membership), membership_rows, execution_options={"render_nulls": True})
+                self.session.execute(insert(MemberStatus), status_rows, execution_options={"render_nulls": True})
+                self.session.commit()
+                return imported
+            except IntegrityError as e:
+                # Nothing in the batch was written
+                self.session.rollback()
+                if not is_username_conflict(e) or attempt == USERNAME_MAX_ATTEMPTS:
+                    logger.warning(f"Member import batch for gym {gym_id} failed: {str(e)}")
+                    break
+                # A concurrent signup took one of the names and is now visible to the IN query; pick again
+                usernames = unique_usernames(self.session, username_bases)
+                for user_row, member, user_name in zip(user_rows, imported, usernames):
+                    user_row["user_name"] = member.user_name = user_name
+
+        errors.extend(
+            MemberImportError(row=member.row, message="Could not save this row, please retry the import")
+            for member in imported
+        )
+        return []
+
+    def _reject_conflicts(
+        self,
+        rows: List[Tuple[int, MemberImportRow]],
+        plans: Dict[str, Plan],
+        errors: List[MemberImportError]
+    ) -> List[Tuple[int, MemberImportRow]]:
+        """Drop rows whose email or phone is already registered (or repeated in the file), or whose plan is unusable"""
+        emails = {row.email.lower() for _, row in rows}
+        phones = {row.phone for _, row in rows}
+        existing = self.session.exec(
+            select(User.email, User.phone).where(or_(User.email.in_(emails), User.phone.in_(phones)))
+        ).all()
+        taken_emails: Set[str] = {email.lower() for email, _ in existing}
+        taken_phones: Set[str] = {phone for _, phone in existing}
+
+        accepted = []
+        for row_number, row in rows:
+            if row.email.lower() in taken_emails:
+                errors.append(MemberImportError(row=row_number, field="email", message="User with this email is already registered"))
+            elif row.phone in taken_phones:
+                errors.append(MemberImportError(row=row_number, field="phone", message="User with this phone number is already registered"))
+            elif row.plan_id and row.plan_id not in plans:
+                errors.append(MemberImportError(row=row_number, field="plan_id", message="Plan not found for this gym"))
+            elif row.plan_id and not plans[row.plan_id].is_active:
+                errors.append(MemberImportError(row=row_number, field="plan_id", message="Plan is inactive. Only active plans can be assigned."))
+            else:
+                accepted.append((row_number, row))
+            taken_emails.add(row.email.lower())
+            taken_phones.add(row.phone)
+        return accepted
+
+    def _get_plans(self, gym_id: str, plan_ids: Set[Optional[str]]) -> Dict[str, Plan]:
+        if not plan_ids:
+            return {}
+        plans = self.session.exec(
+            select(Plan).where(and_(Plan.id.in_(plan_ids), Plan.gym_id == gym_id))
+        ).all()
+        return {plan.id: plan for plan in plans}
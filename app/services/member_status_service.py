@@ -0,0 +1,222 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import case, delete, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select, and_, func, desc
+from app.db.db import SessionDep
+from app.models.attendance import Attendance
+from app.models.member_status import MemberStatus
+from app.models.membership import Membership
+from app.models.payments import Payment
+from app.models.role import Role
+from app.models.user import User
+from app.utils.datetime import to_utc_naive
+
+
+def _membership_rank():
+    # Active memberships first, then the latest end date. Unlike "active and not yet
+    # ended", this does not depend on today, so a stored row never goes stale overnight.
+    return (
+        case((Membership.status == "active", 0), else_=1),
+        desc(Membership.end_date),
+        desc(Membership.id)
+    )
+
+
+class MemberStatusService:
+    """
+    Maintains member_status, the per-member summary behind member lists, notification
+    audiences and the membership gate.
+
+    Like the attendance rollups, methods only stage changes on the caller's session,
+    so the summary is committed (or rolled back) together with the write that changed it.
+    """
+
+    def __init__(self, session: SessionDep):
+        self.session = session
+
+    def get_status(self, user_id: str, gym_id: str) -> MemberStatus:
+        """A member's stored summary, or one computed on the fly if the row is missing"""
+        status = self.session.get(MemberStatus, (user_id, gym_id))
+        return status or self._compute(user_id, gym_id)
+
+    def refresh(self, user_id: str) -> None:
+        """Recompute a member's row after their memberships, payments or gym changed"""
+        self.session.flush()
+        row = self.session.exec(
+            select(User.gym_id, Role.name)
+            .join(Role, Role.id == User.role_id, isouter=True)
+            .where(User.id == user_id)
+        ).first()
+        gym_id = row[0] if row and row[1] == "MEMBER" else None
+
+        stale_rows = delete(MemberStatus).where(MemberStatus.user_id == user_id)
+        if gym_id:
+            stale_rows = stale_rows.where(MemberStatus.gym_id != gym_id)
+        self.session.execute(stale_rows)
+        if not gym_id:
+            return
+
+        values = self._compute(user_id, gym_id).model_dump()
+        stmt = pg_insert(MemberStatus).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MemberStatus.user_id, MemberStatus.gym_id],
+            set_={key: value for key, value in values.items() if key not in ("user_id", "gym_id")}
+        )
+        self.session.execute(stmt)
+
+    def remove(self, user_id: str) -> None:
+        """Drop a user's rows, e.g. before the user is deleted"""
+        self.session.execute(delete(MemberStatus).where(MemberStatus.user_id == user_id))
+
+    def record_check_in(self, user_id: str, gym_id: str, check_in_at: datetime) -> None:
+        """Move last_check_in forward. Members without a row are left for refresh/rebuild."""
+        # Stored as naive UTC like attendance.check_in_at, which rebuild and _compute copy
+        check_in_at = to_utc_naive(check_in_at)
+        self.session.execute(
+            update(MemberStatus)
+            .where(
+                and_(
+                    MemberStatus.user_id == user_id,
+                    MemberStatus.gym_id == gym_id
+                )
+            )
+            .values(
+                last_check_in=case(
+                    (MemberStatus.last_check_in.is_(None), check_in_at),
+                    (MemberStatus.last_check_in < check_in_at, check_in_at),
+                    else_=MemberStatus.last_check_in
+                )
+            )
+        )
+
+    def rebuild(self, gym_id: Optional[str] = None) -> int:
+        """Recompute every member's row, optionally for one gym. Returns the number of rows written."""
+        ranked_memberships = select(
+            Membership.id,
+            Membership.user_id,
+            Membership.gym_id,
+            Membership.plan_id,
+            Membership.status,
+            Membership.end_date,
+            func.row_number().over(
+                partition_by=(Membership.user_id, Membership.gym_id),
+                order_by=_membership_rank()
+            ).label("membership_rank")
+        ).subquery()
+        current_membership = select(ranked_memberships).where(
+            ranked_memberships.c.membership_rank == 1
+        ).subquery()
+        pending_payments = select(Payment.user_id, Payment.gym_id).where(
+            Payment.status == "pending"
+        ).group_by(Payment.user_id, Payment.gym_id).subquery()
+        last_check_ins = select(
+            Attendance.user_id,
+            Attendance.gym_id,
+            func.max(Attendance.check_in_at).label("last_check_in")
+        ).group_by(Attendance.user_id, Attendance.gym_id).subquery()
+
+        member_filters = [User.gym_id.isnot(None), Role.name == "MEMBER"]
+        if gym_id:
+            member_filters.append(User.gym_id == gym_id)
+        stmt = (
+            select(
+                User.id,
+                User.gym_id,
+                current_membership.c.id,
+                current_membership.c.plan_id,
+                current_membership.c.status,
+                current_membership.c.end_date,
+                pending_payments.c.user_id.isnot(None),
+                last_check_ins.c.last_check_in
+            )
+            .join(Role, Role.id == User.role_id)
+            .join(
+                current_membership,
+                and_(current_membership.c.user_id == User.id, current_membership.c.gym_id == User.gym_id),
+                isouter=True
+            )
+            .join(
+                pending_payments,
+                and_(pending_payments.c.user_id == User.id, pending_payments.c.gym_id == User.gym_id),
+                isouter=True
+            )
+            .join(
+                last_check_ins,
+                and_(last_check_ins.c.user_id == User.id, last_check_ins.c.gym_id == User.gym_id),
+                isouter=True
+            )
+            .where(and_(*member_filters))
+        )
+
+        now = datetime.now()
+        rows = [
+            {
+                "user_id": user_id,
+                "gym_id": member_gym_id,
+                "current_membership_id": membership_id,
+                "plan_id": plan_id,
+                "membership_status": membership_status,
+                "end_date": end_date,
+                "has_pending_payment": bool(has_pending_payment),
+                "last_check_in": last_check_in,
+                "updated_at": now
+            }
+            for user_id, member_gym_id, membership_id, plan_id, membership_status, end_date,
+            has_pending_payment, last_check_in in self.session.exec(stmt).all()
+        ]
+
+        stale_rows = delete(MemberStatus)
+        if gym_id:
+            stale_rows = stale_rows.where(MemberStatus.gym_id == gym_id)
+        self.session.execute(stale_rows)
+        if rows:
+            self.session.execute(insert(MemberStatus), rows)
+        self.session.commit()
+
+        return len(rows)
+
+    def _compute(self, user_id: str, gym_id: str) -> MemberStatus:
+        membership = self.session.exec(
+            select(Membership)
+            .where(
+                and_(
+                    Membership.user_id == user_id,
+                    Membership.gym_id == gym_id
+                )
+            )
+            .order_by(*_membership_rank())
+            .limit(1)
+        ).first()
+        pending_payment_id = self.session.exec(
+            select(Payment.id).where(
+                and_(
+                    Payment.user_id == user_id,
+                    Payment.gym_id == gym_id,
+                    Payment.status == "pending"
+                )
+            ).limit(1)
+        ).first()
+        last_check_in = self.session.exec(
+            select(Attendance.check_in_at)
+            .where(
+                and_(
+                    Attendance.user_id == user_id,
+                    Attendance.gym_id == gym_id
+                )
+            )
+            .order_by(desc(Attendance.local_date), desc(Attendance.check_in_at))
+            .limit(1)
+        ).first()
+
+        return MemberStatus(
+            user_id=user_id,
+            gym_id=gym_id,
+            current_membership_id=membership.id if membership else None,
+            plan_id=membership.plan_id if membership else None,
+            membership_status=membership.status if membership else None,
+            end_date=membership.end_date if membership else None,
+            has_pending_payment=pending_payment_id is not None,
+            last_check_in=last_check_in,
+            updated_at=datetime.now()
+        )
@@ -3,6 +3,9 @@ from app.core.exceptions import NotFoundError
 from app.db.db import SessionDep
 from app.models.membership import Membership
 from app.schemas.membership import MembershipCreate, MembershipResponse, MembershipUpdate
+from app.services.access_gate_service import invalidate_membership_gate
+from app.services.member_status_service import MemberStatusService
+from app.services.user_service import invalidate_user_profile
 
 
 class MembershipService:
@@ -22,7 +25,10 @@ class MembershipService:
             new_price=membership.new_price
         )
         self.session.add(db_membership)
+        MemberStatusService(self.session).refresh(db_membership.user_id)
         self.session.commit()
+        invalidate_user_profile(db_membership.user_id)
+        invalidate_membership_gate(db_membership.user_id)
         self.session.refresh(db_membership)
 
         return MembershipResponse.model_validate(db_membership.model_dump())
@@ -46,7 +52,10 @@ class MembershipService:
         for field, value in update_data.items():
             setattr(membership, field, value)
 
+        MemberStatusService(self.session).refresh(membership.user_id)
         self.session.commit()
+        invalidate_user_profile(membership.user_id)
+        invalidate_membership_gate(membership.user_id)
         self.session.refresh(membership)
 
         return MembershipResponse.model_validate(membership)
@@ -57,7 +66,11 @@ class MembershipService:
         if not membership:
             raise NotFoundError(detail=f"Membership with id {membership_id} not found")
 
+        user_id = membership.user_id
         self.session.delete(membership)
+        MemberStatusService(self.session).refresh(user_id)
         self.session.commit()
+        invalidate_user_profile(user_id)
+        invalidate_membership_gate(user_id)
         return None
 
@@ -0,0 +1,269 @@
+"""
+Live "people in the gym now" counter.
+
+An occupant is a member with an open check-in dated today (IST). Attendance
+writes adjust the counter right after they commit; a periodic reconcile job
+recounts from the attendance table to correct drift and roll over at midnight.
+Reconcile only overwrites a counter that still holds the value it read before
+recounting, so an adjust that lands meanwhile is never lost; that gym is
+corrected on the next run instead.
+
+Counters live in process memory by default. With CACHE_BACKEND_URL set they
+live in a Redis hash so every uvicorn worker reports the same number.
+"""
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from sqlmodel import Session, select, and_, func
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.db import SessionDep, get_engine
+from app.models.attendance import Attendance
+from app.schemas.occupancy import OccupancyResponse
+from app.utils.datetime import now_ist, today_ist
+
+logger = logging.getLogger(__name__)
+
+
+class OccupancyBackend(ABC):
+
+    name: str = "unknown"
+
+    @abstractmethod
+    def get(self, gym_id: str) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    def seed(self, gym_id: str, count: int) -> None:
+        """Set a gym's counter only if it has none yet"""
+        ...
+
+    @abstractmethod
+    def adjust(self, gym_id: str, delta: int) -> None:
+        """Apply a delta to a gym's counter; no-op until the gym has been seeded"""
+        ...
+
+    @abstractmethod
+    def get_all(self) -> Dict[str, int]:
+        """Every seeded counter"""
+        ...
+
+    @abstractmethod
+    def compare_and_set(self, expected: Dict[str, Optional[int]], counts: Dict[str, int]) -> int:
+        """
+        Set each gym in `counts` only if its counter still holds `expected[gym]`
+        (None: not seeded). Returns the number of gyms skipped because it moved.
+        """
+        ...
+
+
+class InMemoryOccupancyBackend(OccupancyBackend):
+
+    name = "memory"
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, gym_id: str) -> Optional[int]:
+        with self._lock:
+            return self._counts.get(gym_id)
+
+    def seed(self, gym_id: str, count: int) -> None:
+        with self._lock:
+            self._counts.setdefault(gym_id, count)
+
+    def adjust(self, gym_id: str, delta: int) -> None:
+        with self._lock:
+            if gym_id in self._counts:
+                self._counts[gym_id] += delta
+
+    def get_all(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def compare_and_set(self, expected: Dict[str, Optional[int]], counts: Dict[str, int]) -> int:
+        skipped = 0
+        with self._lock:
+            for gym_id, count in counts.items():
+                if self._counts.get(gym_id) == expected.get(gym_id):
+                    self._counts[gym_id] = count
+                else:
+                    skipped += 1
+        return skipped
+
+
+class RedisOccupancyBackend(OccupancyBackend):
+
+    name = "redis"
+    KEY = "occupancy:gyms"
+
+    # Both run as one Lua script, so no other command interleaves with them
+    ADJUST_SCRIPT = """
+        if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+            return redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+        end
+        return nil
+    """
+    # ARGV holds (gym_id, expected or '' when not seeded, count) triples
+    COMPARE_AND_SET_SCRIPT = """
+        local skipped = 0
+        for i = 1, #ARGV, 3 do
+            if (redis.call('HGET', KEYS[1], ARGV[i]) or '') == ARGV[i + 1] then
+                redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 2])
+            else
+                skipped = skipped + 1
+            end
+        end
+        return skipped
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND_URL is set but the 'redis' package is not installed") from e
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._adjust = self._client.register_script(self.ADJUST_SCRIPT)
+        self._compare_and_set = self._client.register_script(self.COMPARE_AND_SET_SCRIPT)
+
+    def get(self, gym_id: str) -> Optional[int]:
+        value = self._client.hget(self.KEY, gym_id)
+        return int(value) if value is not None else None
+
+    def seed(self, gym_id: str, count: int) -> None:
+        self._client.hsetnx(self.KEY, gym_id, count)
+
+    def adjust(self, gym_id: str, delta: int) -> None:
+        self._adjust(keys=[self.KEY], args=[gym_id, delta])
+
+    def get_all(self) -> Dict[str, int]:
+        return {gym_id: int(value) for gym_id, value in self._client.hgetall(self.KEY).items()}
+
+    def compare_and_set(self, expected: Dict[str, Optional[int]], counts: Dict[str, int]) -> int:
+        if not counts:
+            return 0
+        args = []
+        for gym_id, count in counts.items():
+            current = expected.get(gym_id)
+            args.extend([gym_id, "" if current is None else str(current), count])
+        return int(self._compare_and_set(keys=[self.KEY], args=args))
+
+
+_backend: Optional[OccupancyBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_occupancy_backend() -> OccupancyBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.cache_backend_url:
+                    _backend = RedisOccupancyBackend(settings.cache_backend_url)
+                else:
+                    _backend = InMemoryOccupancyBackend()
+    return _backend
+
+
+def adjust_occupancy(gym_id: Optional[str], delta: int) -> None:
+    """Apply a committed check-in (+1) or check-out (-1) of today's session. Never raises."""
+    if not gym_id or not delta:
+        return
+    try:
+        get_occupancy_backend().adjust(gym_id, delta)
+    except Exception as e:
+        logger.warning(f"Failed to update occupancy for gym {gym_id}: {str(e)}")
+
+
+class OccupancyService:
+
+    def __init__(self, session: SessionDep):
+        self.session = session
+
+    def get_occupancy(self, gym_id: str) -> int:
+        """Current occupancy of a gym, counted from attendance the first time the backend sees the gym"""
+        backend = get_occupancy_backend()
+        try:
+            count = backend.get(gym_id)
+        except Exception as e:
+            logger.warning(f"Failed to read occupancy for gym {gym_id}: {str(e)}")
+            return self._count_open_sessions(gym_id)
+        if count is None:
+            count = self._count_open_sessions(gym_id)
+            backend.seed(gym_id, count)
+        return max(count, 0)
+
+    def get_snapshot(self, gym_id: str) -> OccupancyResponse:
+        return OccupancyResponse(gym_id=gym_id, occupancy=self.get_occupancy(gym_id), as_of=now_ist())
+
+    def reconcile(self) -> int:
+        """
+        Recount every gym from attendance and overwrite the counters that did not move
+        while counting. Returns total occupancy.
+        """
+        backend = get_occupancy_backend()
+        # Read before counting: an adjust only follows its commit, so any commit the count
+        # misses changes the counter after this read and makes the set below skip that gym
+        expected = backend.get_all()
+        stmt = select(Attendance.gym_id, func.count(Attendance.id)).where(
+            and_(
+                Attendance.local_date == today_ist(),
+                Attendance.check_out_at.is_(None)
+            )
+        ).group_by(Attendance.gym_id)
+        counts = dict(self.session.exec(stmt).all())
+        # Gyms with a counter but no open session today roll over to 0
+        updates = {gym_id: counts.get(gym_id, 0) for gym_id in set(expected) | set(counts)}
+        skipped = backend.compare_and_set(expected, updates)
+        if skipped:
+            metrics.increment("occupancy.reconcile_skipped_total", skipped)
+
+        total = sum(counts.values())
+        metrics.set_gauge("occupancy.total", total)
+        return total
+
+    def _count_open_sessions(self, gym_id: str) -> int:
+        stmt = select(func.count(Attendance.id)).where(
+            and_(
+                Attendance.gym_id == gym_id,
+                Attendance.local_date == today_ist(),
+                Attendance.check_out_at.is_(None)
+            )
+        )
+        return self.session.exec(stmt).one()
+
+
+
+def _read_snapshot(gym_id: str) -> OccupancyResponse:
+    # Own short-lived session: the stream outlives the request's session.
+    # It only touches the database when the counter has not been seeded yet.
+    with Session(get_engine()) as session:
+        return OccupancyService(session=session).get_snapshot(gym_id)
+
+
+async def occupancy_event_stream(
+    gym_id: str,
+    is_disconnected: Callable[[], Awaitable[bool]]
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for one gym: an `occupancy` event on connect and whenever
+    the count changes, and a comment line as keep-alive when it does not.
+    """
+    last_count: Optional[int] = None
+    last_sent = time.monotonic()
+    while not await is_disconnected():
+        snapshot = await asyncio.to_thread(_read_snapshot, gym_id)
+        if snapshot.occupancy != last_count:
+            last_count = snapshot.occupancy
+            last_sent = time.monotonic()
+            yield f"event: occupancy\ndata: {snapshot.model_dump_json()}\n\n"
+        elif time.monotonic() - last_sent >= settings.occupancy_stream_heartbeat_seconds:
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(settings.occupancy_stream_poll_seconds)
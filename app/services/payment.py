@@ -15,6 +15,9 @@ from app.schemas.payments import (
     GymRevenueResponse,
 )
 from app.schemas.user import CurrentPlanResponse
+from app.services.access_gate_service import invalidate_membership_gate
+from app.services.dashboard_service import invalidate_gym_kpis
+from app.services.member_status_service import MemberStatusService
 
 
 class PaymentService:
@@ -33,8 +36,11 @@ class PaymentService:
             verified_by=payment.verified_by
         )
         self.session.add(db_payment)
+        MemberStatusService(self.session).refresh(db_payment.user_id)
         self.session.commit()
         self.session.refresh(db_payment)
+        invalidate_gym_kpis(db_payment.gym_id)
+        invalidate_membership_gate(db_payment.user_id)
 
         return PaymentResponse.model_validate(db_payment.model_dump())
 
@@ -57,8 +63,11 @@ class PaymentService:
         for field, value in update_data.items():
             setattr(payment, field, value)
 
+        MemberStatusService(self.session).refresh(payment.user_id)
         self.session.commit()
         self.session.refresh(payment)
+        invalidate_gym_kpis(payment.gym_id)
+        invalidate_membership_gate(payment.user_id)
 
         return PaymentResponse.model_validate(payment)
 
@@ -68,8 +77,12 @@ class PaymentService:
         if not payment:
             raise NotFoundError(detail=f"Payment with id {payment_id} not found")
 
+        gym_id, user_id = payment.gym_id, payment.user_id
         self.session.delete(payment)
+        MemberStatusService(self.session).refresh(user_id)
         self.session.commit()
+        invalidate_gym_kpis(gym_id)
+        invalidate_membership_gate(user_id)
         return None
 
     def create_member_payment(
@@ -122,8 +135,11 @@ class PaymentService:
             status="pending"
         )
         self.session.add(db_payment)
+        MemberStatusService(self.session).refresh(db_payment.user_id)
         self.session.commit()
         self.session.refresh(db_payment)
+        invalidate_gym_kpis(db_payment.gym_id)
+        invalidate_membership_gate(db_payment.user_id)
 
         # Send FCM notification to gym owner
         try:
@@ -182,8 +198,11 @@ class PaymentService:
         else:
             raise ValueError(f"Invalid status: {payment_status_update.status}")
 
+        MemberStatusService(self.session).refresh(payment.user_id)
         self.session.commit()
         self.session.refresh(payment)
+        invalidate_gym_kpis(payment.gym_id)
+        invalidate_membership_gate(payment.user_id)
 
         # Send FCM notification to member
         try:
@@ -1,28 +1,58 @@
 from typing import List, Optional, Tuple
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from sqlalchemy import exists
+from sqlalchemy import case, tuple_
+from sqlalchemy.orm import aliased
 from sqlmodel import select, func, and_, or_, desc, asc
 from app.core.exceptions import NotFoundError, UserNameAlreadyExistsError, UserNotFoundError
 from app.db.db import SessionDep
 from app.models.user import RoleEnum, User
 from app.models.role import Role
 from app.models.membership import Membership
+from app.models.member_status import MemberStatus
 from app.models.plan import Plan
 from app.models.role import Role
 from app.models.membership import Membership
 from app.models.plan import Plan
-from app.models.payments import Payment
 from app.schemas.user import (
     UserCreate, UserResponse, UserUpdate,
     MemberListResponse, MemberListItemResponse,
     MemberDetailResponse, CurrentPlanResponse,
     AvailableMembersListResponse, AvailableMemberResponse
 )
-from app.core.security import create_reset_token, get_password_hash, verify_reset_token
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import create_reset_token, get_password_hash, revoke_user_tokens, verify_reset_token
 from app.utils.emails import send_reset_password_mail
+from app.services.access_gate_service import invalidate_membership_gate
+from app.services.dashboard_service import invalidate_gym_kpis
+from app.services.member_status_service import MemberStatusService
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.search import text_search
+from app.utils.usernames import add_user_with_unique_username, username_base
 RESET_TOKEN_EXPIRE_MINUTES = 10
 
+# Member list sort orders: key names (ending in a unique tie-breaker) and direction.
+# "plan_expiry" is the end date of the member's listed membership; members without one sort last.
+MEMBER_SORTS = {
+    "name_asc": (("name", "id"), asc),
+    "name_desc": (("name", "id"), desc),
+    "newest_joiners": (("created_at", "id"), desc),
+    "plan_expiry_soonest": (("plan_expiry", "id"), asc),
+}
+NO_PLAN_EXPIRY = date.max
+
+# Profiles are fetched on every app start; cached per user for a short TTL and
+# dropped as soon as a user or membership write commits.
+profile_cache = TTLCache(namespace="user_profiles", ttl_seconds=settings.user_profile_cache_ttl_seconds)
+
+
+def invalidate_user_profile(*user_ids: Optional[str]) -> None:
+    """Drop cached profiles. Call after committing changes to a user or their memberships."""
+    keys = [user_id for user_id in user_ids if user_id]
+    if keys:
+        profile_cache.invalidate(*keys)
+
 
 class UserService:
 
@@ -30,94 +60,83 @@ class UserService:
         self.session = session
 
     def get_user(self, user_id: str) -> UserResponse:
-        from app.models.role import Role as RoleModel
-        from app.models.gym import Gym
-        from datetime import date
+        """
+        A user's profile in one query, served from profile_cache when possible.
 
-        stmt = select(User).where(User.id == user_id)
-        user = self.session.exec(stmt).first()
-        if not user:
-            raise UserNotFoundError(detail=f"User with id {user_id} not found")
+        For members, plan details come from their current membership (active, not yet
+        ended), else from their most recently ended one.
+        """
+        cached = profile_cache.get(user_id)
+        if cached is not None:
+            return UserResponse.model_validate(cached)
 
-        # Get role name
-        role_name = None
-        if user.role_id:
-            role_stmt = select(RoleModel).where(RoleModel.id == user.role_id)
-            role = self.session.exec(role_stmt).first()
-            role_name = role.name if role else None
+        from app.models.gym import Gym
+
+        today = date.today()
+        is_current = and_(Membership.status == "active", Membership.end_date >= today)
+        ranked_memberships = select(
+            Membership.id,
+            Membership.gym_id,
+            func.row_number().over(
+                partition_by=Membership.gym_id,
+                order_by=(
+                    case((is_current, 0), else_=1),
+                    desc(Membership.end_date),
+                    desc(Membership.id)
+                )
+            ).label("membership_rank")
+        ).where(
+            and_(
+                Membership.user_id == user_id,
+                or_(is_current, Membership.end_date < today)
+            )
+        ).subquery()
+        ProfileMembership = aliased(Membership)
 
-        # Get gym name
-        gym_name = None
-        if user.gym_id:
-            gym_stmt = select(Gym).where(Gym.id == user.gym_id)
-            gym = self.session.exec(gym_stmt).first()
-            gym_name = gym.name if gym else None
+        stmt = (
+            select(User, Role.name, Gym.name, ProfileMembership, Plan)
+            .join(Role, Role.id == User.role_id, isouter=True)
+            .join(Gym, Gym.id == User.gym_id, isouter=True)
+            .join(
+                ranked_memberships,
+                and_(
+                    Role.name == "MEMBER",
+                    ranked_memberships.c.gym_id == User.gym_id,
+                    ranked_memberships.c.membership_rank == 1
+                ),
+                isouter=True
+            )
+            .join(ProfileMembership, ProfileMembership.id == ranked_memberships.c.id, isouter=True)
+            .join(Plan, Plan.id == ProfileMembership.plan_id, isouter=True) # type: ignore
+            .where(User.id == user_id)
+        )
+        row = self.session.exec(stmt).first()
+        if not row:
+            raise UserNotFoundError(detail=f"User with id {user_id} not found")
+        user, role_name, gym_name, membership, plan = row
 
-        # For members, get plan_id and plan_amount from active membership instead of user.plan_id
+        # For members, plan_id and plan_amount come from the membership instead of user.plan_id
         plan_id = user.plan_id
         plan_amount = None
         current_plan = None
-        if role_name == "MEMBER" and user.gym_id:
-            today = date.today()
-            # Get active membership (status = 'active' and end_date >= today)
-            membership_stmt = select(Membership).where(
-                and_(
-                    Membership.user_id == user_id,
-                    Membership.gym_id == user.gym_id,
-                    Membership.status == "active",
-                    Membership.end_date >= today
-                )
-            ).order_by(desc(Membership.end_date))
-            active_membership = self.session.exec(membership_stmt).first()
-
-            if active_membership and active_membership.plan_id:
-                plan_id = active_membership.plan_id
-
-                # Get plan details to get the amount
-                plan_stmt = select(Plan).where(Plan.id == active_membership.plan_id)
-                plan = self.session.exec(plan_stmt).first()
+        if membership:
+            plan_id = membership.plan_id
 
-                if plan:
-                    # Use new_price if available, otherwise use plan.price (same logic as get_all_members)
-                    plan_amount = active_membership.new_price if active_membership.new_price else plan.price
+            if plan:
+                # Use new_price if available, otherwise use plan.price (same logic as get_all_members)
+                plan_amount = membership.new_price if membership.new_price else plan.price
 
+                if membership.status == "active" and membership.end_date >= today:
                     # Build current_plan object (same as member-detail)
-                    total_price = float(active_membership.new_price) if active_membership.new_price else float(plan.price)
-                    days_left = (active_membership.end_date - today).days
-                    if days_left <= 7:
-                        status = "expiring_soon"
-                    else:
-                        status = "active"
-
+                    days_left = (membership.end_date - today).days
                     current_plan = CurrentPlanResponse(
                         plan_id=plan.id,
                         plan_name=plan.name,
-                        expiry_date=active_membership.end_date.isoformat(),
-                        monthly_price=round(total_price, 2),
-                        status=status,
+                        expiry_date=membership.end_date.isoformat(),
+                        monthly_price=round(float(plan_amount), 2),
+                        status="expiring_soon" if days_left <= 7 else "active",
                         days_left=days_left
                     )
-            else:
-                # Check if user has any expired membership (fallback similar to get_all_members)
-                expired_stmt = select(Membership).where(
-                    and_(
-                        Membership.user_id == user_id,
-                        Membership.gym_id == user.gym_id,
-                        Membership.end_date < today
-                    )
-                ).order_by(desc(Membership.end_date))
-                expired_membership = self.session.exec(expired_stmt).first()
-
-                if expired_membership and expired_membership.plan_id:
-                    plan_id = expired_membership.plan_id
-
-                    # Get plan details to get the amount
-                    plan_stmt = select(Plan).where(Plan.id == expired_membership.plan_id)
-                    plan = self.session.exec(plan_stmt).first()
-
-                    if plan:
-                        # Use new_price if available, otherwise use plan.price
-                        plan_amount = expired_membership.new_price if expired_membership.new_price else plan.price
 
         user_dict = user.model_dump(exclude={"password_hash"})
         user_dict["role_name"] = role_name
@@ -125,7 +144,9 @@ class UserService:
         user_dict["plan_id"] = plan_id
         user_dict["plan_amount"] = plan_amount
         user_dict["current_plan"] = current_plan
-        return UserResponse(**user_dict)
+        profile = UserResponse(**user_dict)
+        profile_cache.set(user_id, profile.model_dump(mode="json"))
+        return profile
 
 
     # def get_user(self, user_id: str) -> UserResponse:
@@ -297,11 +318,23 @@ class UserService:
         sort_by: Optional[str] = None,
         pending_fees: Optional[bool] = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = True
     ) -> MemberListResponse:
+        """
+        Members of a gym, filtered and sorted.
+
+        Pages either by `page` (LIMIT/OFFSET) or, when `cursor` is given, by keyset from the
+        `next_cursor` of the previous page, which stays fast however deep the client scrolls.
+        The total is only counted when `include_total` is set.
+        """
 
         today = date.today()
         offset = (page - 1) * page_size
+        if sort_by not in MEMBER_SORTS:
+            sort_by = "name_asc"
+        sort_key_names, direction = MEMBER_SORTS[sort_by]
 
         member_role_id = self.session.exec(
             select(Role.id).where(Role.name == "MEMBER")
@@ -309,7 +342,7 @@ class UserService:
 
         if not member_role_id:
             return MemberListResponse(
-                members=[], total=0, page=page, page_size=page_size, has_next=False
+                members=[], total=0 if include_total else None, page=page, page_size=page_size, has_next=False
             )
 
         # ---- BASE FILTERS (HARD GUARANTEE) ----
@@ -321,13 +354,8 @@ class UserService:
 
         # ---- SEARCH ----
         if search:
-            term = f"%{search.lower()}%"
-            base_filters.append(
-                or_(
-                    func.lower(User.name).like(term),
-                    func.lower(User.email).like(term)
-                )
-            )
+            search_condition, _ = text_search(self.session, [User.name, User.email], search)
+            base_filters.append(search_condition)
 
         # ---- STATUS FILTERS ----
         if status and status != "all":
@@ -337,100 +365,76 @@ class UserService:
                     User.created_at >= datetime.utcnow() - timedelta(days=30)
                 )
 
-            elif status in {"active", "expired"}:
-                membership_conditions = [
-                    Membership.user_id == User.id,
-                    Membership.gym_id == gym_id
+            elif status == "active":
+                base_filters += [
+                    MemberStatus.membership_status == "active",
+                    MemberStatus.end_date >= today
                 ]
 
-                if status == "active":
-                    membership_conditions += [
-                        Membership.status == "active",
-                        Membership.end_date >= today
-                    ]
-                else:
-                    membership_conditions.append(Membership.end_date < today)
-
-                base_filters.append(
-                    exists().where(and_(*membership_conditions))
-                )
+            elif status == "expired":
+                base_filters.append(MemberStatus.end_date < today)
 
             elif status == "payment_pending":
-                base_filters.append(
-                    exists().where(
-                        and_(
-                            Payment.user_id == User.id,
-                            Payment.gym_id == gym_id,
-                            Payment.status == "pending"
-                        )
-                    )
-                )
+                base_filters.append(MemberStatus.has_pending_payment.is_(True))
 
         # ---- PENDING FEES OVERRIDE ----
         if pending_fees is True:
-            base_filters.append(
-                exists().where(
-                    and_(
-                        Payment.user_id == User.id,
-                        Payment.gym_id == gym_id,
-                        Payment.status == "pending"
-                    )
-                )
-            )
+            base_filters.append(MemberStatus.has_pending_payment.is_(True))
+
+        # ---- LISTED MEMBERSHIP: the member's summary row (see MemberStatusService) ----
+        member_status_join = and_(MemberStatus.user_id == User.id, MemberStatus.gym_id == User.gym_id)
 
-        # ---- MAIN QUERY ----
+        # ---- COUNT ----
+        total = None
+        if include_total:
+            total = self.session.exec(
+                select(func.count(User.id))
+                .join(MemberStatus, member_status_join, isouter=True)
+                .where(and_(*base_filters))
+            ).first() or 0
+
+        sort_keys = {
+            "name": User.name,
+            "created_at": User.created_at,
+            "id": User.id,
+            "plan_expiry": func.coalesce(MemberStatus.end_date, NO_PLAN_EXPIRY),
+        }
+        sort_columns = [sort_keys[name].label(f"sort_{name}") for name in sort_key_names]
+
+        # ---- MAIN QUERY (sort key ends in User.id, so the order is total) ----
         stmt = (
-            select(User, Membership, Plan)
-            .join(
-                Membership,
-                and_(
-                    Membership.user_id == User.id,
-                    Membership.gym_id == gym_id
-                ),
-                isouter=True
-            )
-            .join(Plan, Plan.id == Membership.plan_id, isouter=True) # type: ignore
+            select(User, MemberStatus, Plan, *sort_columns)
+            .join(MemberStatus, member_status_join, isouter=True)
+            .join(Plan, Plan.id == MemberStatus.plan_id, isouter=True) # type: ignore
             .where(and_(*base_filters))
         )
-
-        # ---- SORTING ----
-        if sort_by == "name_desc":
-            stmt = stmt.order_by(desc(User.name))
-        elif sort_by == "newest_joiners":
-            stmt = stmt.order_by(desc(User.created_at))
-        else:
-            stmt = stmt.order_by(asc(User.name))
-
-        # ---- COUNT ----
-        total = self.session.exec(
-            select(func.count(func.distinct(User.id))).where(and_(*base_filters))
-        ).first() or 0
-
-        # ---- PAGINATION ----
-        rows = self.session.exec(
-            stmt.limit(page_size).offset(offset)
-        ).all()
-
-        members = {}
-        for user, membership, plan in rows:
-
-            if user.id in members:
-                continue
-
+        if cursor:
+            sort_key = tuple_(*[sort_keys[name] for name in sort_key_names])
+            last_key = tuple_(*decode_cursor(cursor, sort_by))
+            stmt = stmt.where(sort_key > last_key if direction is asc else sort_key < last_key)
+        stmt = stmt.order_by(*[direction(sort_keys[name]) for name in sort_key_names]).limit(page_size + 1)
+        if not cursor:
+            stmt = stmt.offset(offset)
+        rows = self.session.exec(stmt).all()
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        members = []
+        for user, member_status, plan, *_ in rows:
             plan_name = plan_status = plan_expiry_date = days_left = None
 
-            if membership and membership.end_date:
+            if member_status and member_status.end_date:
                 plan_name = plan.name if plan else None
-                plan_expiry_date = membership.end_date
+                plan_expiry_date = member_status.end_date
 
-                if membership.end_date >= today:
-                    days_left = (membership.end_date - today).days
+                if member_status.end_date >= today:
+                    days_left = (member_status.end_date - today).days
                     plan_status = "expiring_soon" if days_left <= 7 else "active"
                 else:
                     plan_status = "expired"
                     days_left = 0
 
-            members[user.id] = MemberListItemResponse(
+            members.append(MemberListItemResponse(
                 id=user.id,
                 name=user.name,
                 email=user.email,
@@ -439,14 +443,20 @@ class UserService:
                 plan_status=plan_status,
                 plan_expiry_date=plan_expiry_date,
                 days_left=days_left
-            )
+            ))
+
+        next_cursor = None
+        if has_next:
+            last_row = rows[-1]
+            next_cursor = encode_cursor(sort_by, [getattr(last_row, f"sort_{name}") for name in sort_key_names])
 
         return MemberListResponse(
-            members=list(members.values()),
+            members=members,
             total=total,
             page=page,
             page_size=page_size,
-            has_next=(page * page_size) < total
+            has_next=has_next,
+            next_cursor=next_cursor
         )
 
 
@@ -458,6 +468,7 @@ class UserService:
         user = self.session.exec(stmt).first()
         if not user:
             raise UserNotFoundError(detail=f"User with id {user_id} not found")
+        previous_gym_id = user.gym_id
 
         # Update only provided fields
         update_data = user_update.model_dump(exclude_unset=True)
@@ -529,9 +540,18 @@ class UserService:
 
         for field, value in update_data.items():
             setattr(user, field, value)
+        if update_data.get("is_active") is False:
+            user.tokens_valid_after = datetime.utcnow()
 
+        MemberStatusService(self.session).refresh(user_id)
         self.session.commit()
         self.session.refresh(user)
+        invalidate_user_profile(user_id)
+        if update_data.get("is_active") is False:
+            revoke_user_tokens(user_id)
+        invalidate_gym_kpis(previous_gym_id)
+        if user.gym_id != previous_gym_id:
+            invalidate_gym_kpis(user.gym_id)
 
         # Get role name for response
         role_name = None
@@ -550,30 +570,18 @@ class UserService:
         if not user:
             raise UserNotFoundError(detail=f"User with id {user_id} not found")
 
+        gym_id = user.gym_id
+        MemberStatusService(self.session).remove(user_id)
         self.session.delete(user)
         self.session.commit()
+        invalidate_user_profile(user_id)
+        revoke_user_tokens(user_id)
+        invalidate_gym_kpis(gym_id)
         return None
 
     def create_user(self, user: UserCreate) -> UserResponse:
 
-        # 1. Generate username if not provided
-        if not user.user_name:
-            user.user_name = self._generate_username(user.email, user.name)
-
-        # 2. Check if username exists and generate a unique one
-        stmt = select(User).where(User.user_name == user.user_name)
-        existing = self.session.exec(stmt).first()
-        if existing:
-            # Generate a unique username by appending a number
-            base_username = user.user_name
-            counter = 1
-            while existing:
-                user.user_name = f"{base_username}{counter}"
-                stmt = select(User).where(User.user_name == user.user_name)
-                existing = self.session.exec(stmt).first()
-                counter += 1
-
-        # 3. Convert role name to role_id if role is provided
+        # 1. Convert role name to role_id if role is provided
         user_dict = user.model_dump()
         if 'role' in user_dict and user_dict['role']:
             role_name = user_dict.pop('role')
@@ -585,51 +593,19 @@ class UserService:
         elif 'role_id' not in user_dict:
             raise NotFoundError(detail="Role is required when creating a user")
 
-        # 4. Hash password if provided
+        # 2. Hash password if provided
         if 'password' in user_dict:
             user_dict['password_hash'] = get_password_hash(user_dict.pop('password'))
 
+        # 3. Save under the requested (or generated) username, suffixed if it is taken
         db_user = User(**user_dict)
-        self.session.add(db_user)
+        add_user_with_unique_username(self.session, db_user, user.user_name or username_base(user.email, user.name))
+        MemberStatusService(self.session).refresh(db_user.id)
         self.session.commit()
         self.session.refresh(db_user)
+        invalidate_gym_kpis(db_user.gym_id)
         return UserResponse(**db_user.model_dump(exclude={"password_hash"}))
 
-    def _generate_username(self, email: str, name: str) -> str:
-        """
-        Generate a username from email or name
-        Ensures minimum length of 4 characters as required by the model
-        """
-        import re
-        import random
-        import string
-
-        # Try to generate from email first (before @)
-        if email:
-            username = email.split('@')[0]
-            # Remove special characters and keep only alphanumeric
-            username = re.sub(r'[^a-zA-Z0-9]', '', username)
-            if username and len(username) >= 4:
-                return username.lower()
-            elif username:
-                # If too short, pad with random characters
-                padding = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4-len(username)))
-                return (username + padding).lower()
-
-        # Fallback to name
-        if name:
-            username = re.sub(r'[^a-zA-Z0-9]', '', name)
-            if username and len(username) >= 4:
-                return username.lower()
-            elif username:
-                # If too short, pad with random characters
-                padding = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4-len(username)))
-                return (username + padding).lower()
-
-        # Final fallback - generate a random username
-        random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
-        return f"user{random_part}"
-
     def get_available_members(
         self,
         query: Optional[str] = None
@@ -652,19 +628,21 @@ class UserService:
             )
         )
 
-        # Apply search query across all fields if provided
+        # Apply search query across all fields if provided, best matches first
+        search_rank = None
         if query:
-            search_term = f"%{query.lower()}%"
+            search_condition, search_rank = text_search(self.session, [User.name, User.email, User.user_name], query)
             stmt = stmt.where(  # type: ignore [arg-type]
                 or_(
-                    func.lower(User.name).like(search_term),
-                    func.lower(User.email).like(search_term),
-                    func.lower(User.user_name).like(search_term),
+                    search_condition,
                     User.phone.like(f"%{query}%")  # type: ignore [attr-defined]
                 )
             )
 
-        stmt = stmt.order_by(asc(User.name))
+        if search_rank is not None:
+            stmt = stmt.order_by(desc(search_rank), asc(User.name))
+        else:
+            stmt = stmt.order_by(asc(User.name))
 
         users = self.session.exec(stmt).all()
 
@@ -723,8 +701,11 @@ class UserService:
 
         # Assign user to gym
         user.gym_id = gym_id
+        MemberStatusService(self.session).refresh(user.id)
         self.session.commit()
         self.session.refresh(user)
+        invalidate_user_profile(user.id)
+        invalidate_gym_kpis(gym_id)
 
         # Create membership if plan_id is provided
         if plan_id:
@@ -760,7 +741,10 @@ class UserService:
                 new_price=new_price
             )
             self.session.add(membership)
+            MemberStatusService(self.session).refresh(user.id)
             self.session.commit()
+            invalidate_user_profile(user.id)
+            invalidate_membership_gate(user.id)
 
         return UserResponse(**user.model_dump(exclude={"password_hash"}))
 
@@ -787,7 +771,11 @@ class UserService:
         for m in self.session.exec(membership_stmt).all():
             m.status = "inactive"
             self.session.add(m)
+        MemberStatusService(self.session).refresh(user_id)
         self.session.commit()
+        invalidate_user_profile(user_id)
+        invalidate_membership_gate(user_id)
+        invalidate_gym_kpis(gym_id)
 
     def get_reset_link_data(
         self,
@@ -826,7 +814,10 @@ class UserService:
             raise ValueError("User not found")
 
         user.password_hash = get_password_hash(new_password)
+        # Sign out every session that was opened with the old password
+        user.tokens_valid_after = datetime.utcnow()
         self.session.add(user)
         self.session.commit()
+        revoke_user_tokens(user.id)
         return user
 
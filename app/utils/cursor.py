@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List
+
+from app.core.exceptions import ValidationError
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(sort: str, values: List[Any]) -> str:
+    """
+    Opaque keyset pagination token: the sort it belongs to and the sort key
+    values of the last row served.
+    """
+    payload = json.dumps({"s": sort, "k": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: str) -> List[Any]:
+    """Sort key values stored in a token. Raises ValidationError if it is malformed or from another sort."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(v) for v in payload["k"]]
+        token_sort = payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise ValidationError(detail="Invalid cursor")
+    if token_sort != sort:
+        raise ValidationError(detail="Cursor does not match the requested sort order")
+    return values
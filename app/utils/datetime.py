@@ -0,0 +1,87 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import DateTime, func, literal_column
+
+
+# All gyms currently operate in India, so calendar days are IST days. Attendance
+# timestamps are written as aware IST datetimes and stored as naive UTC.
+IST = ZoneInfo("Asia/Kolkata")
+
+
+def now_ist() -> datetime:
+    """Current timezone-aware datetime in IST"""
+    return datetime.now(IST)
+
+
+def today_ist() -> date:
+    """Current calendar date in IST"""
+    return now_ist().date()
+
+
+def to_ist(value: datetime) -> datetime:
+    """
+    Timezone-aware IST copy of a datetime.
+
+    Naive datetimes are taken as UTC, which is how the attendance columns store them.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(IST)
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Naive UTC form of a datetime, for comparing with or writing to attendance timestamp columns"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_local_date(value: datetime) -> date:
+    """Calendar date (IST) an attendance timestamp belongs to; naive values are UTC"""
+    return to_ist(value).date()
+
+
+def ist_timestamp(column):
+    """
+    SQL expression for the IST wall-clock time of a naive UTC timestamp column (PostgreSQL).
+
+    Use it before extracting a date or hour, e.g. func.date(ist_timestamp(Attendance.check_out_at)).
+    """
+    # Zone names are inlined so the same expression in SELECT and GROUP BY compiles identically
+    return func.timezone(
+        literal_column(f"'{IST.key}'"),
+        func.timezone(literal_column("'UTC'"), column),
+        type_=DateTime
+    )
+
+
+def date_window(days: int, end: Optional[date] = None) -> Tuple[date, date]:
+    """
+    First and last IST date (inclusive) of a `days`-long window ending on `end` (default: today).
+
+    Meant for range filters on attendance.local_date, e.g.
+    Attendance.local_date.between(*date_window(7)).
+    """
+    last = end or today_ist()
+    return last - timedelta(days=days - 1), last
+
+
+def day_bounds(first: date, last: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """
+    Naive UTC bounds covering the IST days `first` through `last` (default: the same day).
+
+    Only for timestamp columns that have no local date of their own, such as
+    attendance.check_out_at; check-ins should be filtered on attendance.local_date.
+    """
+    return (
+        to_utc_naive(datetime.combine(first, time.min, tzinfo=IST)),
+        to_utc_naive(datetime.combine(last or first, time.max, tzinfo=IST)),
+    )
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after the month of `month` (negative goes back)"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
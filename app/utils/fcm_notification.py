@@ -8,13 +8,12 @@ from google.oauth2 import service_account
 from google.auth.transport.requests import Request
 from app.models.role import Role
 from app.core.config import settings
-from app.models.membership import Membership
-from app.models.payments import Payment
+from app.models.member_status import MemberStatus
 from app.models.user import User
 from app.schemas.announcement import SendToType
 from typing import Optional
 from datetime import date, timedelta
-from sqlmodel import select, and_, func
+from sqlmodel import select, and_
 import base64
 import json
 # Setup logger
@@ -391,22 +390,12 @@ def send_fcm_notification_to_gym_members_by_filter(
         ).all()
 
     elif send_to == SendToType.PENDING_FEES:
-        pending_user_ids = session.exec(
-            select(func.distinct(Payment.user_id)).where(
-                and_(
-                    Payment.gym_id == gym_id,
-                    Payment.status == "pending"
-                )
-            )
+        members = session.exec(
+            select(User)
+            .join(MemberStatus, and_(MemberStatus.user_id == User.id, MemberStatus.gym_id == gym_id))
+            .where(and_(*base_conditions, MemberStatus.has_pending_payment.is_(True)))
         ).all()
 
-        if pending_user_ids:
-            members = session.exec(
-                select(User).where(
-                    and_(*base_conditions, User.id.in_(pending_user_ids))
-                )
-            ).all()
-
     elif send_to == SendToType.BIRTHDAY:
         today = date.today()
         all_members = session.exec(
@@ -418,44 +407,22 @@ def send_fcm_notification_to_gym_members_by_filter(
             if m.dob and m.dob.month == today.month and m.dob.day == today.day
         ]
 
-    elif send_to == SendToType.PLAN_EXPIRING_TODAY:
-        today = date.today()
-        expiring_user_ids = session.exec(
-            select(Membership.user_id).where(
-                and_(
-                    Membership.gym_id == gym_id,
-                    Membership.end_date == today,
-                    Membership.status == "active"
-                )
-            )
-        ).all()
-
-        if expiring_user_ids:
-            members = session.exec(
-                select(User).where(
-                    and_(*base_conditions, User.id.in_(expiring_user_ids))
-                )
-            ).all()
-
-    elif send_to == SendToType.PLAN_EXPIRING_IN_3_DAYS:
-        target_date = date.today() + timedelta(days=3)
-        expiring_user_ids = session.exec(
-            select(Membership.user_id).where(
+    elif send_to in (SendToType.PLAN_EXPIRING_TODAY, SendToType.PLAN_EXPIRING_IN_3_DAYS):
+        # Members whose current membership ends on the day, so members who already renewed are skipped
+        days_ahead = 0 if send_to == SendToType.PLAN_EXPIRING_TODAY else 3
+        target_date = date.today() + timedelta(days=days_ahead)
+        members = session.exec(
+            select(User)
+            .join(MemberStatus, and_(MemberStatus.user_id == User.id, MemberStatus.gym_id == gym_id))
+            .where(
                 and_(
-                    Membership.gym_id == gym_id,
-                    Membership.end_date == target_date,
-                    Membership.status == "active"
+                    *base_conditions,
+                    MemberStatus.end_date == target_date,
+                    MemberStatus.membership_status == "active"
                 )
             )
         ).all()
 
-        if expiring_user_ids:
-            members = session.exec(
-                select(User).where(
-                    and_(*base_conditions, User.id.in_(expiring_user_ids))
-                )
-            ).all()
-
     elif send_to == SendToType.SPECIFIC_MEMBERS:
         if member_ids:
             members = session.exec(
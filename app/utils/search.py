@@ -0,0 +1,34 @@
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import ColumnElement, func, or_
+from sqlmodel import Session
+
+
+def text_search(
+    session: Session,
+    columns: Sequence[ColumnElement],
+    term: str
+) -> Tuple[ColumnElement, Optional[ColumnElement]]:
+    """
+    Case-insensitive search of `term` across `columns`.
+
+    Returns (condition, rank). On Postgres a row matches when a column contains the
+    term or is word-similar to it (pg_trgm, so typos still match), and rank is the
+    best word similarity for ordering results, most relevant first. Both are served
+    by the trigram GIN indexes on lower(column). Elsewhere (SQLite) it is a plain
+    LIKE '%term%' and rank is None.
+    """
+    term = term.lower()
+    pattern = f"%{term}%"
+    lowered = [func.lower(column) for column in columns]
+
+    if session.get_bind().dialect.name != "postgresql":
+        return or_(*[column.like(pattern) for column in lowered]), None
+
+    condition = or_(
+        *[column.like(pattern) for column in lowered],
+        *[column.op("%>")(term) for column in lowered]
+    )
+    similarities = [func.word_similarity(term, column) for column in lowered]
+    rank = func.greatest(*similarities) if len(similarities) > 1 else similarities[0]
+    return condition, rank
@@ -0,0 +1,110 @@
+"""
+Username generation shared by signup, owner-created users and the member import.
+
+Candidates are proposed in rounds and checked with one IN query per round instead
+of one SELECT per probe. The unique constraint on users.user_name has the final
+say: a flush that loses a race to a concurrent signup is retried with the next
+free candidate.
+"""
+import random
+import re
+import string
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.core.exceptions import UserNameAlreadyExistsError
+from app.models.user import User
+
+# Suffixed candidates checked per base in each round trip
+CANDIDATES_PER_ROUND = 10
+# Leaves room for a numeric suffix within the 72 characters of users.user_name
+BASE_MAX_LENGTH = 64
+# Flushes attempted before giving up when concurrent signups keep taking the chosen name
+MAX_ATTEMPTS = 3
+
+
+def username_base(email: str, name: str) -> str:
+    """
+    Generate a username from email or name
+    Ensures minimum length of 4 characters as required by the model
+    """
+    # Try to generate from email first (before @), then fall back to name
+    for source in (email.split('@')[0] if email else None, name):
+        if not source:
+            continue
+        # Remove special characters and keep only alphanumeric
+        username = re.sub(r'[^a-zA-Z0-9]', '', source)
+        if username and len(username) >= 4:
+            return username.lower()
+        elif username:
+            # If too short, pad with random characters
+            padding = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4-len(username)))
+            return (username + padding).lower()
+
+    # Final fallback - generate a random username
+    random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    return f"user{random_part}"
+
+
+def unique_usernames(session: Session, bases: List[str], exclude: Iterable[str] = ()) -> List[str]:
+    """
+    A free username per base, in order: the base itself, else the base suffixed
+    with 1, 2, ... Repeated bases get distinct names, and names in `exclude` are
+    treated as taken.
+    """
+    bases = [base[:BASE_MAX_LENGTH] for base in bases]
+    assigned: List[Optional[str]] = [None] * len(bases)
+    next_suffix = {base: 0 for base in bases}
+    taken: Set[str] = set(exclude)
+    pending = list(range(len(bases)))
+    while pending:
+        candidates = {
+            base: [f"{base}{n}" if n else base for n in range(next_suffix[base], next_suffix[base] + CANDIDATES_PER_ROUND)]
+            for base in {bases[index] for index in pending}
+        }
+        taken.update(session.exec(
+            select(User.user_name).where(User.user_name.in_([c for names in candidates.values() for c in names]))
+        ).all())
+
+        still_pending = []
+        for index in pending:
+            base = bases[index]
+            free = next((name for name in candidates[base] if name not in taken), None)
+            if free is None:
+                still_pending.append(index)
+                continue
+            assigned[index] = free
+            taken.add(free)
+        for base in {bases[index] for index in still_pending}:
+            next_suffix[base] += CANDIDATES_PER_ROUND
+        pending = still_pending
+    return assigned
+
+
+def is_username_conflict(error: IntegrityError) -> bool:
+    """Whether an insert failed on the users.user_name unique constraint"""
+    return "user_name" in str(error.orig)
+
+
+def add_user_with_unique_username(session: Session, user: User, base: str) -> None:
+    """
+    Add `user` to the session under the first free username for `base` and flush it.
+
+    The flush runs in a savepoint, so losing a race on the name only rolls back the
+    user's INSERT, not the caller's transaction, before the next candidate is tried.
+    """
+    lost: Set[str] = set()
+    for _ in range(MAX_ATTEMPTS):
+        user.user_name = unique_usernames(session, [base], exclude=lost)[0]
+        try:
+            with session.begin_nested():
+                session.add(user)
+                session.flush()
+            return
+        except IntegrityError as e:
+            if not is_username_conflict(e):
+                raise
+            lost.add(user.user_name)
+    raise UserNameAlreadyExistsError(detail="Could not allocate a unique username, please try again")
@@ -12,6 +12,9 @@ from app.api.v1.users import router as users_router
 from app.core import config
 from contextlib import asynccontextmanager
 from app.db.db import create_db_and_tables
+from app.core.background import start_background_jobs, stop_background_jobs
+from app.core.permission_guard import warm_permission_matrix
+from app.services.background_jobs import register_background_jobs
 from app.schemas.response import APIResponse
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -19,7 +22,12 @@ from fastapi.middleware.cors import CORSMiddleware
 @asynccontextmanager
 async def on_startup(application: FastAPI):
     create_db_and_tables()
+    warm_permission_matrix()
+    if config.settings.background_jobs_enabled:
+        register_background_jobs()
+        start_background_jobs()
     yield
+    await stop_background_jobs()
 
 
 @lru_cache()
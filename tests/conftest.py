@@ -0,0 +1,186 @@
+import os
+
+# Settings are read from the environment at import time; tests never reach these services
+for _name, _value in {
+    "AWS_REGION": "ap-south-1",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "SMTP_HOST": "localhost",
+    "SMTP_PORT": "25",
+    "SMTP_USER": "test@example.com",
+    "SMTP_PASSWORD": "test",
+    "NO_REPLY_EMAIL": "no-reply@example.com",
+    "SUPPORT_EMAIL": "support@example.com",
+    "APP_NAME": "organised-gym-test",
+    "SECRET_KEY": "test-secret-key",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+
+import app.db.db  # noqa: F401  registers the tables on SQLModel.metadata
+from app.core.security import create_access_token
+from app.models import app_info, bank_account, gym_rule  # noqa: F401  models app.db.db does not import
+from app.models.gym import Gym
+from app.models.gym_subscription import GymSubscription, SubscriptionStatus
+from app.models.membership import Membership
+from app.models.og_plan import BillingCycle, OGPlan
+from app.models.plan import Plan
+from app.models.role import Role
+from app.models.user import User
+from app.services.member_status_service import MemberStatusService
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file database behind the default connection pool, so tests can count checked-out connections
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def count_queries(engine):
+    """`with count_queries() as statements:` collects every SQL statement run inside the block"""
+    @contextmanager
+    def count_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return count_queries
+
+
+@pytest.fixture
+def roles(session):
+    roles = {name: Role(name=name) for name in ("MEMBER", "ADMIN", "STAFF", "TRAINER", "PLATFORM_ADMIN")}
+    session.add_all(roles.values())
+    session.commit()
+    return roles
+
+
+@pytest.fixture
+def make_user(session, roles):
+    def make_user(user_name: str, role: str = "MEMBER", **fields) -> User:
+        user = User(**{
+            "user_name": user_name,
+            "name": f"{user_name.title()} Test",
+            "email": f"{user_name}@example.com",
+            "password_hash": "not-a-real-hash",
+            "phone": "9999999999",
+            "gender": "MALE",
+            "address_line1": "1 Test Street",
+            "city": "Pune",
+            "state": "Maharashtra",
+            "postal_code": "411001",
+            "country": "India",
+            "dob": date(1990, 1, 1),
+            "role_id": roles[role].id,
+            **fields
+        })
+        session.add(user)
+        session.commit()
+        return user
+
+    return make_user
+
+
+@pytest.fixture
+def gym(session, make_user):
+    owner = make_user("owner", role="ADMIN")
+    gym = Gym(
+        owner_id=owner.id,
+        name="Test Gym",
+        address_line1="1 Test Street",
+        city="Pune",
+        state="Maharashtra",
+        postal_code="411001",
+        country="India",
+        gym_code="TESTGY",
+    )
+    session.add(gym)
+    session.commit()
+    return gym
+
+
+@pytest.fixture
+def subscription(session, gym):
+    """An ACTIVE OG plan for `gym` running until a month from today, so the access gate lets its users in"""
+    og_plan = OGPlan(name="Test OG Plan", price=Decimal("999"), billing_cycle=BillingCycle.MONTHLY, max_members=100, max_staff=5)
+    session.add(og_plan)
+    subscription = GymSubscription(
+        gym_id=gym.id,
+        og_plan_id=og_plan.id,
+        start_date=date.today() - timedelta(days=30),
+        end_date=date.today() + timedelta(days=30),
+        status=SubscriptionStatus.ACTIVE,
+    )
+    session.add(subscription)
+    session.commit()
+    return subscription
+
+
+@pytest.fixture
+def plan(session, gym):
+    plan = Plan(gym_id=gym.id, name="Monthly", duration_days=30, price=Decimal("1000"))
+    session.add(plan)
+    session.commit()
+    return plan
+
+
+@pytest.fixture
+def member(session, gym, plan, make_user):
+    """A member of `gym` with an active membership running until a month from today, and its member_status row"""
+    member = make_user("member", gym_id=gym.id)
+    session.add(Membership(
+        user_id=member.id,
+        gym_id=gym.id,
+        plan_id=plan.id,
+        start_date=date.today() - timedelta(days=1),
+        end_date=date.today() + timedelta(days=30),
+        status="active",
+    ))
+    session.commit()
+    MemberStatusService(session=session).rebuild(gym.id)
+    return member
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    """The app against `engine`: request sessions and every Session(get_engine()) use the test database"""
+    from fastapi.testclient import TestClient
+    from main import app as application
+
+    monkeypatch.setattr(app.db.db, "_engine", engine)
+    return TestClient(application)
+
+
+@pytest.fixture
+def auth_headers():
+    def auth_headers(user: User) -> dict:
+        return {"Authorization": f"Bearer {create_access_token({'sub': user.id})}"}
+
+    return auth_headers
@@ -0,0 +1,170 @@
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+
+from app.api.v1.platform_admin.update import _create_or_update_gym_subscription
+from app.core import permissions
+from app.core.cache import InMemoryCacheBackend
+from app.core.config import settings
+from app.models.membership import Membership
+from app.schemas.payments import PaymentCreate
+from app.services import access_gate_service
+from app.services.access_gate_service import (
+    AccessGateService,
+    _seconds_until_boundary,
+    membership_gate_cache,
+    subscription_gate_cache,
+)
+from app.services.member_status_service import MemberStatusService
+from app.services.membership_service import MembershipService
+from app.services.payment import PaymentService
+
+END_DATE = date(2026, 3, 10)
+
+
+class RecordingCacheBackend(InMemoryCacheBackend):
+    """In-memory backend that remembers the TTL each key was last stored with"""
+
+    def __init__(self):
+        super().__init__()
+        self.ttls = {}
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self.ttls[key] = ttl_seconds
+        super().set(key, value, ttl_seconds)
+
+
+@pytest.fixture(autouse=True)
+def gate_backend(monkeypatch):
+    backend = RecordingCacheBackend()
+    monkeypatch.setattr(subscription_gate_cache, "_backend", backend)
+    monkeypatch.setattr(membership_gate_cache, "_backend", backend)
+    monkeypatch.setattr(settings, "subscription_grace_period_days", 5)
+    return backend
+
+
+@pytest.fixture
+def freeze(monkeypatch):
+    """freeze(moment) makes it `moment` for the gate's datetime.now() and date.today()"""
+    def freeze(moment: datetime) -> None:
+        class FrozenDateTime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return moment
+
+        class FrozenDate(date):
+            @classmethod
+            def today(cls):
+                return moment.date()
+
+        monkeypatch.setattr(access_gate_service, "datetime", FrozenDateTime)
+        monkeypatch.setattr(permissions, "date", FrozenDate)
+
+    return freeze
+
+
+@pytest.mark.parametrize("now, expected", [
+    # On the end date: the gate's answer first changes at midnight
+    (datetime(2026, 3, 10, 12, 0), 12 * 3600),
+    (datetime(2026, 3, 10, 23, 59, 59), 1),
+    # From end_date + 1 the grace period runs; the next change is when it ends
+    (datetime(2026, 3, 11, 0, 0), 5 * 24 * 3600),
+    (datetime(2026, 3, 15, 23, 59, 30), 30),
+    # From end_date + grace + 1 nothing changes any more
+    (datetime(2026, 3, 16, 0, 0), None),
+])
+def test_gate_ttl_ends_at_next_boundary(freeze, now, expected):
+    freeze(now)
+    assert _seconds_until_boundary(END_DATE) == expected
+
+
+def test_gate_ttl_without_end_date(freeze):
+    freeze(datetime(2026, 3, 10, 12, 0))
+    assert _seconds_until_boundary(None) is None
+
+
+def _end_membership_on(session, member, end_date: date) -> None:
+    membership = session.exec(select(Membership).where(Membership.user_id == member.id)).one()
+    membership.end_date = end_date
+    session.add(membership)
+    session.commit()
+    MemberStatusService(session=session).rebuild(member.gym_id)
+
+
+def _gate(session, member):
+    return asyncio.run(permissions.get_current_active_user(current_user=member, session=session))
+
+
+def test_cached_gate_entries_never_outlive_the_grace_period(session, gym, subscription, member, freeze, gate_backend):
+    _end_membership_on(session, member, END_DATE)
+
+    # Last second of the grace period: let in, cached for that one second only
+    freeze(datetime(2026, 3, 15, 23, 59, 59))
+    assert _gate(session, member) is member
+    assert gate_backend.ttls[f"membership_gate:{member.id}"] == 1
+
+    # Midnight after: the cached entry is still there, and the member is turned away
+    freeze(datetime(2026, 3, 16, 0, 0))
+    assert membership_gate_cache.peek(member.id) is not None
+    with pytest.raises(HTTPException) as rejected:
+        _gate(session, member)
+    assert rejected.value.detail["errorCode"] == "MEMBERSHIP_INACTIVE"
+
+
+def test_subscription_gate_entry_expires_the_day_after_end_date(session, gym, subscription, freeze, gate_backend):
+    subscription.end_date = END_DATE
+    session.add(subscription)
+    session.commit()
+
+    freeze(datetime(2026, 3, 10, 23, 58, 0))
+    assert AccessGateService(session).get_subscription_end_date(gym.id) == END_DATE
+    assert gate_backend.ttls[f"subscription_gate:{gym.id}"] == 120
+
+
+def _warm_membership_gate(session, member) -> None:
+    AccessGateService(session).get_membership(member.id, member.gym_id)
+    assert membership_gate_cache.peek(member.id) is not None
+
+
+def test_payment_writes_invalidate_membership_gate(session, gym, member):
+    membership_id = session.exec(select(Membership.id).where(Membership.user_id == member.id)).one()
+    payments = PaymentService(session=session)
+
+    _warm_membership_gate(session, member)
+    payment = payments.create_payment(PaymentCreate(
+        user_id=member.id,
+        membership_id=membership_id,
+        gym_id=gym.id,
+        amount=Decimal("1000"),
+        proof_url=None,
+        status="pending",
+        verified_by=None,
+    ))
+    assert membership_gate_cache.peek(member.id) is None
+
+    _warm_membership_gate(session, member)
+    payments.delete_payment(payment.id)
+    assert membership_gate_cache.peek(member.id) is None
+
+
+def test_membership_write_invalidates_membership_gate(session, member):
+    membership_id = session.exec(select(Membership.id).where(Membership.user_id == member.id)).one()
+
+    _warm_membership_gate(session, member)
+    MembershipService(session=session).delete_membership(membership_id)
+
+    assert membership_gate_cache.peek(member.id) is None
+    assert AccessGateService(session).get_membership(member.id, member.gym_id) == (None, None)
+
+
+def test_subscription_write_invalidates_subscription_gate(session, gym, subscription):
+    AccessGateService(session).get_subscription_end_date(gym.id)
+    assert subscription_gate_cache.peek(gym.id) is not None
+
+    _create_or_update_gym_subscription(gym_id=gym.id, og_plan_id=subscription.og_plan_id, session=session)
+
+    assert subscription_gate_cache.peek(gym.id) is None
@@ -0,0 +1,60 @@
+from datetime import datetime, time, timedelta, timezone
+
+from app.models.attendance import Attendance
+from app.services.auto_checkout_service import AutoCheckoutService
+from app.utils.datetime import to_local_date
+
+
+def _open_session(session, gym, member, check_in_at: datetime) -> Attendance:
+    """An open attendance row, stored the way Postgres stores it: naive UTC"""
+    attendance = Attendance(
+        user_id=member.id,
+        gym_id=gym.id,
+        check_in_at=check_in_at,
+        local_date=to_local_date(check_in_at),
+        check_out_at=None,
+    )
+    session.add(attendance)
+    session.commit()
+    return attendance
+
+
+def test_auto_checkout_keeps_recent_session_open(session, gym, make_user):
+    # The job runs with the default `now`, which is IST; stored check-ins are UTC
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    member = make_user("member", gym_id=gym.id)
+    attendance = _open_session(session, gym, member, now - timedelta(hours=1))
+
+    closed = AutoCheckoutService(session=session).close_stale_sessions()
+
+    session.refresh(attendance)
+    assert closed == 0
+    assert attendance.check_out_at is None
+
+
+def test_auto_checkout_closes_session_at_cutoff_in_utc(session, gym, make_user):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    member = make_user("member", gym_id=gym.id)
+    check_in_at = now - timedelta(hours=5)
+    attendance = _open_session(session, gym, member, check_in_at)
+
+    closed = AutoCheckoutService(session=session).close_stale_sessions()
+
+    session.refresh(attendance)
+    assert closed == 1
+    # Default auto_checkout_after_hours is 4; the cutoff is stored as naive UTC like check-ins
+    assert attendance.check_out_at == check_in_at + timedelta(hours=4)
+
+
+def test_auto_checkout_uses_ist_closing_time(session, gym, make_user):
+    gym.closing_time = time(21, 0)  # IST
+    session.add(gym)
+    member = make_user("member", gym_id=gym.id)
+    # 18:00 IST check-in, swept at 21:30 IST: before the 4 hour fallback, after closing
+    attendance = _open_session(session, gym, member, datetime(2026, 3, 10, 12, 30))
+
+    closed = AutoCheckoutService(session=session).close_stale_sessions(now=datetime(2026, 3, 10, 16, 0))
+
+    session.refresh(attendance)
+    assert closed == 1
+    assert attendance.check_out_at == datetime(2026, 3, 10, 15, 30)
@@ -0,0 +1,106 @@
+from datetime import date
+
+from sqlmodel import select
+
+from app.models.attendance import Attendance
+from app.schemas.attendance import AttendanceBatchEvent, AttendanceEventStatus, AttendanceEventType
+from app.services.attendance_service import AttendanceService
+
+
+def _event(client_event_id: str, user_id: str, occurred_at: str,
+           event_type: AttendanceEventType = AttendanceEventType.CHECK_IN) -> AttendanceBatchEvent:
+    return AttendanceBatchEvent(
+        client_event_id=client_event_id,
+        event_type=event_type,
+        user_id=user_id,
+        occurred_at=occurred_at
+    )
+
+
+def _ingest(session, gym, *events: AttendanceBatchEvent):
+    return AttendanceService(session=session).ingest_attendance_batch(gym_id=gym.id, events=list(events))
+
+
+def _statuses(response):
+    return [(result.status, result.detail) for result in response.results]
+
+
+def _attendance(session, member):
+    return session.exec(select(Attendance).where(Attendance.user_id == member.id)).all()
+
+
+def test_batch_replay_reports_duplicates(session, gym, make_user):
+    member = make_user("member", gym_id=gym.id)
+    events = [
+        _event("kiosk-1", member.id, "2026-03-10T07:00:00+05:30"),
+        _event("kiosk-2", member.id, "2026-03-10T08:30:00+05:30", AttendanceEventType.CHECK_OUT),
+    ]
+
+    first = _ingest(session, gym, *events, events[0])
+    replay = _ingest(session, gym, *events)
+
+    assert first.applied_count == 2
+    # Repeated inside the batch
+    assert first.results[2].status == AttendanceEventStatus.DUPLICATE
+    assert replay.duplicate_count == 2
+    assert [result.attendance_id for result in replay.results] == [result.attendance_id for result in first.results[:2]]
+    attendance = _attendance(session, member)
+    assert len(attendance) == 1
+    assert attendance[0].check_out_at is not None
+
+
+def test_batch_rejects_unknown_and_inactive_members(session, gym, make_user):
+    inactive = make_user("inactive", gym_id=gym.id, is_active=False)
+    trainer = make_user("trainer", role="TRAINER", gym_id=gym.id)
+
+    response = _ingest(
+        session, gym,
+        _event("kiosk-1", "no-such-user", "2026-03-10T07:00:00+05:30"),
+        _event("kiosk-2", inactive.id, "2026-03-10T07:05:00+05:30"),
+        _event("kiosk-3", trainer.id, "2026-03-10T07:10:00+05:30"),
+    )
+
+    assert _statuses(response) == [(AttendanceEventStatus.REJECTED, "Member does not belong to this gym")] * 3
+    assert session.exec(select(Attendance)).all() == []
+    # Rejected claims are released, so a corrected replay is evaluated again
+    inactive.is_active = True
+    session.add(inactive)
+    session.commit()
+    assert _ingest(session, gym, _event("kiosk-2", inactive.id, "2026-03-10T07:05:00+05:30")).applied_count == 1
+
+
+def test_batch_allows_one_check_in_per_day(session, gym, make_user):
+    member = make_user("member", gym_id=gym.id)
+    _ingest(session, gym, _event("kiosk-1", member.id, "2026-03-10T07:00:00+05:30"))
+
+    response = _ingest(
+        session, gym,
+        # Same IST day as the earlier upload
+        _event("kiosk-2", member.id, "2026-03-10T18:00:00+05:30"),
+        # 01:30 IST on the 11th, sent in UTC: the next day
+        _event("kiosk-3", member.id, "2026-03-10T20:00:00+00:00"),
+        _event("kiosk-4", member.id, "2026-03-11T19:00:00+05:30"),
+    )
+
+    assert _statuses(response) == [
+        (AttendanceEventStatus.REJECTED, "Member has already checked in on this date"),
+        (AttendanceEventStatus.APPLIED, None),
+        (AttendanceEventStatus.REJECTED, "Member has already checked in on this date"),
+    ]
+    assert sorted(row.local_date for row in _attendance(session, member)) == [date(2026, 3, 10), date(2026, 3, 11)]
+
+
+def test_batch_rejects_occurred_at_without_offset(session, gym, make_user):
+    member = make_user("member", gym_id=gym.id)
+
+    response = _ingest(
+        session, gym,
+        _event("kiosk-1", member.id, "2026-03-10 07:00:00"),
+        _event("kiosk-2", member.id, "yesterday"),
+    )
+
+    assert _statuses(response) == [
+        (AttendanceEventStatus.REJECTED, "occurred_at must include a UTC offset, e.g. +05:30"),
+        (AttendanceEventStatus.REJECTED, "Invalid occurred_at timestamp"),
+    ]
+    assert _attendance(session, member) == []
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+
+import app.db.db
+from app.core import permission_guard
+from app.core.config import settings
+from app.core.dependencies import current_principal
+from app.core.permission_guard import bump_permission_matrix_version, require_permission
+from app.core.permissions import require_any_authenticated
+from app.core.security import create_reset_token, decode_token
+from app.models.permission import Permission
+from app.models.role_permission import RolePermission
+from app.models.user import User
+from app.services.user_service import UserService
+
+
+@pytest.fixture
+def auth_client(engine, monkeypatch):
+    """An app with one route behind the access gate that reports what the request principal holds"""
+    monkeypatch.setattr(app.db.db, "_engine", engine)
+    application = FastAPI()
+
+    @application.get("/principal")
+    def principal(other_user_id: str, current_user: User = require_any_authenticated):
+        principal = current_principal(current_user)
+        return {
+            "user_id": principal.user.id,
+            "role_name": principal.role_name,
+            "gym_id": principal.gym_id,
+            "other_user_has_principal": current_principal(User(id=other_user_id)) is not None,
+        }
+
+    return TestClient(application)
+
+
+def test_member_request_authenticates_in_one_statement(
+    session, gym, subscription, member, auth_headers, auth_client, count_queries
+):
+    member_id, gym_id = member.id, gym.id
+    params = {"other_user_id": gym.owner_id}
+    headers = auth_headers(member)
+    session.close()
+
+    # The first request also fills the subscription and membership gate caches
+    with count_queries() as cold:
+        auth_client.get("/principal", params=params, headers=headers)
+    with count_queries() as statements:
+        response = auth_client.get("/principal", params=params, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "user_id": member_id,
+        "role_name": "MEMBER",
+        "gym_id": gym_id,
+        # The principal is only handed out for the user it was loaded for
+        "other_user_has_principal": False,
+    }
+    assert len(cold) == 3
+    # User, role and owned gym in one joined query; the gate is served from its caches
+    assert len(statements) == 1
+    assert "FROM users" in statements[0]
+
+
+def _token_issued_at(user: User, issued_at: datetime) -> str:
+    return jwt.encode(
+        {"sub": user.id, "iat": issued_at, "exp": issued_at + timedelta(days=1)},
+        settings.secret_key,
+        algorithm=settings.algorithm,
+    )
+
+
+def test_password_reset_rejects_tokens_issued_before_it(
+    session, gym, subscription, member, auth_headers, auth_client, monkeypatch
+):
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    params = {"other_user_id": gym.owner_id}
+    # Signed in an hour ago, and the claims are cached by this worker
+    old_token = _token_issued_at(member, datetime.utcnow() - timedelta(hours=1))
+    old_headers = {"Authorization": f"Bearer {old_token}"}
+    assert auth_client.get("/principal", params=params, headers=old_headers).status_code == 200
+
+    UserService(session).reset_password(create_reset_token(member.email), "new-secret-123")
+
+    # Still signed and unexpired, so it verifies again after the cache eviction...
+    assert decode_token(old_token) is not None
+    # ...but the user's tokens_valid_after turns it away, on this worker or any other
+    assert auth_client.get("/principal", params=params, headers=old_headers).status_code == 401
+    assert auth_client.get("/principal", params=params, headers=auth_headers(member)).status_code == 200
+
+
+def test_tokens_without_iat_are_rejected_once_revoked(session, gym, subscription, member, auth_client):
+    params = {"other_user_id": gym.owner_id}
+    token = jwt.encode(
+        {"sub": member.id, "exp": datetime.utcnow() + timedelta(days=1)},
+        settings.secret_key,
+        algorithm=settings.algorithm,
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    assert auth_client.get("/principal", params=params, headers=headers).status_code == 200
+
+    member.tokens_valid_after = datetime.utcnow()
+    session.add(member)
+    session.commit()
+
+    assert auth_client.get("/principal", params=params, headers=headers).status_code == 401
+
+
+def _grant(session, user, name: str) -> None:
+    """Give the user's role a new permission"""
+    permission = Permission(name=name, resource="member", actions="read")
+    session.add(permission)
+    session.add(RolePermission(role_id=user.role_id, permission_id=permission.id))
+    session.commit()
+    # Reload the user now, so counted blocks only see the permission check
+    session.refresh(user)
+
+
+def _check(session, user, permission_name: str) -> None:
+    """Run the require_permission dependency the way FastAPI would, on an event loop"""
+    dependency = require_permission(permission_name).dependency
+    asyncio.run(dependency(current_user=user, session=session))
+
+
+def test_permission_check_runs_no_queries_once_matrix_is_warm(session, member, count_queries):
+    _grant(session, member, "member_read")
+    bump_permission_matrix_version()
+
+    with count_queries() as loading:
+        _check(session, member, "member_read")
+    with count_queries() as warm:
+        _check(session, member, "member_read")
+
+    assert len(loading) == 1
+    assert warm == []
+
+
+def test_bump_permission_matrix_version_forces_reload(session, member, count_queries):
+    bump_permission_matrix_version()
+    with pytest.raises(HTTPException):
+        _check(session, member, "member_write")
+
+    _grant(session, member, "member_write")
+    # Still served from the loaded matrix
+    with pytest.raises(HTTPException):
+        _check(session, member, "member_write")
+
+    bump_permission_matrix_version()
+    with count_queries() as statements:
+        _check(session, member, "member_write")
+    assert len(statements) == 1
+
+
+def test_permission_matrix_reloads_off_the_event_loop(session, member, monkeypatch):
+    load_permission_matrix = permission_guard.load_permission_matrix
+    threads = []
+
+    def load_permission_matrix_recording_thread(session):
+        threads.append(threading.current_thread())
+        return load_permission_matrix(session)
+
+    monkeypatch.setattr(permission_guard, "load_permission_matrix", load_permission_matrix_recording_thread)
+    bump_permission_matrix_version()
+
+    with pytest.raises(HTTPException):
+        _check(session, member, "member_read")
+
+    assert len(threads) == 1
+    # asyncio.run drives the dependency on this thread; the reload must not block it
+    assert threads[0] is not threading.current_thread()
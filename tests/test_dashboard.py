@@ -0,0 +1,70 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from app.models.gym_daily_stats import GymDailyStats
+from app.models.membership import Membership
+from app.models.payments import Payment
+from app.models.plan import Plan
+from app.services.dashboard_service import DashboardService
+from app.utils.datetime import today_ist
+
+
+def _seed_gym_activity(session, gym, make_user) -> None:
+    """Three members (one inactive), a plan with payments, and rollup rows for today and yesterday"""
+    plan = Plan(gym_id=gym.id, name="Monthly", duration_days=30, price=Decimal("1000"))
+    session.add(plan)
+    session.commit()
+
+    members = [
+        make_user("member1", gym_id=gym.id),
+        make_user("member2", gym_id=gym.id),
+        make_user("member3", gym_id=gym.id, is_active=False),
+    ]
+    for member, status in zip(members, ("paid", "pending", "pending")):
+        membership = Membership(
+            user_id=member.id,
+            gym_id=gym.id,
+            plan_id=plan.id,
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=30),
+            status="active",
+        )
+        session.add(membership)
+        session.commit()
+        session.add(Payment(
+            user_id=member.id,
+            membership_id=membership.id,
+            gym_id=gym.id,
+            amount=Decimal("1000"),
+            status=status,
+        ))
+
+    today = today_ist()
+    session.add(GymDailyStats(gym_id=gym.id, local_date=today, check_ins=2, check_outs=1, unique_members=2,
+                              updated_at=datetime.now()))
+    session.add(GymDailyStats(gym_id=gym.id, local_date=today - timedelta(days=1), check_ins=1, check_outs=1,
+                              unique_members=1, updated_at=datetime.now()))
+    session.commit()
+
+
+def test_admin_kpis_are_one_query(session, gym, make_user, count_queries):
+    _seed_gym_activity(session, gym, make_user)
+    gym_id = gym.id
+    service = DashboardService(session=session)
+
+    with count_queries() as statements:
+        kpis = service._get_admin_kpis(gym_id)
+
+    assert len(statements) == 1
+    assert kpis.active_members == 2
+    assert kpis.total_check_ins_today == 2
+    assert kpis.total_check_outs_today == 1
+    assert kpis.present_today_trend_percentage == 100.0
+    assert kpis.total_fee_due_members == 2
+    assert kpis.total_fees_received_amount == Decimal("1000")
+    assert kpis.total_fees_pending_amount == Decimal("2000")
+
+    # Served from kpi_cache until a write invalidates it
+    with count_queries() as statements:
+        assert service._get_admin_kpis(gym_id) == kpis
+    assert len(statements) == 0
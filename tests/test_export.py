@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime
+
+from app.api.v1.owners import read as owners_read
+from app.models.attendance import Attendance
+from app.services.export_service import export_attendance
+
+
+def test_attendance_export_streams_ist_times_without_holding_request_connection(
+    engine, session, client, gym, subscription, make_user, auth_headers, monkeypatch
+):
+    member = make_user("member", gym_id=gym.id)
+    session.add(Attendance(
+        user_id=member.id,
+        gym_id=gym.id,
+        # 07:00 to 08:30 IST, stored as naive UTC
+        check_in_at=datetime(2026, 3, 10, 1, 30),
+        check_out_at=datetime(2026, 3, 10, 3, 0),
+        local_date=date(2026, 3, 10),
+    ))
+    session.commit()
+    member_id = member.id
+    headers = auth_headers(gym.owner)
+    session.close()
+
+    checked_out = []
+
+    def export_attendance_recording_pool(*args, **kwargs):
+        chunks = export_attendance(*args, **kwargs)
+
+        def body():
+            checked_out.append(engine.pool.checkedout())
+            yield from chunks
+
+        return body()
+
+    monkeypatch.setattr(owners_read, "export_attendance", export_attendance_recording_pool)
+
+    response = client.get("/api/v1/owners/read/export/attendance", params={"format": "ndjson"}, headers=headers)
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["user_id"], row["check_in_at"], row["check_out_at"]) for row in rows] == [
+        (member_id, "2026-03-10T07:00:00+05:30", "2026-03-10T08:30:00+05:30")
+    ]
+    # The request session was released before the body started streaming
+    assert checked_out == [0]
+    assert engine.pool.checkedout() == 0
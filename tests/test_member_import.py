@@ -0,0 +1,126 @@
+import csv
+import io
+from datetime import date
+
+import pytest
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.user import User
+from app.services import member_import_service
+from app.services.member_import_service import MemberImportService
+
+COLUMNS = [
+    "name", "email", "phone", "password", "gender", "dob",
+    "address_line1", "city", "state", "postal_code", "country", "user_name", "plan_id",
+]
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashes(monkeypatch):
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+
+
+def _csv(*rows: dict) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for index, row in enumerate(rows):
+        writer.writerow({
+            "name": f"Member {index}",
+            "email": f"member{index}@example.com",
+            "phone": f"90000000{index:02d}",
+            "password": "secret123",
+            "gender": "female",
+            "dob": "1995-05-01",
+            "address_line1": "2 Import Lane",
+            "city": "Mumbai",
+            "state": "Maharashtra",
+            "postal_code": "400001",
+            "country": "India",
+            **row,
+        })
+    buffer.seek(0)
+    return buffer
+
+
+def _import(session, gym, lines):
+    return MemberImportService(session=session).import_members(gym_id=gym.id, lines=lines)
+
+
+def _errors(response):
+    return [(error.row, error.field, error.message) for error in response.errors]
+
+
+def test_import_reports_bad_rows_and_keeps_the_rest(session, gym, make_user):
+    make_user("existing", gym_id=gym.id)
+
+    response = _import(session, gym, _csv(
+        {},
+        {"email": "existing@example.com"},
+        {"gender": "robot"},
+        {"plan_id": "no-such-plan"},
+        {"phone": "9000000000"},
+    ))
+
+    # The header is line 1, so the n-th data row is line n + 1
+    assert [member.row for member in response.imported] == [2]
+    assert _errors(response) == [
+        (3, "email", "User with this email is already registered"),
+        (4, "gender", "Input should be 'MALE', 'FEMALE' or 'OTHER'"),
+        (5, "plan_id", "Plan not found for this gym"),
+        (6, "phone", "User with this phone number is already registered"),
+    ]
+    assert (response.total_rows, response.imported_count, response.failed_count) == (5, 1, 4)
+
+
+def test_import_stops_at_og_plan_member_limit(session, gym, subscription, make_user):
+    subscription.og_plan.max_members = 3
+    session.add(subscription.og_plan)
+    session.commit()
+    make_user("existing", gym_id=gym.id)
+
+    response = _import(session, gym, _csv({}, {}, {}, {}))
+
+    assert [member.row for member in response.imported] == [2, 3]
+    limit_message = "Gym has reached the maximum member limit of 3 for the current OG plan"
+    assert _errors(response) == [(4, None, limit_message), (5, None, limit_message)]
+
+
+def test_import_retries_username_taken_by_concurrent_signup(engine, session, gym, roles, monkeypatch):
+    member_role_id = roles["MEMBER"].id
+    unique_usernames = member_import_service.unique_usernames
+    calls = []
+
+    def unique_usernames_then_concurrent_signup(session, bases, exclude=()):
+        usernames = unique_usernames(session, bases, exclude)
+        calls.append(usernames)
+        if len(calls) == 1:
+            # Another request signs up under the first chosen name before the batch is inserted
+            with Session(engine) as other_session:
+                other_session.add(User(
+                    user_name=usernames[0],
+                    name="Concurrent Signup",
+                    email="signup@example.com",
+                    password_hash="not-a-real-hash",
+                    phone="8888888888",
+                    gender="FEMALE",
+                    address_line1="3 Signup Road",
+                    city="Chennai",
+                    state="Tamil Nadu",
+                    postal_code="600001",
+                    country="India",
+                    dob=date(1992, 2, 2),
+                    role_id=member_role_id,
+                ))
+                other_session.commit()
+        return usernames
+
+    monkeypatch.setattr(member_import_service, "unique_usernames", unique_usernames_then_concurrent_signup)
+
+    response = _import(session, gym, _csv({"user_name": "alice"}))
+
+    assert calls == [["alice"], ["alice1"]]
+    assert [member.user_name for member in response.imported] == ["alice1"]
+    assert response.errors == []
+    assert sorted(session.exec(select(User.user_name).where(User.user_name.startswith("alice"))).all()) == ["alice", "alice1"]
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from app.models.attendance import Attendance
+from app.models.member_status import MemberStatus
+from app.services.member_status_service import MemberStatusService
+from app.utils.datetime import IST, to_local_date, to_utc_naive
+
+
+def _check_in(session, gym, member, check_in_at: datetime) -> None:
+    """Record a check-in the way AttendanceService does: an aware IST time, stored as naive UTC"""
+    session.add(Attendance(
+        user_id=member.id,
+        gym_id=gym.id,
+        check_in_at=to_utc_naive(check_in_at),
+        local_date=to_local_date(check_in_at),
+    ))
+    MemberStatusService(session=session).record_check_in(member.id, gym.id, check_in_at)
+    session.commit()
+
+
+def _stored_row(session, member) -> dict:
+    row = session.exec(select(MemberStatus).where(MemberStatus.user_id == member.id)).one()
+    session.expunge(row)
+    return row.model_dump(exclude={"updated_at"})
+
+
+def test_record_check_in_matches_rebuild(session, gym, make_user):
+    member = make_user("member", gym_id=gym.id)
+    # 23:00 IST the evening before: a later UTC hour than the next check-in, on an earlier instant
+    _check_in(session, gym, member, datetime(2026, 3, 9, 23, 0, tzinfo=IST))
+    MemberStatusService(session=session).rebuild(gym.id)
+
+    check_in_at = datetime(2026, 3, 10, 7, 0, tzinfo=IST)
+    _check_in(session, gym, member, check_in_at)
+    incremental = _stored_row(session, member)
+    MemberStatusService(session=session).rebuild(gym.id)
+
+    assert incremental == _stored_row(session, member)
+    assert incremental["last_check_in"] == datetime(2026, 3, 10, 1, 30)
+
+
+def test_record_check_in_never_moves_last_check_in_back(session, gym, make_user):
+    member = make_user("member", gym_id=gym.id)
+    latest = datetime(2026, 3, 10, 7, 0, tzinfo=IST)
+    _check_in(session, gym, member, latest)
+    MemberStatusService(session=session).rebuild(gym.id)
+
+    # Earlier by instant, though its IST wall clock is later than the stored UTC one
+    _check_in(session, gym, member, latest - timedelta(hours=1))
+
+    assert _stored_row(session, member)["last_check_in"] == to_utc_naive(latest)
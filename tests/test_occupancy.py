@@ -0,0 +1,72 @@
+import pytest
+
+from app.api.v1.owners import read as owners_read
+from app.core.config import settings
+from app.models.attendance import Attendance
+from app.services import occupancy_service
+from app.services.occupancy_service import InMemoryOccupancyBackend, OccupancyService, occupancy_event_stream
+from app.utils.datetime import now_ist, to_local_date, to_utc_naive
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = InMemoryOccupancyBackend()
+    monkeypatch.setattr(occupancy_service, "_backend", backend)
+    return backend
+
+
+def test_reconcile_keeps_counter_adjusted_while_counting(session, gym, make_user, backend):
+    member = make_user("member", gym_id=gym.id)
+    check_in_at = now_ist()
+    session.add(Attendance(
+        user_id=member.id,
+        gym_id=gym.id,
+        check_in_at=to_utc_naive(check_in_at),
+        local_date=to_local_date(check_in_at),
+    ))
+    session.commit()
+    backend.seed(gym.id, 5)
+    backend.seed("closed-gym", 2)
+
+    # A check-in commits and adjusts the counter after reconcile has read it
+    get_all = backend.get_all
+
+    def get_all_then_check_in():
+        counts = get_all()
+        backend.adjust(gym.id, 1)
+        return counts
+
+    backend.get_all = get_all_then_check_in
+    OccupancyService(session=session).reconcile()
+    assert backend.get(gym.id) == 6
+    assert backend.get("closed-gym") == 0
+
+    backend.get_all = get_all
+    assert OccupancyService(session=session).reconcile() == 1
+    assert backend.get(gym.id) == 1
+
+
+def test_occupancy_stream_releases_request_connection(
+    engine, session, client, gym, subscription, auth_headers, backend, monkeypatch
+):
+    headers = auth_headers(gym.owner)
+    session.close()
+    monkeypatch.setattr(settings, "occupancy_stream_poll_seconds", 0)
+    checked_out = []
+
+    def stream_one_event(gym_id, is_disconnected):
+        async def disconnected_after_first_event():
+            checked_out.append(engine.pool.checkedout())
+            return len(checked_out) > 1
+
+        return occupancy_event_stream(gym_id=gym_id, is_disconnected=disconnected_after_first_event)
+
+    monkeypatch.setattr(owners_read, "occupancy_event_stream", stream_one_event)
+
+    response = client.get("/api/v1/owners/read/occupancy/stream", headers=headers)
+
+    assert response.status_code == 200
+    assert response.text.startswith("event: occupancy\n")
+    # Nothing is held while the body streams, nor once it has ended
+    assert checked_out == [0, 0]
+    assert engine.pool.checkedout() == 0
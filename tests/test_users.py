@@ -0,0 +1,58 @@
+import base64
+from datetime import datetime
+
+import pytest
+
+from app.services.user_service import MEMBER_SORTS, UserService
+from app.utils.cursor import encode_cursor
+
+JOINED_AT = datetime(2026, 3, 1, 9, 0)
+
+
+@pytest.fixture
+def members(gym, make_user):
+    """Seven members sharing name, join time and (no) plan expiry, plus two that sort apart"""
+    alike = [
+        make_user(f"alike{index}", gym_id=gym.id, name="Same Name", created_at=JOINED_AT)
+        for index in range(7)
+    ]
+    apart = [
+        make_user("aaron", gym_id=gym.id, name="Aaron First", created_at=datetime(2026, 1, 1)),
+        make_user("zara", gym_id=gym.id, name="Zara Last", created_at=datetime(2026, 6, 1)),
+    ]
+    return [member.id for member in alike + apart]
+
+
+@pytest.mark.parametrize("sort_by", sorted(MEMBER_SORTS))
+def test_cursor_pages_through_identical_sort_keys_once(session, gym, members, sort_by):
+    users = UserService(session=session)
+    expected = [member.id for member in users.get_all_members(gym.id, sort_by=sort_by, page_size=100).members]
+
+    seen = []
+    cursor = None
+    while True:
+        page = users.get_all_members(gym.id, sort_by=sort_by, page_size=2, cursor=cursor, include_total=False)
+        seen += [member.id for member in page.members]
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+
+    # Every member exactly once, in the same order as one big page
+    assert sorted(expected) == sorted(members)
+    assert seen == expected
+
+
+@pytest.mark.parametrize("cursor, detail", [
+    ("not-a-cursor", "Invalid cursor"),
+    (base64.urlsafe_b64encode(b'{"s":"name_asc"}').decode(), "Invalid cursor"),
+    (encode_cursor("newest_joiners", [JOINED_AT, "some-id"]), "Cursor does not match the requested sort order"),
+])
+def test_member_list_rejects_malformed_cursor(session, client, gym, subscription, auth_headers, cursor, detail):
+    response = client.get(
+        "/api/v1/owners/read/members",
+        params={"sort_by": "name_asc", "cursor": cursor},
+        headers=auth_headers(gym.owner),
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail